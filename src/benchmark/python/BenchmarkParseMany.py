@@ -0,0 +1,81 @@
+'''
+Measures the throughput (in parses per second) of validating a queue of job
+submissions against one options class, both by calling parseArguments for each
+of them and by streaming them all through parseMany.
+
+Usage: python BenchmarkParseMany.py [numberOfJobs] [numberOfRuns]
+'''
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+from Cli import Cli
+from Cli import CliError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class JobOptions(object):
+   @option(shortName='q', default='default')
+   def getQueue(self): pass
+
+   @option(shortName='p', default=0, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getPriority(self): pass
+
+   @option(shortName='i', multiValued=True)
+   def getInputFiles(self): pass
+
+   @option(shortName='v')
+   def isVerbose(self): pass
+
+   @option
+   def getOwner(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+def createJobs(numberOfJobs):
+   'Returns a list of job submissions, every 100th of which is invalid'
+   jobs = []
+   for index in range(numberOfJobs):
+      job = ['-q', 'queue%d' % (index % 7), '-p', str(index % 10), '-i', 'a%d' % index, 'b%d' % index]
+      if index % 3 == 0:
+         job.append('--verbose')
+      if index % 100 == 0:
+         job.extend(['--owner', 'x', 'y'])
+      job.append('run')
+      jobs.append(job)
+   return jobs
+
+def parseEach(cli, jobs):
+   for job in jobs:
+      try:
+         cli.parseArguments(job)
+      except CliError:
+         pass
+
+def parseMany(cli, jobs):
+   for index, result in cli.parseMany(jobs):
+      pass
+
+def measure(parse, cli, jobs, numberOfRuns):
+   'Returns the best throughput (parses per second) of "numberOfRuns" runs'
+   bestTime = None
+   for run in range(numberOfRuns):
+      startTime = time.time()
+      parse(cli, jobs)
+      elapsedTime = time.time() - startTime
+      bestTime = elapsedTime if bestTime is None else min(bestTime, elapsedTime)
+   return len(jobs) / bestTime
+
+def main(numberOfJobs=20000, numberOfRuns=5):
+   cli = Cli(JobOptions)
+   jobs = createJobs(numberOfJobs)
+   print('Throughput for %d jobs:' % numberOfJobs)
+   print('   parseArguments: %10.0f parses/s' % measure(parseEach, cli, jobs, numberOfRuns))
+   print('   parseMany:      %10.0f parses/s' % measure(parseMany, cli, jobs, numberOfRuns))
+
+if __name__ == '__main__':
+   main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,51 @@
+'''
+Measures how the throughput (in parses per second) of Cli.parseManyInParallel
+scales with the number of worker processes, for an options class whose
+valueFormatter does real (CPU-bound) work, compared with a serial parseMany.
+
+Usage: python BenchmarkParseManyInParallel.py [numberOfJobs] [chunkSize]
+'''
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+from Cli import Cli
+from Cli import option
+
+def checksumValueFormatter(optionName, value):
+   'An expensive formatter: an iterated SHA-256 of the value'
+   checksum = value.encode('utf-8')
+   for iteration in range(500):
+      checksum = hashlib.sha256(checksum).digest()
+   return hashlib.sha256(checksum).hexdigest()
+
+class ChecksumOptions(object):
+   @option(multiValued=True, valueFormatter=checksumValueFormatter)
+   def getInputFiles(self): pass
+
+def measure(parse, jobs):
+   'Returns the throughput (parses per second) of "parse"'
+   startTime = time.time()
+   for index, result in parse(jobs):
+      pass
+   return len(jobs) / (time.time() - startTime)
+
+def main(numberOfJobs=2000, chunkSize=50):
+   cli = Cli(ChecksumOptions)
+   jobs = [['--inputFiles'] + ['file%d_%d' % (index, value) for value in range(10)] for index in range(numberOfJobs)]
+
+   serial = measure(cli.parseMany, jobs)
+   print('Throughput for %d jobs (chunkSize=%d):' % (numberOfJobs, chunkSize))
+   print('   parseMany:                   %8.0f parses/s' % serial)
+   workers = 1
+   while workers <= multiprocessing.cpu_count():
+      parallel = measure(lambda jobs: cli.parseManyInParallel(jobs, maxWorkers=workers, chunkSize=chunkSize), jobs)
+      print('   parseManyInParallel(%3d):    %8.0f parses/s (x%.1f)' % (workers, parallel, parallel / serial))
+      workers *= 2
+
+if __name__ == '__main__':
+   main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,89 @@
+'''
+Compares the parsed options returned by parseArguments (a __slots__ based
+subclass of the options class with generated accessors) against the previous
+representation, which set a bound _Option.__call__ wrapper onto the options
+instance for every declared option. Measures the time and (in Python 3) the
+memory allocated to build the parsed options, and the latency of calling an
+accessor.
+
+Usage: python BenchmarkParsedOptions.py [numberOfOptions] [numberOfRuns]
+'''
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+from Cli import Cli
+from Cli import option
+
+class _Option(object):
+   'The per-option wrapper of the previous representation'
+   def __init__(self, optionsClass, optionDescription, values, isFormatted=True):
+      self.__optionsClass = optionsClass
+      self.__optionDescription = optionDescription
+      self.__name__ = optionDescription
+      self.__isFormatted = isFormatted
+      self.__values = values
+
+   def __call__(self, *params, **namedParams):
+      if not self.__isFormatted:
+         self.__values = str(self.__values)
+         self.__isFormatted = True
+      return self.__values
+
+def createOptionsClass(numberOfOptions):
+   methods = {}
+   for index in range(numberOfOptions):
+      def method(self): pass
+      method.__name__ = 'getOption%d' % index
+      methods[method.__name__] = option(method)
+   return type('ManyOptions%d' % numberOfOptions, (object,), methods)
+
+def createLegacyOptions(optionsClass, methodNames, values):
+   'Builds the parsed options the way parseArguments used to'
+   optionsInstance = optionsClass()
+   for methodName in methodNames:
+      setattr(optionsInstance, methodName, _Option(optionsClass, methodName, values.get(methodName)).__call__)
+   return optionsInstance
+
+def measureAllocation(createOptions):
+   'Returns the number of bytes allocated (and still held) by createOptions(), or None before Python 3.4'
+   try:
+      import tracemalloc
+   except ImportError:
+      return None
+   tracemalloc.start()
+   try:
+      before = tracemalloc.get_traced_memory()[0]
+      optionsInstance = createOptions()
+      return tracemalloc.get_traced_memory()[0] - before
+   finally:
+      tracemalloc.stop()
+
+def main(numberOfOptions=100, numberOfRuns=5):
+   optionsClass = createOptionsClass(numberOfOptions)
+   methodNames = sorted(name for name in dir(optionsClass) if name.startswith('get'))
+   cli = Cli(optionsClass)
+   args = ['--option0', 'a', '--option1', 'b']
+   values = {'getOption0': 'a', 'getOption1': 'b'}
+
+   createLegacy = lambda: createLegacyOptions(optionsClass, methodNames, values)
+   createSlotted = lambda: cli.parseArguments(args)
+   legacyOptions = createLegacy()
+   slottedOptions = createSlotted()
+
+   def best(function, number):
+      return min(timeit.repeat(function, number=number, repeat=numberOfRuns)) / number
+
+   print('Parsed options for a class of %d options (2 specified):' % numberOfOptions)
+   print('%-28s %15s %15s' % ('', '_Option wrappers', '__slots__'))
+   print('%-28s %14.2fus %14.2fus' % ('Build (parse for __slots__)', best(createLegacy, 1000) * 1e6, best(createSlotted, 1000) * 1e6))
+   legacyBytes, slottedBytes = measureAllocation(createLegacy), measureAllocation(createSlotted)
+   if legacyBytes is not None:
+      print('%-28s %15d %15d' % ('Bytes allocated', legacyBytes, slottedBytes))
+   print('%-28s %14.3fus %14.3fus' % ('Accessor (specified)', best(legacyOptions.getOption0, 100000) * 1e6, best(slottedOptions.getOption0, 100000) * 1e6))
+   print('%-28s %14.3fus %14.3fus' % ('Accessor (default)', best(legacyOptions.getOption2, 100000) * 1e6, best(slottedOptions.getOption2, 100000) * 1e6))
+
+if __name__ == '__main__':
+   main(*[int(arg) for arg in sys.argv[1:]])
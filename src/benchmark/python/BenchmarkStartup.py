@@ -0,0 +1,65 @@
+'''
+Measures the start up cost of a short-lived program: constructing a Cli for a
+large options class that has not been seen before in this process, with and
+without a persistent spec cache directory (see the "cacheDir" parameter of Cli).
+Both constructing the Cli on its own and constructing it to display the help
+text are measured.
+
+Usage: python BenchmarkStartup.py [numberOfOptions] [numberOfRuns]
+'''
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+from Cli import Cli
+
+OPTIONS_MODULE = '''
+from Cli import option, NUMERIC_VALUE_FORMATTER
+
+class LargeOptions(object):
+%s
+'''
+
+OPTION_METHOD = '''
+   @option(shortName='o%(index)d', default=%(index)d, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getOption%(index)d(self):
+      'Help text for option %(index)d'
+      pass
+'''
+
+def timeStartup(startup, numberOfRuns):
+   'Returns the best time of "numberOfRuns" calls of "startup", each with an empty in-memory spec cache'
+   bestTime = None
+   for run in range(numberOfRuns):
+      Cli.clearSpecCache()
+      startTime = time.time()
+      startup()
+      elapsedTime = time.time() - startTime
+      bestTime = elapsedTime if bestTime is None else min(bestTime, elapsedTime)
+   return bestTime
+
+def main(numberOfOptions=2000, numberOfRuns=10):
+   workDir = tempfile.mkdtemp()
+   try:
+      moduleFile = open(os.path.join(workDir, 'LargeOptions.py'), 'w')
+      moduleFile.write(OPTIONS_MODULE % ''.join([OPTION_METHOD % {'index': index} for index in range(numberOfOptions)]))
+      moduleFile.close()
+      sys.path.insert(0, workDir)
+      from LargeOptions import LargeOptions
+
+      cacheDir = os.path.join(workDir, 'cache')
+      print('Start up time for %d options:' % numberOfOptions)
+      print('                       Cli()     Cli().helpText')
+      print('   without cacheDir: %8.2fms %8.2fms' % (timeStartup(lambda: Cli(LargeOptions), numberOfRuns) * 1000,
+                                                     timeStartup(lambda: Cli(LargeOptions).helpText, numberOfRuns) * 1000))
+      print('   with cacheDir:    %8.2fms %8.2fms' % (timeStartup(lambda: Cli(LargeOptions, cacheDir=cacheDir), numberOfRuns) * 1000,
+                                                     timeStartup(lambda: Cli(LargeOptions, cacheDir=cacheDir).helpText, numberOfRuns) * 1000))
+   finally:
+      shutil.rmtree(workDir)
+
+if __name__ == '__main__':
+   main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,47 @@
+'''
+Measures how long it takes to report an unrecognised option (with its "did you
+mean" suggestions) for options classes with many options, both for the first
+unrecognised option (which builds the suggestion index) and for later ones.
+
+Usage: python BenchmarkSuggestions.py [numberOfOptions] [numberOfErrors]
+'''
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+
+def createOptionsClass(numberOfOptions):
+   'Returns a new options class with "numberOfOptions" options'
+   methods = {}
+   for index in range(numberOfOptions):
+      def method(self): pass
+      method.__name__ = 'getOutputOption%d' % index
+      methods[method.__name__] = option(method)
+   return type('ManyOptions', (object,), methods)
+
+def reportError(cli, args):
+   try:
+      cli.parseArguments(args)
+   except CliParseError as e:
+      return str(e)
+
+def main(numberOfOptions=10000, numberOfErrors=1000):
+   cli = Cli(createOptionsClass(numberOfOptions))
+   startTime = time.time()
+   message = reportError(cli, ['--outputOptoin%d' % (numberOfOptions // 2)])
+   firstTime = time.time() - startTime
+   startTime = time.time()
+   for index in range(numberOfErrors):
+      reportError(cli, ['--ouptutOption%d' % index])
+   laterTime = (time.time() - startTime) / numberOfErrors
+   print('Unrecognised options with %d options:' % numberOfOptions)
+   print('   first error: %8.2f ms (%s)' % (firstTime * 1000, message))
+   print('   later error: %8.2f ms' % (laterTime * 1000))
+
+if __name__ == '__main__':
+   main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,177 @@
+'''
+Microbenchmark suite for the Cli library and a performance regression gate.
+
+Times Cli construction, help text generation (whole and wrapped) and
+parseArguments for a range of scenarios (small and large options classes, long
+multi-valued lists, many positional arguments and expensive value formatters),
+then either saves the timings as a JSON baseline or compares them against a
+saved baseline, exiting with status 1 if any scenario is slower than its
+baseline by more than "thresholdPercent" (default 25). Baselines should be
+saved and compared on the same machine and Python version.
+
+Usage: python BenchmarkSuite.py run
+       python BenchmarkSuite.py save baseline.json
+       python BenchmarkSuite.py compare baseline.json [thresholdPercent]
+'''
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+import Cli as CliModule
+from Cli import Cli
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_ARRAY_VALUE_FORMATTER
+from Cli import NUMERIC_VALUE_FORMATTER
+from Cli import STRING_VALUE_FORMATTER
+
+NUMBER_OF_RUNS = 5
+
+def createOptionsClass(name, numberOfOptions, numberOfPositionalArguments=0, valueFormatter=STRING_VALUE_FORMATTER):
+   methods = {}
+   for index in range(numberOfOptions):
+      def method(self):
+         'Option used by the benchmarks'
+         pass
+      method.__name__ = 'getOption%d' % index
+      methods[method.__name__] = option(shortName='o%d' % index, valueFormatter=valueFormatter, default=str(index))(method)
+   for index in range(numberOfPositionalArguments):
+      def method(self): pass
+      method.__name__ = 'getArgument%d' % index
+      methods[method.__name__] = positional(index + 1, valueFormatter=valueFormatter)(method)
+   return type(name, (object,), methods)
+
+class MultiValuedOptions(object):
+   @option(multiValued=True, shortName='f')
+   def getFiles(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+class NumericListOptions(object):
+   @option(multiValued=True, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getIds(self): pass
+
+class NumericArrayOptions(object):
+   @option(multiValued=True, valueFormatter=NUMERIC_ARRAY_VALUE_FORMATTER)
+   def getIds(self): pass
+
+IDS = ['--ids'] + [str(index * 7919) for index in range(100000)]
+
+# The cost per argument should not grow with the number of options (compare parse.perArgument.small with .huge)
+MANY_ARGUMENTS = []
+for index in range(2000):
+   MANY_ARGUMENTS.extend(['--option%d' % (index % 10), 'value', '-o%d' % (index % 10), 'value'])
+
+SMALL_OPTIONS = createOptionsClass('SmallOptions', 10)
+LARGE_OPTIONS = createOptionsClass('LargeOptions', 1000)
+HUGE_OPTIONS = createOptionsClass('HugeOptions', 10000)
+POSITIONAL_OPTIONS = createOptionsClass('PositionalOptions', 5, 50)
+FORMATTED_OPTIONS = createOptionsClass('FormattedOptions', 100, valueFormatter=NUMERIC_VALUE_FORMATTER)
+
+def constructCold(optionsClass):
+   def construct():
+      Cli.clearSpecCache()
+      Cli(optionsClass)
+   return construct
+
+def helpTextCold(optionsClass):
+   def helpText():
+      Cli.clearSpecCache()
+      return Cli(optionsClass).helpText
+   return helpText
+
+class NullFile(object):
+   def write(self, text):
+      pass
+
+def writeHelp(optionsClass, **kwargs):
+   cli = Cli(optionsClass)
+   return lambda: cli.writeHelp(NullFile(), 100, **kwargs)
+
+def parse(optionsClass, args):
+   cli = Cli(optionsClass)
+   return lambda: cli.parseArguments(args)
+
+# name -> (number of calls per timing, function returning the function to time)
+SCENARIOS = {
+   'construct.small':          (200, lambda: constructCold(SMALL_OPTIONS)),
+   'construct.large':          (10, lambda: constructCold(LARGE_OPTIONS)),
+   'construct.cached':         (10000, lambda: (lambda: Cli(LARGE_OPTIONS))),
+   'helpText.small':           (100, lambda: helpTextCold(SMALL_OPTIONS)),
+   'helpText.large':           (5, lambda: helpTextCold(LARGE_OPTIONS)),
+   'writeHelp.large':          (5, lambda: writeHelp(LARGE_OPTIONS)),
+   'writeHelp.oneOption':      (2000, lambda: writeHelp(LARGE_OPTIONS, optionName='option500')),
+   'parse.small':              (5000, lambda: parse(SMALL_OPTIONS, ['--option1', 'a', '-o2', 'b', '--option3', 'c'])),
+   'parse.large':              (5000, lambda: parse(LARGE_OPTIONS, ['--option1', 'a', '-o999', 'b', '--option500', 'c'])),
+   'parse.huge':               (5000, lambda: parse(HUGE_OPTIONS, ['--option1', 'a', '-o9999', 'b', '--option5000', 'c'])),
+   'parse.large.allOptions':   (20, lambda: parse(LARGE_OPTIONS, sum([['-o%d' % index, 'v'] for index in range(1000)], []))),
+   'parse.perArgument.small':  (20, lambda: parse(SMALL_OPTIONS, MANY_ARGUMENTS)),
+   'parse.perArgument.huge':   (20, lambda: parse(HUGE_OPTIONS, MANY_ARGUMENTS)),
+   'parse.multiValued':        (50, lambda: parse(MultiValuedOptions, ['-f'] + ['file%d.txt' % index for index in range(10000)] + ['--verbose'])),
+   'parse.positional':         (2000, lambda: parse(POSITIONAL_OPTIONS, ['--option1', 'a'] + ['p%d' % index for index in range(50)])),
+   'parse.numericList':        (5, lambda: parse(NumericListOptions, IDS)),
+   'parse.numericArray':       (5, lambda: parse(NumericArrayOptions, IDS)),
+   'parse.formatted':          (200, lambda: parse(FORMATTED_OPTIONS, sum([['--option%d' % index, '0x%x' % index] for index in range(100)], []))),
+}
+
+def runScenarios():
+   'Returns the best time (in seconds) per call of each scenario'
+   results = {}
+   for name in sorted(SCENARIOS):
+      number, createFunction = SCENARIOS[name]
+      function = createFunction()
+      function()  # warm up (e.g. compile and cache the spec)
+      results[name] = min(timeit.repeat(function, number=number, repeat=NUMBER_OF_RUNS)) / number
+   Cli.clearSpecCache()
+   return results
+
+def printResults(results, baseline=None, thresholdPercent=None):
+   'Prints the results (against the baseline), returning the names of the scenarios that regressed'
+   regressions = []
+   for name in sorted(results):
+      line = '%-24s %12.2fus' % (name, results[name] * 1e6)
+      if baseline is not None and name in baseline:
+         change = (results[name] / baseline[name] - 1) * 100
+         line += ' %12.2fus %+8.1f%%' % (baseline[name] * 1e6, change)
+         if change > thresholdPercent:
+            regressions.append(name)
+            line += '  REGRESSION'
+      print(line)
+   return regressions
+
+def main(command='run', baselineFile=None, thresholdPercent='25'):
+   if command == 'run':
+      printResults(runScenarios())
+   elif command == 'save' and baselineFile is not None:
+      results = runScenarios()
+      printResults(results)
+      baselineStream = open(baselineFile, 'w')
+      try:
+         json.dump({'cliVersion': CliModule.__version__, 'python': platform.python_version(), 'scenarios': results}, baselineStream, indent=2, sort_keys=True)
+      finally:
+         baselineStream.close()
+      print('Saved baseline to %s' % baselineFile)
+   elif command == 'compare' and baselineFile is not None:
+      baselineStream = open(baselineFile)
+      try:
+         baseline = json.load(baselineStream)
+      finally:
+         baselineStream.close()
+      print('Comparing Cli %s (Python %s) against baseline of Cli %s (Python %s)' % (CliModule.__version__, platform.python_version(), baseline['cliVersion'], baseline['python']))
+      print('%-24s %14s %14s %9s' % ('Scenario', 'Current', 'Baseline', 'Change'))
+      regressions = printResults(runScenarios(), baseline['scenarios'], float(thresholdPercent))
+      if regressions:
+         print('%d scenario(s) regressed by more than %s%%: %s' % (len(regressions), thresholdPercent, ', '.join(regressions)))
+         return 1
+   else:
+      print(__doc__)
+      return 2
+   return 0
+
+if __name__ == '__main__':
+   sys.exit(main(*sys.argv[1:]))
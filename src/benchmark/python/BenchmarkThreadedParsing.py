@@ -0,0 +1,82 @@
+'''
+Measures how the parse throughput (in parses per second) of one Cli instance
+shared by many threads scales with the number of threads. On a free-threaded
+(no-GIL) build of CPython the throughput should grow with the thread count (up
+to the number of CPUs), whereas with the GIL it stays roughly flat.
+
+Usage: python BenchmarkThreadedParsing.py [maxThreads] [parsesPerThread] [numberOfRuns]
+'''
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'main', 'python'))
+
+from Cli import Cli
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class JobOptions(object):
+   @option(shortName='q', default='default')
+   def getQueue(self): pass
+
+   @option(shortName='p', default=0, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getPriority(self): pass
+
+   @option(shortName='i', multiValued=True)
+   def getInputFiles(self): pass
+
+   @option(shortName='v')
+   def isVerbose(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+def createJobs(numberOfJobs):
+   jobs = []
+   for index in range(numberOfJobs):
+      job = ['-q', 'queue%d' % (index % 7), '-p', str(index % 10), '-i', 'a%d' % index, 'b%d' % index]
+      if index % 3 == 0:
+         job.append('--verbose')
+      job.append('run')
+      jobs.append(job)
+   return jobs
+
+def parseConcurrently(cli, jobs, numberOfThreads):
+   'Returns the time taken for "numberOfThreads" threads to each parse every job'
+   start = threading.Event()
+
+   def parseAll():
+      start.wait()
+      for job in jobs:
+         cli.parseArguments(job)
+
+   threads = [threading.Thread(target=parseAll) for thread in range(numberOfThreads)]
+   for thread in threads:
+      thread.start()
+   startTime = time.time()
+   start.set()
+   for thread in threads:
+      thread.join()
+   return time.time() - startTime
+
+def main(maxThreads=8, parsesPerThread=5000, numberOfRuns=3):
+   cli = Cli(JobOptions)
+   jobs = createJobs(parsesPerThread)
+   isGilEnabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+   print('Python %s (GIL %s)' % (sys.version.split()[0], 'enabled' if isGilEnabled else 'disabled'))
+   print('%7s %15s %8s' % ('Threads', 'Parses/s', 'Speedup'))
+   numberOfThreads = 1
+   singleThreadedThroughput = None
+   while numberOfThreads <= maxThreads:
+      bestTime = min([parseConcurrently(cli, jobs, numberOfThreads) for run in range(numberOfRuns)])
+      throughput = numberOfThreads * parsesPerThread / bestTime
+      if singleThreadedThroughput is None:
+         singleThreadedThroughput = throughput
+      print('%7d %15.0f %7.2fx' % (numberOfThreads, throughput, throughput / singleThreadedThroughput))
+      numberOfThreads *= 2
+
+if __name__ == '__main__':
+   main(*[int(arg) for arg in sys.argv[1:]])
@@ -22,13 +22,18 @@ The Cli library has the following features:
      - Ability to mark options as mandatory
      - Ability to mark an option as multi-valued (with optional min/max values)
      - Auto-generates help text based on the interface
+     - Generates bash, zsh and fish completion scripts based on the interface
      - Ability to define additional custom help text for each option
      - Ability to define custom value formatters for each option
        The library comes with the following pre-built formatters:
           - String (default)
           - Digits-only String
           - Numeric (allows decimal, hexadecimal, binary, octal integers)
+          - Numeric array (formats all the values of a multi-valued option at once into an array.array,
+            or a numpy array)
+       and any pure formatter can be memoized (with a bounded least recently used cache)
      - Ability to specify positional arguments
+     - Ability to define git-style subcommands, whose options classes are only imported when used
 
 Every option annotated with a @option or @positional decorator. The decorated
 methods must have a name that starts with either "get" or "is".
@@ -41,16 +46,35 @@ The interface MyOptions defined above would be populated as follows:
      - --filePath C:\Some\Folder --recursive: getFilePath() == r'C:\Some\Folder', isRecursive() == True
 
 The library is best documented by examining its test cases which are split by feature:
-     - TestSimpleCli.py                    This represents the simplest usage
-     - TestCliWithInheritance.py           This shows how options can be inherited
-     - TestCliWithDefault.py               This shows how default values can be specified
-     - TestCliWithMandatory.py             This shows how to specify an option as being mandatory
-     - TestCliWithMultiValued.py           This shows how to specify an option with multiple values
-     - TestCliWithShortName.py             This shows how each option can be given a short name
-     - TestCliWithDefaultHelp.py           This shows to access the default help text
-     - TestCliWithCustomisedHelp.py        This shows how to enhance the help text
-     - TestCliWithValueFormatter.py        This shows how the option values can be formatted to suit your needs
-     - TestCliWithPositional.py            This shows how to specify positional arguments
+     - TestSimpleCli.py                         This represents the simplest usage
+     - TestCliWithInheritance.py                This shows how options can be inherited
+     - TestCliWithDefault.py                    This shows how default values can be specified
+     - TestCliWithMandatory.py                  This shows how to specify an option as being mandatory
+     - TestCliWithMultiValued.py                This shows how to specify an option with multiple values
+     - TestCliWithShortName.py                  This shows how each option can be given a short name
+     - TestCliWithDefaultHelp.py                This shows to access the default help text
+     - TestCliWithCustomisedHelp.py             This shows how to enhance the help text
+     - TestCliWithValueFormatter.py             This shows how the option values can be formatted to suit your needs
+     - TestCliWithPositional.py                 This shows how to specify positional arguments
+     - TestCliWithSpecCache.py                  This shows how the compiled options specifications are cached
+     - TestCliWithManyOptions.py                This shows that parsing scales to options classes with thousands of options
+     - TestCliWithLazyFormatting.py             This shows how option values can be formatted only when first used
+     - TestCliWithParseMany.py                  This shows how to parse many sets of arguments in one go (or in parallel)
+     - TestCliWithAsyncValueFormatter.py        This shows how values can be formatted by asynchronous (async def) valueFormatters
+     - TestCliWithThreads.py                    This shows that one Cli instance can parse from many threads at once
+     - TestCliWithRecords.py                    This shows how the parsed options can be returned as a record or viewed as a dict
+     - TestCliWithStats.py                      This shows how to record the time spent in each phase of parsing
+     - TestCliWithStreamedValues.py             This shows how multi-valued options can be streamed (formatted as they are consumed)
+     - TestCliWithArgumentFiles.py              This shows how arguments can be read from @argument files
+     - TestCliWithStdinValues.py                This shows how multi-valued options can read their values from stdin
+     - TestCliWithBytesArguments.py             This shows how arguments (such as non UTF-8 paths) can be parsed as bytes
+     - TestCliWithNumericArrays.py              This shows how numeric values can be formatted all at once into an array
+     - TestCliWithMemoizedValueFormatter.py     This shows how the results of a pure valueFormatter can be cached
+     - TestCliWithSubcommands.py                This shows how to define git-style subcommands that are imported lazily
+     - TestCliWithCompletionScripts.py          This shows how to generate shell completion scripts
+     - TestCliWithAbbreviations.py              This shows how long option names can be abbreviated
+     - TestCliWithSuggestions.py                This shows how unrecognised options are given "did you mean" suggestions
+     - TestCliWithWrappedHelp.py                This shows how to write the help text wrapped to the terminal width
 
 Typical Usage
 =============
@@ -90,23 +114,58 @@ MyApp.py:
 The above code could be invoked with the following command line arguments:
    python MyApp.py -f File1.txt File2.txt -o Result.txt --replace
 
-Help text for this would be invoked by --help (or -?) and displayed as follows:
+Help text for this would be invoked by --help (or -?) and displayed as follows (wrapped to the width of the terminal,
+80 columns here):
    python MyApp.py --help
 
    Output
    ------
-   Usage: TestCliWithCustomisedHelp.py --inputFiles, -f value1 ... [--outputFile, -o value] [--maxOutputSize, -m value] [--replace, -r]
+   Usage: MyApp.py --inputFiles, -f value1 ... [--maxOutputSize, -m value]
+          [--outputFile, -o value] [--replace, -r]
    where:
-   --inputFiles,    -f value1 value2 ...                                      List of input files to process
-   --outputFile,    -o value             (default='output.csv')               Output filename
-   --maxOutputSize, -m value             (default=1024)                       Maximum size to limit the output file to
-   --replace,       -r                   (True if specified, otherwise False) Do you want to replace the output file if it already exists
+     --inputFiles, -f value1 value2 ...
+                                List of input files to process
+     --maxOutputSize, -m value  Maximum size to limit the output file to
+                                (default=1024)
+     --outputFile, -o value     Output filename (default='output.csv')
+     --replace, -r              Do you want to replace the output file if it
+                                already exists (True if specified, otherwise False)
+
+The help for a single option would be invoked by --help followed by its name:
+   python MyApp.py --help outputFile
+
+   Output
+   ------
+     --outputFile, -o value  Output filename (default='output.csv')
 '''
-__VERSION__ = __version__ = "3.0.0"
+__VERSION__ = __version__ = "3.1.0"
 
+import collections
 import inspect
+import itertools
 import os
 import sys
+import threading
+import time
+import weakref
+
+try:
+    _STRING_TYPES = (str, unicode)
+except NameError:  # Python 3
+    _STRING_TYPES = (str,)
+
+try:
+    from collections.abc import Mapping as _Mapping
+except ImportError:  # Python 2
+    from collections import Mapping as _Mapping
+
+_timer = getattr(time, 'perf_counter', time.time)  # Python 2 has no perf_counter
+_map = getattr(itertools, 'imap', map)  # (Python 2 map returns a list)
+
+try:
+    from inspect import iscoroutinefunction as _iscoroutinefunction
+except ImportError:  # Python 2 (or Python 3 before 3.5)
+    _iscoroutinefunction = lambda function: False
 
 
 def __digitStringValueFormatter(optionName, value):
@@ -127,6 +186,8 @@ def __numericValueFormatter(optionName, value):
     '''
     if type(value) == int:
         return value
+    elif value.__class__ is bytes:  # (parsed with bytesArguments)
+        value = _decodeArgument(value)
 
     if value[:2].lower() == '0x':  # hexadecimal
         radix = 16
@@ -143,14 +204,157 @@ def __numericValueFormatter(optionName, value):
     except BaseException as e:
         raise CliParseError('Option %s has a value that cannot be converted to a number: %s\n   caused by: %s' % (optionName, value, e))
 
-STRING_VALUE_FORMATTER = lambda optionName, value: str(value)
+class _NumericArrayValueFormatter(object):
+    '''Batch valueFormatter that formats all the values of a multi-valued
+    option in one call (see _Description.formatValue) as integers in the same
+    forms as NUMERIC_VALUE_FORMATTER, returning them as a compact array.array
+    of 64 bit integers (or, if "useNumpy", a numpy int64 array). When none of
+    the values has a radix prefix (the usual case), they are all converted at
+    once by int(). Otherwise, or if any are invalid, each value is formatted
+    in turn so that the first invalid value can be reported with its index.
+    '''
+    isBatchFormatter = True
+    __prefixedValue = None  # matches a value with a radix prefix (or a leading 0, so octal)
+
+    def __init__(self, useNumpy=False):
+        self.__useNumpy = useNumpy
+
+    def __call__(self, optionName, values):
+        import array  # only imported when needed so as not to slow down start up
+        try:
+            formattedValues = array.array('q')
+        except ValueError:  # Python 2 has no 'q' typecode
+            formattedValues = array.array('l')
+        try:
+            if not self.__hasPrefixedValue(values):
+                formattedValues.extend(_map(int, values))
+                return self.__result(formattedValues)
+        except (ValueError, TypeError, OverflowError):
+            formattedValues = formattedValues[:0]
+
+        for index, value in enumerate(values):
+            try:
+                formattedValues.append(NUMERIC_VALUE_FORMATTER(optionName, value))
+            except CliParseError:
+                raise CliParseError('Option %s has a value at index %d that cannot be converted to a number: %s' % (optionName, index, _decodeArgument(value)))
+            except OverflowError:
+                raise CliParseError('Option %s has a value at index %d that is too large for a %d bit integer: %s' % (optionName, index, formattedValues.itemsize * 8, _decodeArgument(value)))
+        return self.__result(formattedValues)
+
+    @classmethod
+    def __hasPrefixedValue(cls, values):
+        'True if any of the (string) values may have a radix prefix, checked in a single regular expression search'
+        if cls.__prefixedValue is None:
+            import re
+            cls.__prefixedValue = re.compile(r'^0.', re.MULTILINE)
+        return cls.__prefixedValue.search('\n'.join(values)) is not None
+
+    def __result(self, formattedValues):
+        if not self.__useNumpy:
+            return formattedValues
+        try:
+            import numpy
+        except ImportError:
+            raise CliError('NUMERIC_NUMPY_VALUE_FORMATTER requires numpy')
+        return numpy.array(formattedValues, dtype=numpy.int64)
+
+
+STRING_VALUE_FORMATTER = lambda optionName, value: value if value.__class__ is bytes else str(value)  # bytes are left as they are
 DIGIT_STRING_VALUE_FORMATTER = __digitStringValueFormatter
 NUMERIC_VALUE_FORMATTER = __numericValueFormatter
+NUMERIC_ARRAY_VALUE_FORMATTER = _NumericArrayValueFormatter()
+NUMERIC_NUMPY_VALUE_FORMATTER = _NumericArrayValueFormatter(useNumpy=True)
+
+
+class memoizedValueFormatter(object):
+    '''Wraps a pure "valueFormatter" (one whose result only depends on the
+    value) so that its results are remembered in a thread-safe cache of the
+    "maxSize" most recently used values, e.g.
+        @option(valueFormatter=memoizedValueFormatter(NUMERIC_VALUE_FORMATTER))
+    The same formatted value is returned for every hit, so it must not be
+    modified. Errors are not cached and unhashable values are always
+    formatted. See cacheStats() for the number of hits and misses.
+    '''
+    def __init__(self, valueFormatter, maxSize=1024):
+        if not callable(valueFormatter):
+            raise CliError('memoizedValueFormatter: valueFormatter must be callable. Found: %s' % type(valueFormatter))
+        elif _iscoroutinefunction(valueFormatter) or _iscoroutinefunction(getattr(valueFormatter, '__call__', None)):
+            raise CliError('memoizedValueFormatter: cannot memoize an asynchronous valueFormatter')
+        elif getattr(valueFormatter, 'isBatchFormatter', False) is True:
+            raise CliError('memoizedValueFormatter: cannot memoize a batch valueFormatter')
+        elif not isinstance(maxSize, int) or maxSize < 1:
+            raise CliError('memoizedValueFormatter: maxSize must be an int of at least 1. Found: %s' % maxSize)
+        self.__valueFormatter = valueFormatter
+        self.__maxSize = maxSize
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__initCache()
+
+    def __initCache(self):
+        # Each cached value has a link [previous, next, value, formattedValue]
+        # in a circular list, ordered from the least to the most recently used
+        self.__links = {}
+        self.__root = []
+        self.__root[:] = [self.__root, self.__root, None, None]
+
+    def __call__(self, optionName, value):
+        try:
+            with self.__lock:
+                link = self.__links.get(value)
+                if link is not None:
+                    self.__hits += 1
+                    previous, following = link[0], link[1]
+                    previous[1] = following
+                    following[0] = previous
+                    self.__append(link)
+                    return link[3]
+                self.__misses += 1
+        except TypeError:  # unhashable
+            return self.__valueFormatter(optionName, value)
+
+        formattedValue = self.__valueFormatter(optionName, value)
+        with self.__lock:
+            if value not in self.__links:  # (unless another thread has just added it)
+                link = [None, None, value, formattedValue]
+                self.__append(link)
+                self.__links[value] = link
+                if len(self.__links) > self.__maxSize:
+                    leastRecentlyUsed = self.__root[1]
+                    self.__root[1] = leastRecentlyUsed[1]
+                    leastRecentlyUsed[1][0] = self.__root
+                    del self.__links[leastRecentlyUsed[2]]
+        return formattedValue
+
+    def __append(self, link):
+        'Makes "link" the most recently used (must hold the lock)'
+        root = self.__root
+        last = root[0]
+        link[0] = last
+        link[1] = root
+        last[1] = root[0] = link
+
+    @property
+    def valueFormatter(self):
+        return self.__valueFormatter
+
+    def cacheStats(self):
+        'Returns a dict of the "hits", "misses", "size" (number of cached values) and "maxSize" of the cache'
+        with self.__lock:
+            return {'hits': self.__hits, 'misses': self.__misses, 'size': len(self.__links), 'maxSize': self.__maxSize}
+
+    def clearCache(self):
+        'Forgets every cached value (and the hit/miss counts)'
+        with self.__lock:
+            self.__hits = 0
+            self.__misses = 0
+            self.__initCache()
 
 
 class CliError(Exception):
     'Base of all Cli Exceptions'
     def __init__(self, errorMessage):
+        Exception.__init__(self, errorMessage)  # so that it can be pickled
         self.__errorMessage = errorMessage
 
     def __str__(self):
@@ -174,6 +378,71 @@ class CliParseError(CliError):
         CliError.__init__(self, errorMessage)
 
 
+class CliStats(object):
+    '''Records the number of calls to, and the total wall time (in seconds) spent
+    in, each phase of using a Cli, when given as the "stats" parameter of Cli.
+    The phases are:
+       - "spec"          Looking up the compiled specification of the options class
+                         (while constructing a Cli). The first time, this includes:
+       - "loadSpec"      Loading the specification from the "cacheDir"
+       - "introspection" Finding and validating the decorated methods of the options class
+       - "compile"       Building the lookup tables and the class of the parsed options
+       - "saveSpec"      Saving the specification (and so constructing the help text) to the "cacheDir"
+       - "helpText"      Getting the help text from Cli.helpText (constructing it the first time)
+       - "parse"         Reading the arguments (including any formatting of their values)
+       - "validation"    Checking the mandatory options, value counts and positional arguments
+       - "build"         Creating the parsed options (or record)
+       - "format --name" Calling the valueFormatter of the option (or positional argument)
+                         called "name" (values that are formatted lazily are not recorded)
+    Each Cli records into its own CliStats (one may be shared by several Cli
+    instances and threads). Nothing is recorded, or timed, without one.
+    "callback" optional function called as callback(phase, seconds) every time
+               a phase completes.
+    '''
+    def __init__(self, callback=None):
+        self.__callback = callback
+        self.__lock = threading.Lock()
+        self.__phases = {}  # phase -> [calls, seconds]
+
+    def record(self, phase, seconds):
+        'Records a call to "phase" that took "seconds"'
+        with self.__lock:
+            phaseStats = self.__phases.get(phase)
+            if phaseStats is None:
+                self.__phases[phase] = [1, seconds]
+            else:
+                phaseStats[0] += 1
+                phaseStats[1] += seconds
+        if self.__callback is not None:
+            self.__callback(phase, seconds)
+
+    @property
+    def phases(self):
+        'Returns a dict of each recorded phase to a dict of its "calls" and "seconds"'
+        with self.__lock:
+            return dict([(phase, {'calls': calls, 'seconds': seconds}) for phase, (calls, seconds) in self.__phases.items()])
+
+    def calls(self, phase):
+        'Returns the number of calls to "phase"'
+        return self.phases.get(phase, {'calls': 0})['calls']
+
+    def seconds(self, phase):
+        'Returns the total time spent in "phase"'
+        return self.phases.get(phase, {'seconds': 0.0})['seconds']
+
+    def reset(self):
+        'Forgets everything recorded so far'
+        with self.__lock:
+            self.__phases.clear()
+
+    def __str__(self):
+        phases = self.phases
+        lines = ['%-30s %8s %12s' % ('Phase', 'Calls', 'Seconds')]
+        for phase in sorted(phases):
+            lines.append('%-30s %8d %12.6f' % (phase, phases[phase]['calls'], phases[phase]['seconds']))
+        return '\n'.join(lines)
+
+
 class option(object):
     def __init__(self, *args, **kwargs):
         if len(args) == 0:
@@ -195,6 +464,8 @@ class option(object):
         self.__min = None
         self.__max = None
         self.__valueFormatter = None
+        self.__streamed = None
+        self.__stdin = None
 
     def __call__(self, f=None):
         if f is not None:
@@ -234,7 +505,19 @@ class option(object):
     def valueFormatter(self):
         return self.__valueFormatter
 
-    __SUPPORTED_OPTIONS = ['shortName', 'default', 'mandatory', 'multiValued', 'min', 'max', 'valueFormatter']
+    @property
+    def streamed(self):
+        return self.__streamed
+
+    @property
+    def stdin(self):
+        return self.__stdin
+
+    @property
+    def stdinDelimiter(self):
+        return self.__options['stdinDelimiter'] if 'stdinDelimiter' in self.__options else None
+
+    __SUPPORTED_OPTIONS = ['shortName', 'default', 'mandatory', 'multiValued', 'min', 'max', 'valueFormatter', 'streamed', 'stdin', 'stdinDelimiter']
 
     def __validateOptions(self, wrappedMethodName):
         unrecognisedOptions = []
@@ -250,6 +533,8 @@ class option(object):
         self.__min = option.__getIntValue(wrappedMethodName, self.__options, 'min')
         self.__max = option.__getIntValue(wrappedMethodName, self.__options, 'max')
         self.__valueFormatter = option.__getCallableValue(wrappedMethodName, self.__options, 'valueFormatter')
+        self.__streamed = option.__getBoolValue(wrappedMethodName, self.__options, 'streamed')
+        self.__stdin = option.__getBoolValue(wrappedMethodName, self.__options, 'stdin')
 
     @classmethod
     def __getBoolValue(cls, wrappedMethodName, options, optionName):
@@ -316,11 +601,249 @@ class Cli(object):
     "optionsClass" as a template for defining them.
     "prog" optional name of the program that is using these options (default os.path.basename(sys.argv[0]))
     "purpose" optional description of program that is included in the auto-generated help text.
+    "cacheDir" optional directory in which the compiled specification (including the help text) is
+               persisted between runs, keyed on a fingerprint of the source of the options class and
+               the version of this library. Later runs load it instead of introspecting the options class.
+    "lazyFormatting" optional flag (default False) that defers calling each option's valueFormatter until
+               the option's method is first called (the result is then remembered). Call validate() on
+               the parsed options to format (and so validate) every value straight away (unless the
+               options class defines a validate method of its own, which is called instead).
+    "stats" optional CliStats that records the time spent in each phase of constructing this Cli and
+               parsing with it.
+    "expandArgumentFiles" optional flag (default False) that replaces every "@path" argument with the
+               arguments in the file at "path" (one per line, ignoring blank lines), which can include
+               further "@path" arguments. The files are read incrementally (through mmap) while parsing,
+               so huge argument lists need not be held in memory, or be passed on the command line.
+    "bytesArguments" optional flag (default False) that parses the arguments as bytes, which are never
+               decoded: the arguments from sys.argv are encoded with os.fsencode, and "args" can also be a
+               buffer (bytes, bytearray or mmap) of NUL terminated arguments, such as /proc/<pid>/cmdline
+               (less the program itself). The option values (including those of argument files and stdin)
+               are bytes unless a valueFormatter converts them (the default one leaves them as bytes).
+    "allowAbbreviations" optional flag (default False) that accepts any unambiguous prefix of a long option
+               name (e.g. --out for --outputFile), looked up in a trie of the names built once per options
+               class. An ambiguous prefix is reported along with every option it could be.
+    "stdin" optional binary file object or file descriptor from which the values of an @option(stdin=True)
+               given the value "-" are read (default sys.stdin). The values are delimited by newlines (or
+               NULs with stdinDelimiter='\\0') and are read (and formatted) incrementally as the iterator
+               returned by the option's method is consumed, so they can only be iterated over once.
+
+    The compiled specification of each options class is cached process-wide
+    (keyed on the class object itself, so a redefined class is compiled
+    afresh), making every Cli construction after the first one O(1). The
+    cache only refers to the classes weakly, so a class that is no longer
+    used (e.g. one created dynamically) is released along with its specs.
+    Old-style classes (Python 2) are not cached.
+
+    A Cli instance can be shared by any number of threads parsing at once:
+    the compiled specification is immutable (the help text and formatted
+    defaults are each constructed exactly once, under a lock, when first
+    requested) and all the state of a parse is held by objects created for
+    that parse alone. The valueFormatters must themselves be thread-safe.
+    The parsed options are not shared by anything else, but (with
+    lazyFormatting) their values may be formatted more than once if they
+    are first accessed by several threads at once.
     '''
-    def __init__(self, optionsClass, prog=os.path.basename(sys.argv[0]), purpose=None):
-        self.__optionsClass = optionsClass
-        self.__options, self.__positionalArguments = Cli.__getSupportedOptions(optionsClass)
-        self.__helpText = Cli.__constructHelpText(prog, purpose, self.__options, self.__positionalArguments)
+    # Each options class holds its own {(prog, purpose): _Spec} as SPECS_ATTRIBUTE,
+    # as the specs refer to their class (so would keep it alive if held here)
+    __cachedClasses = weakref.WeakKeyDictionary()  # optionsClass -> True
+    __SPECS_ATTRIBUTE = '_cliSpecs'
+    __specCacheLock = threading.Lock()
+    __specCacheStats = {'hits': 0, 'misses': 0}
+
+    def __init__(self, optionsClass, prog=os.path.basename(sys.argv[0]), purpose=None, cacheDir=None, lazyFormatting=False, stats=None, expandArgumentFiles=False, stdin=None, bytesArguments=False, allowAbbreviations=False):
+        self.__spec = Cli.__timed(stats, 'spec', Cli._getSpec, optionsClass, prog, purpose, cacheDir, stats)
+        self.__lazyFormatting = lazyFormatting
+        self.__stats = stats
+        self.__expandArgumentFiles = expandArgumentFiles
+        self.__stdin = stdin
+        self.__bytesArguments = bytesArguments
+        self.__allowAbbreviations = allowAbbreviations
+
+    @classmethod
+    def __timed(cls, stats, phase, function, *args):
+        'Returns function(*args), recording the time it took as "phase" in "stats" (if any)'
+        if stats is None:
+            return function(*args)
+        startTime = _timer()
+        try:
+            return function(*args)
+        finally:
+            stats.record(phase, _timer() - startTime)
+
+    @classmethod
+    def _getSpec(cls, optionsClass, prog, purpose, cacheDir, stats=None):
+        '''Returns the cached _Spec for the given "optionsClass", "prog" and
+        "purpose", compiling (and caching) it if necessary.
+        (Also used by _restoreParsedOptions, hence only a single underscore.)
+        '''
+        key = (prog, purpose)
+        with Cli.__specCacheLock:
+            specs = Cli.__cachedSpecs(optionsClass)
+            if key in specs:
+                Cli.__specCacheStats['hits'] += 1
+                return specs[key]
+            Cli.__specCacheStats['misses'] += 1
+            otherSpec = next(iter(specs.values())) if specs else None
+
+        cacheFile = Cli.__getCacheFile(optionsClass, prog, purpose, cacheDir)
+        spec = Cli.__timed(stats if cacheFile else None, 'loadSpec', Cli.__loadSpec, optionsClass, prog, purpose, cacheFile)
+        if spec is None:
+            if otherSpec is not None:  # only the help text depends on "prog" and "purpose"
+                options, positionalArguments = otherSpec.options, otherSpec.positionalArguments
+            else:
+                options, positionalArguments = Cli.__timed(stats, 'introspection', Cli.__getSupportedOptions, optionsClass)
+            spec = Cli.__timed(stats, 'compile', _Spec, optionsClass, options, positionalArguments, prog, purpose)
+            Cli.__timed(stats if cacheFile else None, 'saveSpec', Cli.__saveSpec, spec, cacheFile)
+
+        if not isinstance(optionsClass, type):  # an old-style class (Python 2)
+            return spec
+        with Cli.__specCacheLock:
+            # Another thread may have compiled the same spec in the meantime,
+            # in which case every Cli shares the one that was cached first
+            specs = Cli.__cachedSpecs(optionsClass)
+            if not specs:
+                setattr(optionsClass, Cli.__SPECS_ATTRIBUTE, specs)
+                Cli.__cachedClasses[optionsClass] = True
+            return specs.setdefault(key, spec)
+
+    @classmethod
+    def __cachedSpecs(cls, optionsClass):
+        'Returns the {(prog, purpose): _Spec} cached for "optionsClass" (not inherited from a base class)'
+        if isinstance(optionsClass, type) and optionsClass in Cli.__cachedClasses:
+            return optionsClass.__dict__[Cli.__SPECS_ATTRIBUTE]
+        return {}
+
+    @classmethod
+    def specCacheStats(cls):
+        'Returns a dict of the "hits", "misses" and "size" (number of cached specs) of the process-wide spec cache'
+        with Cli.__specCacheLock:
+            size = sum([len(Cli.__cachedSpecs(optionsClass)) for optionsClass in list(Cli.__cachedClasses.keys())])
+            return {'hits': Cli.__specCacheStats['hits'], 'misses': Cli.__specCacheStats['misses'], 'size': size}
+
+    @classmethod
+    def clearSpecCache(cls):
+        'Empties the process-wide spec cache and resets its statistics'
+        with Cli.__specCacheLock:
+            for optionsClass in list(Cli.__cachedClasses.keys()):
+                delattr(optionsClass, Cli.__SPECS_ATTRIBUTE)
+            Cli.__cachedClasses.clear()
+            Cli.__specCacheStats['hits'] = 0
+            Cli.__specCacheStats['misses'] = 0
+
+    @classmethod
+    def __getCacheFile(cls, optionsClass, prog, purpose, cacheDir):
+        '''Returns the path of the file within "cacheDir" that holds the
+        compiled spec, named after a fingerprint of the library version, "prog",
+        "purpose" and the source files (path, size and modification time) and
+        attributes of every class in the options class hierarchy.
+        Returns None if there is no "cacheDir" or the options class was not
+        loaded from a source file.
+        '''
+        if cacheDir is None:
+            return None
+
+        import hashlib  # only imported when needed so as not to slow down start up
+        fingerprint = hashlib.sha1()
+        fingerprint.update(repr((__version__, prog, purpose)).encode('utf-8'))
+        for klass in inspect.getmro(optionsClass):
+            if klass is object:
+                continue
+            path = getattr(sys.modules.get(klass.__module__), '__file__', None)
+            if path is None:
+                return None
+            if path.endswith('.pyc') or path.endswith('.pyo'):
+                path = path[:-1]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            fingerprint.update(repr((os.path.abspath(path), stat.st_size, stat.st_mtime,
+                                     klass.__module__, klass.__name__, sorted(klass.__dict__.keys()))).encode('utf-8'))
+
+        return os.path.join(cacheDir, 'Cli-%s.json' % fingerprint.hexdigest())
+
+    @classmethod
+    def __loadSpec(cls, optionsClass, prog, purpose, cacheFile):
+        '''Returns the spec persisted in "cacheFile" or None if there is no
+        such (valid) file. The persisted spec has already been validated, so
+        only the decorators of the options it names are looked up.
+        '''
+        if cacheFile is None:
+            return None
+
+        import json  # only imported when needed so as not to slow down start up
+        try:
+            cacheStream = open(cacheFile, 'r')
+            try:
+                cachedSpec = json.load(cacheStream)
+            finally:
+                cacheStream.close()
+
+            # (json returns unicode in Python 2, but method names must be str)
+            options = {}
+            for methodName in map(str, cachedSpec['options']):
+                options[methodName] = cls.__createDescription(optionsClass, methodName, getattr(optionsClass, methodName), False)
+            positionalArguments = [cls.__createDescription(optionsClass, methodName, getattr(optionsClass, methodName), False)
+                                   for methodName in map(str, cachedSpec['positionalArguments'])]
+            return _Spec(optionsClass, options, positionalArguments, prog, purpose, cachedSpec['helpText'])
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    @classmethod
+    def __saveSpec(cls, spec, cacheFile):
+        '''Persists the given spec (and its help text) to "cacheFile".
+        Failure to write the cache is ignored as it only affects performance.
+        '''
+        if cacheFile is None:
+            return
+
+        import json
+        cachedSpec = {'options': sorted(spec.options.keys()),
+                      'positionalArguments': [argument.methodName for argument in spec.positionalArguments],
+                      'helpText': spec.helpText}
+        temporaryFile = '%s.%d.%d.tmp' % (cacheFile, os.getpid(), threading.current_thread().ident)
+        try:
+            cacheDir = os.path.dirname(cacheFile)
+            if not os.path.isdir(cacheDir):
+                os.makedirs(cacheDir)
+            cacheStream = open(temporaryFile, 'w')
+            try:
+                json.dump(cachedSpec, cacheStream)
+            finally:
+                cacheStream.close()
+            os.rename(temporaryFile, cacheFile)
+        except (IOError, OSError):
+            if os.path.exists(temporaryFile):
+                os.remove(temporaryFile)
+
+    @classmethod
+    def __createDescription(cls, optionsClass, methodName, method, validate=True):
+        '''Returns the description of the option defined by the given @option
+        or @positional decorated "method", or None if it is neither.
+        '''
+        if method.__class__.__name__ == 'option':
+            return _OptionDescription(optionsClass,
+                                      methodName,
+                                      method.wrappedMethod.__doc__,
+                                      method.shortName,
+                                      method.default,
+                                      method.mandatory,
+                                      method.multiValued,
+                                      method.min,
+                                      method.max,
+                                      method.valueFormatter,
+                                      method.streamed,
+                                      method.stdin,
+                                      method.stdinDelimiter,
+                                      validate)
+        elif method.__class__.__name__ == 'positional':
+            return _PositionalDescription(optionsClass,
+                                          methodName,
+                                          method.wrappedMethod.__doc__,
+                                          method.relativePosition,
+                                          method.valueFormatter)
+        else:
+            return None
 
     @classmethod
     def __getSupportedOptions(cls, optionsClass):
@@ -334,23 +857,9 @@ class Cli(object):
             if methodName.startswith('get') or methodName.startswith('is'):
                 method = getattr(optionsClass, methodName)
                 if callable(method) and inspect.isclass(type(method)):
-                    if method.__class__.__name__ == 'option':
-                        supportedOptions[methodName] = _OptionDescription(optionsClass,
-                                                                          methodName,
-                                                                          method.wrappedMethod.__doc__,
-                                                                          method.shortName,
-                                                                          method.default,
-                                                                          method.mandatory,
-                                                                          method.multiValued,
-                                                                          method.min,
-                                                                          method.max,
-                                                                          method.valueFormatter)
-                    elif method.__class__.__name__ == 'positional':
-                        supportedOptions[methodName] = _PositionalDescription(optionsClass,
-                                                                              methodName,
-                                                                              method.wrappedMethod.__doc__,
-                                                                              method.relativePosition,
-                                                                              method.valueFormatter)
+                    description = cls.__createDescription(optionsClass, methodName, method)
+                    if description is not None:
+                        supportedOptions[methodName] = description
 
         cls.__validateShortNames(supportedOptions)
         cls.__validatePositionalArguments(supportedOptions)
@@ -405,18 +914,713 @@ class Cli(object):
                     raise CliParseError('Positional argument %s has a position that clashes with %s' % (option, positionalArguments[option.position]))
                 positionalArguments[option.position] = option
 
+    @property
+    def helpText(self):
+        'The help text (only constructed when first requested)'
+        if self.__stats is None:
+            return self.__spec.helpText
+        return Cli.__timed(self.__stats, 'helpText', lambda: self.__spec.helpText)
+
+    def writeHelp(self, file=None, width=None, optionName=None):
+        '''Writes the help text to "file" (default sys.stdout) a line at a
+        time, rather than constructing it as a whole, so it can be any object
+        with a write method, such as the stdin of a pager process.
+        The descriptions of the options are wrapped to "width" columns
+        (default: the width of the terminal) and the column of option names is
+        only as wide as most of them need. The layout is computed once per
+        options class and width.
+        If "optionName" (e.g. outputFile, --outputFile or -o) is given, then
+        only the help for that option is written, without laying out the rest
+        (as for the command line arguments --help outputFile).
+        '''
+        option = None
+        if optionName is not None:
+            option = self.__spec.optionNamed(optionName)
+            if option is None:
+                raise CliError('Unrecognised option: %s' % optionName)
+        self.__spec.writeHelp(sys.stdout.write if file is None else file.write, width or _terminalWidth(), option)
+
+    @property
+    def recordFields(self):
+        '''The names of the fields of the records returned by parseArguments(asRecord=True): the options (ordered by name)
+        then the positional arguments. A name that is a keyword has an underscore appended (e.g. from_).
+        '''
+        return self.__spec.recordClass._fields
+
+    def completions(self, prefix):
+        '''Returns the option tokens (e.g. --outputFile) that start with
+        "prefix", ordered by name. Long options are looked up in the same
+        trie as abbreviations (see allowAbbreviations).
+        '''
+        if prefix.startswith('--'):
+            return ['--' + name for name, option in self.__spec.optionTrie.candidates(prefix[2:])]
+        return sorted([token for token in self.__spec.optionTokens if token.startswith(prefix)])
+
+    def completionScript(self, shell='bash'):
+        '''Returns a self-contained completion script for "shell" (bash, zsh
+        or fish) that completes the options of prog (and, in zsh, names the
+        positional arguments in order) without ever starting Python.
+        The script records a fingerprint of the options it was generated from.
+        '''
+        return _CompletionScript(self.__spec, shell).script
+
+    def writeCompletionScript(self, path, shell='bash'):
+        '''Writes the completion script for "shell" to "path" unless the script
+        already there was generated from the same options, returning True if
+        the script was (re)written and False if it was up to date.
+        '''
+        completionScript = _CompletionScript(self.__spec, shell)
+        try:
+            existingScript = open(path, 'r')
+            try:
+                for line in existingScript:
+                    if line.startswith(_CompletionScript.FINGERPRINT_PREFIX):
+                        if line[len(_CompletionScript.FINGERPRINT_PREFIX):].strip() == completionScript.fingerprint:
+                            return False
+                        break
+            finally:
+                existingScript.close()
+        except (IOError, OSError):
+            pass  # no script yet
+        scriptFile = open(path, 'w')
+        try:
+            scriptFile.write(completionScript.script)
+        finally:
+            scriptFile.close()
+        return True
+
+    def parseArguments(self, args=None, asRecord=False):
+        '''Parses the options specified within the optional arguments.
+        "args" can be any iterable of strings (list, tuple, generator etc.)
+        and is read exactly once. If "args" is omitted, then the options are
+        picked up from sys.argv[1:].
+        If "asRecord" is True, then an immutable record (a namedtuple with a
+        field named after each option, in the order of Cli.recordFields)
+        holding the formatted values is returned instead of the options class.
+        '''
+        return _ParsedOptions(self.__spec, self.__arguments(args), self.__lazyFormatting, asRecord=asRecord, stats=self.__stats, stdin=self.__stdin, isBytes=self.__bytesArguments, allowAbbreviations=self.__allowAbbreviations).optionsInstance
+
+    def parseArgumentsAsync(self, args=None, maxConcurrency=100):
+        '''Parses the options specified within the optional arguments like
+        parseArguments, but returns an awaitable (an asyncio Future) for the
+        parsed options. Options whose valueFormatter is a coroutine function
+        ("async def") can only be parsed this way: their values are formatted
+        concurrently by asyncio tasks, no more than "maxConcurrency" (None for
+        no limit) at a time. Other valueFormatters are run as for
+        parseArguments.
+        Errors found while parsing are raised immediately, whereas any error
+        raised by an asynchronous valueFormatter is raised when awaited.
+        Must be called from within a running asyncio event loop (e.g. from a
+        coroutine), otherwise a CliError is raised.
+        Requires Python 3.5 or later.
+        '''
+        import asyncio
+
+        if maxConcurrency is not None and maxConcurrency < 1:
+            raise CliError('maxConcurrency must be at least 1. Found %s' % maxConcurrency)
+        return _AsyncFormatting(asyncio, _ParsedOptions(self.__spec, self.__arguments(args), self.__lazyFormatting, True, stats=self.__stats, stdin=self.__stdin, isBytes=self.__bytesArguments, allowAbbreviations=self.__allowAbbreviations), maxConcurrency).future
+
+    def parseMany(self, argsList, raiseErrors=False):
+        '''Parses each of the arguments in the iterable "argsList" (each of
+        which can be any iterable of strings, as for parseArguments) against
+        this Cli's options.
+        This is a generator that yields an (index, result) pair for each
+        arguments in turn, where "result" is either the parsed options or,
+        if the arguments are invalid, the CliError (e.g. CliParseError) that
+        parseArguments would have raised. If "raiseErrors" is True then the
+        CliError is raised instead.
+        '''
+        spec = self.__spec
+        lazyFormatting = self.__lazyFormatting
+        stats = self.__stats
+        stdin = self.__stdin
+        isBytes = self.__bytesArguments
+        allowAbbreviations = self.__allowAbbreviations
+        for index, args in enumerate(argsList):
+            try:
+                yield index, _ParsedOptions(spec, self.__arguments(args), lazyFormatting, stats=stats, stdin=stdin, isBytes=isBytes, allowAbbreviations=allowAbbreviations).optionsInstance
+            except CliError as e:
+                if raiseErrors:
+                    raise
+                yield index, e
+
+    def parseManyInParallel(self, argsList, maxWorkers=None, chunkSize=100, ordered=True, raiseErrors=False):
+        '''Parses each of the arguments in the iterable "argsList" like
+        parseMany, but spreads them (in chunks of "chunkSize") across a pool of
+        "maxWorkers" processes (default: one per CPU). This pays off when the
+        valueFormatters are expensive.
+        This is a generator that yields the same (index, result) pairs as
+        parseMany. If "ordered" is False, the results of each chunk are
+        yielded as soon as that chunk has been parsed, rather than in order.
+        The options class (and its valueFormatters) must be importable and the
+        option values picklable, as the parsed options are pickled in order to
+        be returned from the worker processes.
+        Requires the concurrent.futures module (the "futures" package in
+        Python 2).
+        '''
+        try:
+            from concurrent import futures
+        except ImportError:
+            raise CliError('parseManyInParallel requires the concurrent.futures module')
+        import multiprocessing
+
+        spec = self.__spec
+        maxWorkers = maxWorkers or multiprocessing.cpu_count()
+        maxPending = 2 * maxWorkers  # bounds the memory used by a huge argsList
+        pending = collections.deque()
+
+        def nextParsedChunk():
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = next(iter(futures.wait(pending, return_when=futures.FIRST_COMPLETED).done))
+                pending.remove(future)
+            return future.result()
+
+        executor = futures.ProcessPoolExecutor(maxWorkers)
+        try:
+            for chunk in Cli.__chunkArguments(argsList, chunkSize):
+                pending.append(executor.submit(_parseChunk, spec.optionsClass, spec.prog, spec.purpose, self.__lazyFormatting, self.__expandArgumentFiles, self.__bytesArguments, self.__allowAbbreviations, chunk))
+                while len(pending) >= maxPending or (pending and pending[0].done()):
+                    for index, result in nextParsedChunk():
+                        if raiseErrors and isinstance(result, CliError):
+                            raise result
+                        yield index, result
+            while pending:
+                for index, result in nextParsedChunk():
+                    if raiseErrors and isinstance(result, CliError):
+                        raise result
+                    yield index, result
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown()
+
+    @classmethod
+    def __chunkArguments(cls, argsList, chunkSize):
+        '''Yields lists of up to "chunkSize" (index, args) pairs from "argsList",
+        with each args turned into a list so it can be sent to another process.
+        '''
+        chunk = []
+        for index, args in enumerate(argsList):
+            if not isinstance(args, (list, tuple, bytes, bytearray) + _STRING_TYPES):
+                try:
+                    args = list(args)
+                except TypeError:
+                    pass  # _parseChunk reports the error
+            chunk.append((index, args))
+            if len(chunk) == chunkSize:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def __arguments(self, args):
+        '''Returns an iterator over the given iterable of arguments (or
+        sys.argv[1:] if None), expanding any argument files.
+        '''
+        if self.__bytesArguments:
+            args = Cli.__iterBytesArguments(args)
+        elif args is None:
+            args = itertools.islice(sys.argv, 1, None)
+        else:
+            args = Cli.__iterArguments(args)
+        if self.__expandArgumentFiles:
+            args = _expandArgumentFiles(args, isBytes=self.__bytesArguments)
+        return args
+
+    @classmethod
+    def __iterBytesArguments(cls, args):
+        '''Returns an iterator over the given arguments as bytes: sys.argv[1:]
+        (if None) encoded as the file system encoding, the NUL terminated
+        arguments of a bytes buffer, or any other iterable of bytes.
+        '''
+        import mmap  # only imported when needed so as not to slow down start up
+        if args is None:
+            return _map(_encodeArgument, itertools.islice(sys.argv, 1, None))
+        elif isinstance(args, (bytes, bytearray, mmap.mmap)):
+            return _splitNulTerminated(args)
+        return Cli.__iterArguments(args)
+
     @classmethod
-    def __constructHelpText(cls, prog, purpose, options, positionalArguments):
-        'Constructs the help text from the given options'
+    def __iterArguments(cls, args):
+        'Returns an iterator over the given iterable of arguments'
+        if isinstance(args, _STRING_TYPES):
+            raise CliParseError('args must be an iterable of strings. Found "%s"' % type(args))
+        try:
+            return iter(args)
+        except TypeError:
+            raise CliParseError('args must be an iterable of strings. Found "%s"' % type(args))
+
+
+class CliSubcommands(object):
+    '''Dispatches git-style subcommands ("prog subcommand arguments...") each
+    with its own options class, registered by its dotted import path (e.g.
+    "mytool.build.BuildOptions" or "mytool.build:BuildOptions"), e.g.
+        subcommands = CliSubcommands('mytool', 'Builds and deploys things')
+        subcommands.add('build', 'mytool.build.BuildOptions', 'Builds the project')
+        subcommands.add('deploy', 'mytool.deploy.DeployOptions', 'Deploys the build')
+        subcommand, options = subcommands.parseArguments()
+    Only the module of the chosen subcommand is imported (and its options
+    class introspected), and the top-level help text is constructed from the
+    registered names and summaries alone, so start up time does not grow with
+    the number of subcommands.
+    "cliOptions" are passed on to the Cli of each subcommand (e.g. cacheDir,
+    lazyFormatting, stats), whose prog is "prog subcommand".
+    '''
+    def __init__(self, prog=os.path.basename(sys.argv[0]), purpose=None, **cliOptions):
+        self.__prog = prog
+        self.__purpose = purpose
+        self.__cliOptions = cliOptions
+        self.__subcommands = {}  # name -> (optionsClassPath, summary)
+        self.__names = []
+        self.__clis = {}
+        self.__lock = threading.Lock()
+        self.__helpText = None
+
+    def add(self, name, optionsClassPath, summary=None):
+        'Registers the subcommand "name" whose options class is imported from "optionsClassPath" when it is used. Returns self.'
+        if not isinstance(name, _STRING_TYPES) or not name or name.startswith('-'):
+            raise CliError('Invalid subcommand name "%s"' % (name,))
+        elif name in self.__subcommands:
+            raise CliError('Subcommand "%s" has already been added' % name)
+        elif not isinstance(optionsClassPath, _STRING_TYPES) or '.' not in optionsClassPath.replace(':', '.'):
+            raise CliError('Subcommand "%s" must have an options class path of the form "module.OptionsClass". Found: %s' % (name, optionsClassPath))
+        with self.__lock:
+            self.__subcommands[name] = (optionsClassPath, summary)
+            self.__names.append(name)
+            self.__helpText = None
+        return self
+
+    @property
+    def subcommands(self):
+        'The names of the subcommands in the order they were added'
+        return tuple(self.__names)
+
+    @property
+    def helpText(self):
+        'The top-level help text listing the subcommands (only constructed when first requested)'
+        helpText = self.__helpText
+        if helpText is None:
+            with self.__lock:
+                if self.__helpText is None:
+                    self.__helpText = self.__constructHelpText()
+                helpText = self.__helpText
+        return helpText
+
+    def __constructHelpText(self):
+        'Constructs the help text from the registered names and summaries (so without importing anything)'
+        helpTextLines = ['Usage: %s <subcommand> [arguments]' % self.__prog]
+        if self.__purpose:
+            helpTextLines.append(self.__purpose)
+        helpTextLines.append('where <subcommand> is one of:')
+        maxNameLength = max([len(name) for name in self.__names] + [0])
+        for name in self.__names:
+            summary = self.__subcommands[name][1]
+            helpTextLines.append(('%-*s %s' % (maxNameLength, name, summary or '')).rstrip())
+        helpTextLines.append('Use "%s <subcommand> --help" for the help text of a subcommand' % self.__prog)
+        return '\n'.join(helpTextLines)
+
+    def cli(self, name):
+        'Returns the Cli of the subcommand "name", importing its options class when first requested'
+        try:
+            return self.__clis[name]
+        except KeyError:
+            pass
+        try:
+            optionsClassPath = self.__subcommands[name][0]
+        except KeyError:
+            raise CliParseError('Unknown subcommand "%s". Must be one of: %s' % (name, ', '.join(self.__names)))
+        with self.__lock:
+            if name not in self.__clis:
+                optionsClass = CliSubcommands.__importOptionsClass(name, optionsClassPath)
+                self.__clis[name] = Cli(optionsClass, '%s %s' % (self.__prog, name), **self.__cliOptions)
+            return self.__clis[name]
+
+    @classmethod
+    def __importOptionsClass(cls, name, optionsClassPath):
+        'Imports the options class at "optionsClassPath" ("module.Class" or "module:Class")'
+        if ':' in optionsClassPath:
+            moduleName, className = optionsClassPath.split(':', 1)
+        else:
+            moduleName, className = optionsClassPath.rsplit('.', 1)
+        try:
+            __import__(moduleName)
+            return getattr(sys.modules[moduleName], className)
+        except (ImportError, AttributeError) as e:
+            raise CliError('Cannot import the options class "%s" of subcommand "%s": %s' % (optionsClassPath, name, e))
+
+    def parseArguments(self, args=None, asRecord=False):
+        '''Parses the arguments (sys.argv[1:] if None), the first of which
+        names the subcommand, returning (subcommand name, parsed options of
+        the remaining arguments). The top-level help text is raised (as a
+        CliHelpError) if there is no subcommand or it is --help or -?.
+        '''
+        isBytes = self.__cliOptions.get('bytesArguments', False)
+        if args is None:
+            args = itertools.islice(sys.argv, 1, None)
+            if isBytes:
+                args = _map(_encodeArgument, args)
+        elif isBytes and isinstance(args, (bytes, bytearray)):
+            args = _splitNulTerminated(args)
+        elif isinstance(args, _STRING_TYPES):
+            raise CliParseError('args must be an iterable of strings. Found "%s"' % type(args))
+        args = iter(args)
+        try:
+            name = _decodeArgument(next(args))
+        except StopIteration:
+            raise CliHelpError(self.helpText)
+        if name in _Spec.HELP_TOKENS:
+            raise CliHelpError(self.helpText)
+        return name, self.cli(name).parseArguments(args, asRecord)
+
+
+class _Spec(object):
+    '''The compiled specification of an options class.
+    Never modified once constructed, so it can be shared by every Cli
+    instance using the same options class.
+    '''
+    HELP_TOKENS = ('--help', '-?')
+    __lazyInitLock = threading.Lock()
+
+    def __init__(self, optionsClass, options, positionalArguments, prog, purpose, helpText=None):
+        self.__optionsClass = optionsClass
+        self.__options = options
+        self.__positionalArguments = positionalArguments
+        self.__prog = prog
+        self.__purpose = purpose
+        self.__helpText = helpText
+
+        self.__allOptions = options.copy()
+        for argument in positionalArguments:
+            self.__allOptions[argument.methodName] = argument
+
+        self.__recordFields = tuple([options[methodName] for methodName in sorted(options, key=lambda methodName: options[methodName].name)] + list(positionalArguments))
+        self.__recordClass = None
+        self.__resultClass = _Spec.__createResultClass(self)
+        self.__valueSetters = {}
+        for methodName, option in self.__allOptions.items():
+            self.__valueSetters[option.name] = (option, self.__resultClass.__dict__[_Spec.__slotName(methodName)].__set__)
+
+        # Single lookup table for every command line token that names an
+        # option. The help tokens map to None.
+        self.__optionTokens = {}
+        self.__optionsByName = {}
+        self.__requiredOptions = []
+        self.__asyncDefaultOptions = []
+        for option in options.values():
+            self.__optionTokens['--' + option.name] = option
+            if option.hasShortName:
+                self.__optionTokens['-' + option.shortName] = option
+            self.__optionsByName[option.name] = option
+            if option.isMandatory or (option.isMultiValued and option.hasMinCount and option.minCount > 0):
+                self.__requiredOptions.append(option)
+            if option.isAsync and option.hasDefault and not option.isBoolean:
+                self.__asyncDefaultOptions.append(option)
+        for token in _Spec.HELP_TOKENS:
+            self.__optionTokens[token] = None
+        self.__optionByteTokens = None
+        self.__optionTrie = None
+        self.__suggestionIndex = None
+        self.__helpEntries = None
+        self.__helpLayouts = {}  # width -> _HelpLayout
+
+    @property
+    def optionsClass(self):
+        return self.__optionsClass
+
+    @property
+    def prog(self):
+        return self.__prog
+
+    @property
+    def purpose(self):
+        return self.__purpose
+
+    @property
+    def options(self):
+        return self.__options
+
+    @property
+    def positionalArguments(self):
+        return self.__positionalArguments
+
+    @property
+    def allOptions(self):
+        'All options and positional arguments keyed on their method name'
+        return self.__allOptions
+
+    @property
+    def optionTokens(self):
+        'Maps each long (--name), short (-n) and help token to its option (None for help)'
+        return self.__optionTokens
+
+    @property
+    def optionByteTokens(self):
+        'optionTokens keyed on the tokens encoded as bytes (only created when first requested)'
+        if self.__optionByteTokens is None:
+            with _Spec.__lazyInitLock:
+                if self.__optionByteTokens is None:
+                    self.__optionByteTokens = dict([(_encodeArgument(token), option) for token, option in self.__optionTokens.items()])
+        return self.__optionByteTokens
+
+    @property
+    def optionTrie(self):
+        'The _OptionTrie of the long option names (only created when first requested)'
+        if self.__optionTrie is None:
+            with _Spec.__lazyInitLock:
+                if self.__optionTrie is None:
+                    self.__optionTrie = _OptionTrie([(token[2:], option) for token, option in self.__optionTokens.items() if token.startswith('--')])
+        return self.__optionTrie
+
+    @property
+    def suggestionIndex(self):
+        'The _SuggestionIndex of the option tokens (only created when first requested, i.e. on the first unrecognised option)'
+        if self.__suggestionIndex is None:
+            with _Spec.__lazyInitLock:
+                if self.__suggestionIndex is None:
+                    self.__suggestionIndex = _SuggestionIndex([token for token in self.__optionTokens if token != '-?'])
+        return self.__suggestionIndex
+
+    @property
+    def optionsByName(self):
+        return self.__optionsByName
+
+    def optionNamed(self, name):
+        '''Returns the option named "name" (which can also be one of its tokens,
+        i.e. --name or -n) or the positional argument of that name, or None if
+        there is no such option.
+        '''
+        option = self.__optionTokens.get(name) or self.__optionsByName.get(name)
+        if option is None:
+            for argument in self.__positionalArguments:
+                if argument.name == name:
+                    return argument
+        return option
+
+    @property
+    def requiredOptions(self):
+        'Options that are mandatory or must have a minimum number of values'
+        return self.__requiredOptions
+
+    @property
+    def asyncDefaultOptions(self):
+        'Options with an asynchronous valueFormatter and a default, which is formatted (by it) whenever they are not specified'
+        return self.__asyncDefaultOptions
+
+    @property
+    def resultClass(self):
+        'The subclass of the options class that is instantiated to hold the parsed options'
+        return self.__resultClass
+
+    @property
+    def recordFields(self):
+        'The options (ordered by name) followed by the positional arguments, in the order of the fields of recordClass'
+        return self.__recordFields
+
+    @property
+    def recordClass(self):
+        'The namedtuple class (only created when first requested) of the records returned by parseArguments(asRecord=True)'
+        if self.__recordClass is None:
+            with _Spec.__lazyInitLock:
+                if self.__recordClass is None:
+                    self.__recordClass = collections.namedtuple(self.__optionsClass.__name__ + 'Record', [_Spec.__recordFieldName(option.name) for option in self.__recordFields])
+        return self.__recordClass
+
+    @classmethod
+    def __recordFieldName(cls, name):
+        '''The name of the recordClass field holding the value of the option
+        "name", which namedtuple would reject if it were a keyword (e.g. from
+        becomes from_) or started with an underscore (e.g. _id becomes option_id).
+        '''
+        import keyword  # only imported when needed so as not to slow down start up
+
+        if keyword.iskeyword(name):
+            return name + '_'
+        elif name.startswith('_'):
+            return 'option' + name
+        return name
+
+    @property
+    def valueSetters(self):
+        'Maps the name of each option to its description and the function that stores its value in a resultClass instance'
+        return self.__valueSetters
+
+    @property
+    def helpText(self):
+        if self.__helpText is None:
+            with _Spec.__lazyInitLock:
+                if self.__helpText is None:
+                    self.__helpText = self.__constructHelpText()
+        return self.__helpText
+
+    @property
+    def helpEntries(self):
+        'The (usage, names, description) of every option in the order of recordFields (only created when first requested)'
+        if self.__helpEntries is None:
+            with _Spec.__lazyInitLock:
+                if self.__helpEntries is None:
+                    self.__helpEntries = [_HelpLayout.entry(option) for option in self.__recordFields]
+        return self.__helpEntries
+
+    def helpLayout(self, width):
+        'The _HelpLayout of the help text for "width" columns (only computed when first requested for that width)'
+        layout = self.__helpLayouts.get(width)
+        if layout is None:
+            helpEntries = self.helpEntries
+            with _Spec.__lazyInitLock:
+                layout = self.__helpLayouts.get(width)
+                if layout is None:
+                    layout = self.__helpLayouts[width] = _HelpLayout(helpEntries, width)
+        return layout
+
+    def writeHelp(self, write, width, option=None):
+        '''Passes each line of the help text (or of the help for just "option")
+        wrapped to "width" columns to the "write" function.
+        '''
+        if option is not None:
+            entry = _HelpLayout.entry(option)
+            _HelpLayout([entry], width).writeEntry(write, entry)
+            return
+
+        helpEntries = self.helpEntries
+        layout = self.helpLayout(width)
+        layout.writeUsage(write, self.__prog, [usage for usage, names, description in helpEntries])
+        if self.__purpose:
+            layout.writeText(write, self.__purpose)
+        write('where:\n')
+        for entry in helpEntries:
+            layout.writeEntry(write, entry)
+
+    def wrappedHelpText(self, width, option=None):
+        'The text written by writeHelp, without the final newline (as raised by --help)'
+        helpTextLines = []
+        self.writeHelp(helpTextLines.append, width, option)
+        return ''.join(helpTextLines).rstrip('\n')
+
+    def formatValues(self, optionsInstance):
+        '''Formats every option value of "optionsInstance" (an instance of
+        resultClass), including those of streamed options but not those read
+        from stdin, raising a CliParseError if any are invalid.
+        '''
+        for methodName, option in self.__allOptions.items():
+            if option.readsStdin:
+                # (stdin can only be read once, so only the values on the command line are formatted)
+                values = getattr(optionsInstance, _Spec.__slotName(methodName), None)
+                if values.__class__ is _StreamedValues:
+                    values.formatArguments()
+                continue
+            value = getattr(optionsInstance, methodName)()
+            if option.isStreamed and value is not None:
+                for streamedValue in value:
+                    pass
+
+    @classmethod
+    def __slotName(cls, methodName):
+        'The name of the __slots__ member of the resultClass that holds the value of the given method'
+        return '_cli_' + methodName
+
+    @classmethod
+    def __createResultClass(cls, spec):
+        '''Creates a subclass of the options class that holds the value of
+        each option in a __slots__ member, returned directly by the generated
+        accessor method (see __createAccessor). Its "helpText" attribute is
+        only constructed when it is first accessed, and it has a validate()
+        method to force the formatting of every (lazily formatted) option
+        value and an asDict() method, unless the options class has methods of
+        its own with those names (which are left alone). Instances can be pickled as long as the options class and the
+        option values can be.
+        '''
+        def validate(self):
+            'Formats every option value (including those of streamed options, but not those read from stdin), raising a CliParseError if any are invalid. Returns self.'
+            spec.formatValues(self)
+            return self
+
+        def asDict(self):
+            '''Returns a read-only dict-like view of the option values keyed on
+            option name. The values are read from these options (formatting them
+            if need be) when looked up, rather than being copied.
+            '''
+            return _OptionValues(spec, self)
+
+        def __reduce__(self):
+            'Pickles just the option values, e.g. so they can be returned from another process'
+            values = {}
+            for methodName, option in spec.allOptions.items():
+                value = getattr(self, methodName)()
+                values[methodName] = list(value) if option.isStreamed and value is not None else value
+            return (_restoreParsedOptions, (spec.optionsClass, spec.prog, spec.purpose, values))
+
+        optionsClass = spec.optionsClass
+        bases = (optionsClass,) if isinstance(optionsClass, type) else (optionsClass, object)
+        slotNames = tuple([_Spec.__slotName(methodName) for methodName in spec.allOptions])
+        members = {'__slots__': slotNames,
+                   'helpText': property(lambda self: spec.helpText),
+                   '__reduce__': __reduce__,
+                   '__module__': optionsClass.__module__}
+        for name, method in (('validate', validate), ('asDict', asDict)):
+            if not hasattr(optionsClass, name):
+                members[name] = method
+        resultClass = type(optionsClass.__name__, bases, members)
+        for methodName, option in spec.allOptions.items():
+            setattr(resultClass, methodName, _Spec.__createAccessor(option, resultClass.__dict__[_Spec.__slotName(methodName)]))
+        return resultClass
+
+    @classmethod
+    def __createAccessor(cls, option, slot):
+        '''Creates the method that returns the value of "option" held in the
+        __slots__ member "slot" (its descriptor). A value stored as _UnformattedValue is
+        formatted (and replaced) when first returned, and an option that was
+        not specified (so has nothing stored) returns its default.
+        '''
+        getValue = slot.__get__
+        setValue = slot.__set__
+
+        if option.isStreamed:
+            # Returns a new iterator every time (over _StreamedValues or, once
+            # unpickled, a list of the formatted values)
+            def streamedAccessor(self):
+                try:
+                    values = getValue(self)
+                except AttributeError:
+                    values = _ParsedOptions.getDefaultValue(option)
+                return None if values is None else iter(values)
+            streamedAccessor.__name__ = option.methodName
+            return streamedAccessor
+
+        def storeDefault(self):
+            value = _ParsedOptions.getDefaultValue(option)
+            setValue(self, value)
+            return value
+
+        def storeFormatted(self, value):
+            value = option.formatValue(value.value)
+            setValue(self, value)
+            return value
+
+        def accessor(self):
+            try:
+                value = getValue(self)
+            except AttributeError:
+                return storeDefault(self)
+            if value.__class__ is _UnformattedValue:
+                return storeFormatted(self, value)
+            return value
+
+        accessor.__name__ = option.methodName
+        return accessor
+
+    def __constructHelpText(self):
+        'Constructs the help text from the options'
         usage = []
         maxLongNameLength = 0
         maxShortNameLength = 0
         maxValueLength = 0
         maxDefaultValueLength = 0
         containsBooleanOptions = False
-        allOptions = [value for value in options.values()] + positionalArguments
-        for option in allOptions:
-            helpTextComponents = option.helpTextComponents
+        allOptions = [value for value in self.__options.values()] + self.__positionalArguments
+        allHelpTextComponents = [option.helpTextComponents for option in allOptions]
+        for option, helpTextComponents in zip(allOptions, allHelpTextComponents):
             usage.append(helpTextComponents['usage'])
             maxLongNameLength = max(maxLongNameLength, len(helpTextComponents['longName']))
             maxShortNameLength = max(maxShortNameLength, len(helpTextComponents['shortName']))
@@ -439,12 +1643,11 @@ class Cli(object):
             formatString += '%s'
 
         helpTextLines = []
-        helpTextLines.append('Usage: %s %s' % (prog, ' '.join(usage)))
-        if purpose:
-            helpTextLines.append(purpose)
+        helpTextLines.append('Usage: %s %s' % (self.__prog, ' '.join(usage)))
+        if self.__purpose:
+            helpTextLines.append(self.__purpose)
         helpTextLines.append('where:')
-        for option in allOptions:
-            helpTextComponents = option.helpTextComponents
+        for option, helpTextComponents in zip(allOptions, allHelpTextComponents):
             if option.hasShortName:
                 longName = helpTextComponents['longName'] + ', '
                 shortName = helpTextComponents['shortName']
@@ -467,21 +1670,192 @@ class Cli(object):
 
         return '\n'.join(helpTextLines)
 
-    @property
-    def helpText(self):
-        'The help text'
-        return self.__helpText
 
-    def parseArguments(self, args=None):
-        '''Parses the options specified within the optional arguments list.
-        If "args" is omitted, then the options are picked up from sys.argv[1:].
-        '''
-        if args is None:
-            return _ParsedOptions(self.__optionsClass, self.__helpText, self.__options, self.__positionalArguments, sys.argv[1:]).optionsInstance
-        elif isinstance(args, list):
-            return _ParsedOptions(self.__optionsClass, self.__helpText, self.__options, self.__positionalArguments, args[:]).optionsInstance
+class _HelpLayout(object):
+    '''The layout of the help text for a given width: the names (and values)
+    of each option in one column, then its description wrapped to the rest of
+    the width. The names column is only as wide as the longest names that fit
+    in MAX_NAMES_FRACTION of the width, so longer names are given a line of
+    their own (with the description starting on the next line) rather than
+    widening every row.
+    '''
+    INDENT = 2
+    GAP = 2
+    USAGE_INDENT = len('Usage: ')
+    MAX_NAMES_FRACTION = 0.4
+    MIN_DESCRIPTION_WIDTH = 20
+
+    def __init__(self, entries, width):
+        import textwrap  # only imported when needed so as not to slow down start up
+
+        self.__width = width
+        self.__textWrapper = textwrap.TextWrapper(width=width)
+        maxNamesWidth = int(width * _HelpLayout.MAX_NAMES_FRACTION)
+        self.__namesWidth = max([len(names) for usage, names, description in entries if len(names) <= maxNamesWidth] or [0])
+        self.__descriptionIndent = _HelpLayout.INDENT + self.__namesWidth + _HelpLayout.GAP
+        self.__descriptionWrapper = textwrap.TextWrapper(width=max(width, self.__descriptionIndent + _HelpLayout.MIN_DESCRIPTION_WIDTH),
+                                                         initial_indent=' ' * self.__descriptionIndent,
+                                                         subsequent_indent=' ' * self.__descriptionIndent)
+
+    @classmethod
+    def entry(cls, option):
+        'Returns the (usage, names, description) of "option" in the help text'
+        components = option.helpTextComponents
+        names = components['longName']
+        if components['shortName']:
+            names += ', ' + components['shortName']
+        if components['value']:
+            names += ' ' + components['value']
+
+        description = components['docString']
+        if option.isBoolean and not option.hasPosition:
+            description += ' (True if specified, otherwise False)'
+        elif option.hasDefault:
+            description += ' (default=%r)' % components['default']
+        return components['usage'], names, ' '.join(description.split())
+
+    def writeUsage(self, write, prog, usages):
+        'Writes the usage line(s) of "prog", wrapping (between options) at the width'
+        line = 'Usage: ' + prog
+        for usage in usages:
+            if len(line) + 1 + len(usage) > self.__width and len(line) > _HelpLayout.USAGE_INDENT:
+                write(line + '\n')
+                line = ' ' * _HelpLayout.USAGE_INDENT + usage
+            else:
+                line += ' ' + usage
+        write(line + '\n')
+
+    def writeText(self, write, text):
+        'Writes "text" wrapped to the width'
+        for line in self.__textWrapper.wrap(text):
+            write(line + '\n')
+
+    def writeEntry(self, write, entry):
+        'Writes the help for one option, given its (usage, names, description) entry'
+        usage, names, description = entry
+        lines = self.__descriptionWrapper.wrap(description)
+        names = ' ' * _HelpLayout.INDENT + names
+        if lines and len(names) <= _HelpLayout.INDENT + self.__namesWidth:
+            lines[0] = names.ljust(self.__descriptionIndent) + lines[0][self.__descriptionIndent:]
         else:
-            raise CliParseError('args must be of type "list". Found "%s"' % type(args))
+            write(names + '\n')
+        for line in lines:
+            write(line + '\n')
+
+
+class _OptionTrie(object):
+    '''Index of long option names by prefix. Each node holds its children
+    (keyed on the next character) and every (name, option) below it, so
+    looking up all the names with a given prefix takes O(length of prefix).
+    '''
+    def __init__(self, namedOptions):
+        self.__root = ({}, [])
+        for name, option in sorted(namedOptions, key=lambda namedOption: namedOption[0]):
+            node = self.__root
+            node[1].append((name, option))
+            for character in name:
+                node = node[0].setdefault(character, ({}, []))
+                node[1].append((name, option))
+
+    def candidates(self, prefix):
+        'Returns the (name, option) of every option whose name starts with "prefix", ordered by name'
+        node = self.__root
+        for character in prefix:
+            try:
+                node = node[0][character]
+            except KeyError:
+                return []
+        return node[1]
+
+    def match(self, prefix):
+        '''Returns the option (None for help) uniquely named by "prefix" (or
+        raises a CliParseError listing the candidates if ambiguous), or raises
+        KeyError if no option starts with "prefix".
+        '''
+        candidates = self.candidates(prefix)
+        if len(candidates) == 1:
+            return candidates[0][1]
+        elif not candidates:
+            raise KeyError(prefix)
+        raise CliParseError('Ambiguous option --%s could be any of: %s' % (prefix, ', '.join(['--' + name for name, option in candidates])))
+
+
+class _SuggestionIndex(object):
+    '''Index of the bigrams (of the names padded with ^ and $) of the option
+    tokens, used to suggest the options most like a mistyped one. Only the
+    names sharing the most bigrams with the mistyped name (and, as very short
+    names may share none, the names of about the same length as a very short
+    one) are compared with it by edit distance, rather than every name.
+    '''
+    MAX_SUGGESTIONS = 3
+    MAX_COMPARISONS = 30
+
+    def __init__(self, tokens):
+        self.__tokens = {}  # name (without dashes) -> token
+        self.__bigramIndex = {}  # bigram -> names containing it
+        self.__shortNames = {}  # length (up to 3) -> names of that length
+        for token in tokens:
+            name = token.lstrip('-')
+            self.__tokens[name] = token
+            for bigram in _SuggestionIndex.__bigrams(name):
+                self.__bigramIndex.setdefault(bigram, []).append(name)
+            if len(name) <= 3:
+                self.__shortNames.setdefault(len(name), []).append(name)
+
+    @classmethod
+    def __bigrams(cls, name):
+        paddedName = '^' + name + '$'
+        return set([paddedName[index:index + 2] for index in range(len(paddedName) - 1)])
+
+    def suggestions(self, name):
+        '''Returns the tokens (up to MAX_SUGGESTIONS, ordered by name) of the
+        options whose names are closest to "name", as long as they are within
+        an edit distance of 1 (2 for names of 8 or more characters) of it, but
+        less than its length.
+        '''
+        maxDistance = min(2 if len(name) >= 8 else 1, len(name) - 1)
+        if maxDistance < 1:
+            return []
+        sharedBigramCounts = {}
+        for bigram in _SuggestionIndex.__bigrams(name):
+            for candidate in self.__bigramIndex.get(bigram, ()):
+                sharedBigramCounts[candidate] = sharedBigramCounts.get(candidate, 0) + 1
+        candidates = sorted(sharedBigramCounts, key=lambda candidate: (-sharedBigramCounts[candidate], candidate))[:_SuggestionIndex.MAX_COMPARISONS]
+        if len(name) <= 3:
+            for length in range(len(name) - maxDistance, len(name) + maxDistance + 1):
+                candidates.extend(self.__shortNames.get(length, ()))
+
+        suggestions = {}  # distance -> names
+        for candidate in set(candidates):
+            distance = _SuggestionIndex.__editDistance(name, candidate, maxDistance)
+            if distance <= maxDistance:
+                suggestions.setdefault(distance, []).append(candidate)
+        if not suggestions:
+            return []
+        return [self.__tokens[candidate] for candidate in sorted(suggestions[min(suggestions)])[:_SuggestionIndex.MAX_SUGGESTIONS]]
+
+    @classmethod
+    def __editDistance(cls, first, second, maxDistance):
+        '''The edit distance between the strings counting insertions, deletions,
+        substitutions and transpositions of adjacent characters (the commonest
+        typos), or maxDistance + 1 if it is greater than maxDistance.
+        '''
+        if abs(len(first) - len(second)) > maxDistance:
+            return maxDistance + 1
+        rowBeforePrevious = None
+        previousRow = list(range(len(second) + 1))
+        for firstIndex, firstCharacter in enumerate(first):
+            row = [firstIndex + 1]
+            for secondIndex, secondCharacter in enumerate(second):
+                distance = min(previousRow[secondIndex + 1] + 1, row[secondIndex] + 1, previousRow[secondIndex] + (firstCharacter != secondCharacter))
+                if firstIndex > 0 and secondIndex > 0 and firstCharacter == second[secondIndex - 1] and first[firstIndex - 1] == secondCharacter:
+                    distance = min(distance, rowBeforePrevious[secondIndex - 1] + 1)
+                row.append(distance)
+            if min(row) > maxDistance:
+                return maxDistance + 1
+            rowBeforePrevious = previousRow
+            previousRow = row
+        return previousRow[-1]
 
 
 class _Description(object):
@@ -491,6 +1865,9 @@ class _Description(object):
         self.__methodDocString = methodDocString
         self.__isBooleanMethod = methodName.startswith('is')
         self.__valueFormatter = STRING_VALUE_FORMATTER if valueFormatter is None else valueFormatter
+        self.__isAsync = _iscoroutinefunction(self.__valueFormatter) or _iscoroutinefunction(getattr(self.__valueFormatter, '__call__', None))
+        self.__isBatch = getattr(self.__valueFormatter, 'isBatchFormatter', False) is True
+        self.__isFormattedLater = self.__isAsync or self.__isBatch
 
         if self.__isBooleanMethod:
             methodSuffix = methodName[2:]
@@ -500,14 +1877,47 @@ class _Description(object):
         self.__name = methodSuffix[0].lower() + methodSuffix[1:]
 
     def formatValue(self, value):
+        if self.__isAsync:
+            raise CliParseError('Option --%s has an asynchronous valueFormatter, so must be parsed using Cli.parseArgumentsAsync' % self.__name)
         if type(value) == list:
+            if self.__isBatch:
+                return self.__valueFormatter('--' + self.__name, value)
             formattedList = []
             for item in value:
                 formattedList.append(self.__valueFormatter('--' + self.__name, item))
             return formattedList
+        elif self.__isBatch:
+            return self.__valueFormatter('--' + self.__name, [value])[0]
         else:
             return self.__valueFormatter('--' + self.__name, value)
 
+    def formatValueAsync(self, value):
+        'Returns the coroutine that formats a single value using the asynchronous valueFormatter'
+        return self.__valueFormatter('--' + self.__name, value)
+
+    @property
+    def isAsync(self):
+        'True if the valueFormatter is a coroutine function'
+        return self.__isAsync
+
+    @property
+    def isBatch(self):
+        'True if the valueFormatter formats a whole list of values in one call (it has isBatchFormatter = True)'
+        return self.__isBatch
+
+    @property
+    def isStreamed(self):
+        return False
+
+    @property
+    def readsStdin(self):
+        return False
+
+    @property
+    def isFormattedLater(self):
+        'True if the values are never formatted one by one while parsing (asynchronous, batch or streamed)'
+        return self.__isFormattedLater
+
     @property
     def isBoolean(self):
         return self.__isBooleanMethod
@@ -562,16 +1972,26 @@ class _Description(object):
 
 class _OptionDescription(_Description):
     'Representation of a single option'
-    def __init__(self, optionsClass, methodName, methodDocString, shortName, default, isMandatory, isMultiValued, minCount, maxCount, valueFormatter):
+    __lazyInitLock = threading.Lock()
+
+    STDIN_DELIMITERS = ('\n', '\0')
+
+    def __init__(self, optionsClass, methodName, methodDocString, shortName, default, isMandatory, isMultiValued, minCount, maxCount, valueFormatter, isStreamed=False, readsStdin=False, stdinDelimiter=None, validate=True):
         _Description.__init__(self, optionsClass, methodName, methodDocString, valueFormatter)
+        self.__readsStdin = bool(readsStdin)
+        self.__stdinDelimiter = stdinDelimiter
+        self.__isStreamed = bool(isStreamed) or self.__readsStdin
+        self.__isFormattedLater = self.__isStreamed or self.isAsync or self.isBatch
         self.__shortName = shortName
         self.__default = default
         self.__isMandatory = isMandatory
         self.__isMultiValued = isMultiValued
         self.__minCount = minCount
         self.__maxCount = maxCount
+        self.__formattedDefault = None
 
-        self.__validate()
+        if validate:
+            self.__validate()
 
     def __validate(self):
         if self.isBoolean:
@@ -586,6 +2006,18 @@ class _OptionDescription(_Description):
             elif not self.isMultiValued and type(self.__default) == list and len(self.__default) > 1:
                 raise CliParseError('Single-valued option %s cannot have multiple "default" values' % self)
 
+        if self.isStreamed:
+            if not self.isMultiValued:
+                raise CliParseError('Single-valued option %s cannot be "streamed"' % self)
+            elif self.isAsync:
+                raise CliParseError('Streamed option %s cannot have an asynchronous valueFormatter' % self)
+
+        if self.__stdinDelimiter is not None:
+            if not self.readsStdin:
+                raise CliParseError('Option %s cannot have a "stdinDelimiter" unless it reads "stdin"' % self)
+            elif self.__stdinDelimiter not in _OptionDescription.STDIN_DELIMITERS:
+                raise CliParseError('Option %s has an invalid "stdinDelimiter" %r. Must be one of %s' % (self, self.__stdinDelimiter, list(_OptionDescription.STDIN_DELIMITERS)))
+
         if not self.isMultiValued:
             if self.hasMinCount:
                 raise CliParseError('Single-valued option %s cannot have "min" specified' % self)
@@ -617,6 +2049,25 @@ class _OptionDescription(_Description):
     def isMandatory(self):
         return self.__isMandatory
 
+    @property
+    def isStreamed(self):
+        'True if the values are formatted one at a time as the iterator returned by the method is consumed'
+        return self.__isStreamed
+
+    @property
+    def isFormattedLater(self):
+        return self.__isFormattedLater
+
+    @property
+    def readsStdin(self):
+        'True if a "-" value is replaced by the (streamed) values read from stdin'
+        return self.__readsStdin
+
+    @property
+    def stdinDelimiter(self):
+        'The delimiter of the values read from stdin: a newline (the default) or NUL'
+        return '\n' if self.__stdinDelimiter is None else self.__stdinDelimiter
+
     @property
     def isMultiValued(self):
         return self.__isMultiValued
@@ -643,7 +2094,19 @@ class _OptionDescription(_Description):
 
     @property
     def default(self):
-        return self.formatValue(False) if self.isBoolean else self.formatValue(self.__default)
+        '''The formatted default value (formatted when first requested).
+        Defaults of options with an asynchronous valueFormatter are left as is
+        (they are formatted by Cli.parseArgumentsAsync whenever the option is
+        not specified, see _Spec.asyncDefaultOptions).
+        '''
+        if self.__formattedDefault is None:
+            with _OptionDescription.__lazyInitLock:
+                if self.__formattedDefault is None:
+                    if self.isAsync:
+                        self.__formattedDefault = (False if self.isBoolean else self.__default,)
+                    else:
+                        self.__formattedDefault = (self.formatValue(False) if self.isBoolean else self.formatValue(self.__default),)
+        return self.__formattedDefault[0]
 
     @property
     def hasShortName(self):
@@ -756,159 +2219,732 @@ class _PositionalDescription(_Description):
 
 class _ParsedOptions(object):
     'Parses the command line options'
-    def __init__(self, optionsClass, helpText, options, positionalArguments, args):
-        self.__optionsClass = optionsClass
-        self.__helpText = helpText
-        self.__options = options.copy()
-
-        self.__checkPositionalArguments(positionalArguments, args)
-
-        for argument in positionalArguments:
-            self.__options[argument.methodName] = argument
-
-        context = _Context(optionsClass, helpText, options, positionalArguments)
+    def __init__(self, spec, args, lazyFormatting=False, allowAsync=False, asRecord=False, stats=None, stdin=None, isBytes=False, allowAbbreviations=False):
+        if stats is not None:
+            startTime = _timer()
+
+        # The arguments are read in a single pass. Only the last N arguments
+        # (N = number of positional arguments) can be positional, so a window
+        # of N arguments is held back until we know whether they are trailing.
+        context = _Context(spec, lazyFormatting, stats, isBytes, allowAbbreviations)
         state = _StartState(context)
-        argsLeft = len(args)
+        numberOfPositionalArguments = len(spec.positionalArguments)
+        pendingArgs = collections.deque()
         for arg in args:
-            argsLeft -= 1
-            state = state.process(arg, argsLeft)
+            pendingArgs.append(arg)
+            if len(pendingArgs) > numberOfPositionalArguments:
+                state = state.process(pendingArgs.popleft(), False)
+        while pendingArgs:
+            state = state.process(pendingArgs.popleft(), True)
+
+        if stats is not None:
+            parsedTime = _timer()
+            stats.record('parse', parsedTime - startTime)
 
         parsedOptions = context.validateOptions()
 
-        self.__optionsInstance = optionsClass()
-        setattr(self.__optionsInstance, 'helpText', helpText)
-        for methodName in self.__options.keys():
-            optionDescription = self.__options[methodName]
-            if optionDescription.name in parsedOptions:
-                optionInstance = _Option(self.__optionsClass, optionDescription, parsedOptions[optionDescription.name])
-            elif optionDescription.isBoolean:
-                optionInstance = _Option(self.__optionsClass, optionDescription, False)
-            else:
-                optionInstance = _Option(self.__optionsClass, optionDescription)
-            setattr(self.__optionsInstance, methodName, optionInstance.__call__)
+        if stats is not None:
+            validatedTime = _timer()
+            stats.record('validation', validatedTime - parsedTime)
+
+        self.__asyncOptions = []
+        if asRecord:
+            self.__optionsInstance = _ParsedOptions.__createRecord(spec, parsedOptions, lazyFormatting, stdin, isBytes)
+        else:
+            self.__optionsInstance = self.__createOptionsInstance(spec, parsedOptions, lazyFormatting, stdin, isBytes)
+
+        if stats is not None:
+            stats.record('build', _timer() - validatedTime)
+
+        if self.__asyncOptions and not allowAsync:
+            raise CliParseError('Options %s have asynchronous valueFormatters, so must be parsed using Cli.parseArgumentsAsync' % sorted(['--' + option.name for option, setValue, value in self.__asyncOptions]))
+
+    def __createOptionsInstance(self, spec, parsedOptions, lazyFormatting, stdin, isBytes):
+        '''Returns the instance of spec.resultClass holding the parsed options
+        (noting those still to be formatted asynchronously in asyncOptions).
+        '''
+        # Only the specified options are stored: the accessors of the others
+        # return their defaults (see _Spec.__createAccessor)
+        optionsInstance = spec.resultClass()
+        valueSetters = spec.valueSetters
+        for optionName, values in parsedOptions.items():
+            optionDescription, setValue = valueSetters[optionName]
+            value = _ParsedOptions.__getValue(optionDescription, values)
+            if (lazyFormatting or optionDescription.isFormattedLater) and not optionDescription.isBoolean:
+                if optionDescription.isStreamed:
+                    value = _StreamedValues(optionDescription, value, stdin, isBytes)
+                elif optionDescription.isBatch and not lazyFormatting:
+                    value = optionDescription.formatValue(value)  # every value at once
+                else:
+                    if optionDescription.isAsync:
+                        self.__asyncOptions.append((optionDescription, setValue, value))
+                    value = _UnformattedValue(value)
+            setValue(optionsInstance, value)
+
+        # The defaults of asynchronous options are formatted like the values
+        # that are specified, so that an option's value has the same type either way
+        for optionDescription in spec.asyncDefaultOptions:
+            if optionDescription.name not in parsedOptions:
+                value = _ParsedOptions.getDefaultValue(optionDescription)
+                setValue = valueSetters[optionDescription.name][1]
+                self.__asyncOptions.append((optionDescription, setValue, value))
+                setValue(optionsInstance, _UnformattedValue(value))
+        return optionsInstance
 
     @property
     def optionsInstance(self):
-        'The options instance configured to return the parsed command line options'
+        'The options instance (or record) configured to return the parsed command line options'
         return self.__optionsInstance
 
-    def __checkPositionalArguments(self, positionalArguments, args):
-        context = _Context(self.__optionsClass, self.__helpText, self.__options, [])
-        state = _StartCheckState(context)
-        argsLeft = len(args)
-        if state is not None:
-            for arg in args:
-                state = state.process(arg)
-                if state is None:
-                    break
-                argsLeft -= 1
-
-        numberOfMissingPositionalArguments = len(positionalArguments) - argsLeft
-        if numberOfMissingPositionalArguments > 0:
-            missingPositionalArguments = [option.name for option in positionalArguments[-numberOfMissingPositionalArguments:]]
-            if numberOfMissingPositionalArguments > 1:
-                raise CliParseError('Missing values for positional arguments: %s' % missingPositionalArguments)
-            elif numberOfMissingPositionalArguments == 1:
-                raise CliParseError('Missing value for last positional argument: %s' % missingPositionalArguments)
+    @classmethod
+    def __createRecord(cls, spec, parsedOptions, lazyFormatting, stdin, isBytes):
+        'Returns the record holding the formatted value of every option (a record cannot format lazily)'
+        values = []
+        for option in spec.recordFields:
+            if option.name in parsedOptions:
+                value = _ParsedOptions.__getValue(option, parsedOptions[option.name])
+                if option.isStreamed:
+                    value = iter(_StreamedValues(option, value, stdin, isBytes))
+                elif (lazyFormatting or option.isFormattedLater) and not option.isBoolean:
+                    value = option.formatValue(value)
+                values.append(value)
+            else:
+                value = _ParsedOptions.getDefaultValue(option)
+                if option.isAsync and option.hasDefault and not option.isBoolean:
+                    value = option.formatValue(value)  # (raises, as a record cannot be formatted asynchronously)
+                values.append(iter(value) if option.isStreamed and value is not None else value)
+        return spec.recordClass._make(values)
 
+    @property
+    def asyncOptions(self):
+        '''(description, setValue, unformatted value) of each parsed option whose
+        value is still to be formatted by an asynchronous valueFormatter
+        '''
+        return self.__asyncOptions
 
-class _Context(object):
-    'Context used to hold state information while parsing the command line'
-    def __init__(self, optionsClass, helpText, options, positionalArguments):
-        self.__optionsClass = optionsClass
-        self.__helpText = helpText
-        self.__options = options
-        self.__positionalArguments = positionalArguments
-        self.__positionalArgumentValues = []
-        self.__shortOptions = {}
+    @classmethod
+    def __getValue(cls, optionDescription, values):
+        'Returns the value of an option given its parsed "values"'
+        if type(values) is list:
+            if len(values) == 0:
+                return True
+            elif len(values) == 1 and not optionDescription.isMultiValued:
+                return values[0]
+        return values
 
-        for option in options.values():
+    @classmethod
+    def getDefaultValue(cls, optionDescription):
+        'Returns the value of an option that was not specified (a list or array default is copied, as it may be modified)'
+        if optionDescription.isBoolean:
+            return False
+        elif optionDescription.hasDefault:
+            default = optionDescription.default
+            if type(default) is list:
+                return default[:]
+            elif optionDescription.isBatch and optionDescription.isMultiValued:
+                import copy
+                return copy.copy(default)
+            return default
+        else:
+            return None
+
+
+class _AsyncFormatting(object):
+    '''Runs the asynchronous valueFormatters of the options parsed by
+    Cli.parseArgumentsAsync as asyncio tasks, with no more than
+    "maxConcurrency" of them running at once. "future" is given the options
+    instance once every value has been formatted, or the first error raised
+    by a valueFormatter.
+    '''
+    def __init__(self, asyncio, parsedOptions, maxConcurrency):
+        if hasattr(asyncio, 'get_running_loop'):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                raise CliError('Cli.parseArgumentsAsync must be called from within a running asyncio event loop (e.g. from a coroutine)')
+        else:  # Python < 3.7, where get_event_loop returns the running loop
+            loop = asyncio.get_event_loop()
+        self.__loop = loop
+        self.__future = loop.create_future() if hasattr(loop, 'create_future') else asyncio.Future(loop=loop)
+        self.__optionsInstance = parsedOptions.optionsInstance
+        self.__maxConcurrency = maxConcurrency
+        self.__runningTasks = set()
+
+        # Every value of a multi-valued option is formatted by its own task
+        self.__formattedOptions = []
+        self.__jobs = collections.deque()
+        for optionDescription, setValue, values in parsedOptions.asyncOptions:
+            isList = type(values) is list
+            if not isList:
+                values = [values]
+            formattedValues = [None] * len(values)
+            self.__formattedOptions.append((setValue, isList, formattedValues))
+            for index, value in enumerate(values):
+                self.__jobs.append((optionDescription, formattedValues, index, value))
+        self.__remainingJobs = len(self.__jobs)
+
+        self.__future.add_done_callback(self.__cancelRunningTasks)
+        if self.__remainingJobs == 0:
+            self.__future.set_result(self.__optionsInstance)
+        else:
+            self.__startTasks()
+
+    @property
+    def future(self):
+        return self.__future
+
+    def __startTasks(self):
+        while self.__jobs and (self.__maxConcurrency is None or len(self.__runningTasks) < self.__maxConcurrency):
+            job = self.__jobs.popleft()
+            optionDescription, formattedValues, index, value = job
+            task = self.__loop.create_task(optionDescription.formatValueAsync(value))
+            self.__runningTasks.add(task)
+            task.add_done_callback(lambda task, job=job: self.__taskDone(job, task))
+
+    def __taskDone(self, job, task):
+        self.__runningTasks.discard(task)
+        if self.__future.done():
+            return
+        if task.cancelled():
+            self.__future.cancel()
+            return
+        error = task.exception()
+        if error is not None:
+            self.__future.set_exception(error)
+            return
+
+        optionDescription, formattedValues, index, value = job
+        formattedValues[index] = task.result()
+        self.__remainingJobs -= 1
+        if self.__remainingJobs == 0:
+            for setValue, isList, formattedValues in self.__formattedOptions:
+                setValue(self.__optionsInstance, formattedValues if isList else formattedValues[0])
+            self.__future.set_result(self.__optionsInstance)
+        else:
+            self.__startTasks()
+
+    def __cancelRunningTasks(self, future):
+        for task in list(self.__runningTasks):
+            task.cancel()
+
+
+class _CompletionScript(object):
+    'Generates the shell completion script of a spec (see Cli.completionScript)'
+    SHELLS = ('bash', 'zsh', 'fish')
+    FINGERPRINT_PREFIX = '# Cli completion fingerprint: '
+
+    def __init__(self, spec, shell):
+        if shell not in _CompletionScript.SHELLS:
+            raise CliError('Unsupported shell "%s". Must be one of %s' % (shell, list(_CompletionScript.SHELLS)))
+        import hashlib  # only imported when needed so as not to slow down start up
+        import re
+        self.__prog = spec.prog
+        self.__functionName = '_cli_complete_' + re.sub('[^A-Za-z0-9_]', '_', spec.prog)
+        self.__options = [spec.options[methodName] for methodName in sorted(spec.options)]
+        self.__positionalArguments = spec.positionalArguments
+        description = repr((__version__, shell, self.__prog,
+                            [(option.name, option.shortName, option.isBoolean, option.isMultiValued, option.docString) for option in self.__options],
+                            [argument.name for argument in self.__positionalArguments]))
+        self.__fingerprint = hashlib.sha1(description.encode('utf-8')).hexdigest()
+        header = ['# %s completion for %s generated by Cli %s' % (shell, self.__prog, __version__),
+                  _CompletionScript.FINGERPRINT_PREFIX + self.__fingerprint]
+        lines = {'bash': self.__bash, 'zsh': self.__zsh, 'fish': self.__fish}[shell]()
+        if shell == 'zsh':
+            header.insert(0, '#compdef %s' % self.__prog)  # (must be the first line)
+        self.__script = '\n'.join(header + lines) + '\n'
+
+    @property
+    def fingerprint(self):
+        'Fingerprint of the options (and version of this library) the script is generated from'
+        return self.__fingerprint
+
+    @property
+    def script(self):
+        return self.__script
+
+    @classmethod
+    def __quote(cls, text):
+        'Returns "text" single quoted for the shell'
+        return "'" + text.replace("'", "'\\''") + "'"
+
+    @classmethod
+    def __summary(cls, option):
+        'The first line of the docString of "option"'
+        return option.docString.strip().split('\n')[0].strip() if option.hasDocString else ''
+
+    def __bash(self):
+        tokens = []
+        for option in self.__options:
+            tokens.append('--' + option.name)
+            if option.hasShortName:
+                tokens.append('-' + option.shortName)
+        tokens.extend(_Spec.HELP_TOKENS)
+        return ['%s() {' % self.__functionName,
+                '    local current="${COMP_WORDS[COMP_CWORD]}" completion',
+                '    COMPREPLY=()',
+                '    # (read a line at a time, as an unquoted $(compgen ...) would expand -? as a pathname)',
+                '    if [[ "$current" == -* ]]; then',
+                '        while IFS= read -r completion; do COMPREPLY+=("$completion"); done < <(compgen -W %s -- "$current")' % _CompletionScript.__quote(' '.join(tokens)),
+                '    else',
+                '        while IFS= read -r completion; do COMPREPLY+=("$completion"); done < <(compgen -f -- "$current")',
+                '    fi',
+                '}',
+                'complete -o filenames -F %s %s' % (self.__functionName, _CompletionScript.__quote(self.__prog))]
+
+    def __zsh(self):
+        escape = lambda text: text.replace('\\', '\\\\').replace('[', '\\[').replace(']', '\\]').replace(':', '\\:')
+        specs = [_CompletionScript.__quote('(- *)--help[show the help text]'), _CompletionScript.__quote('(- *)-?[show the help text]')]
+        for option in self.__options:
+            summary = _CompletionScript.__summary(option)
+            description = '[%s]' % escape(summary) if summary else ''
+            if option.isBoolean:
+                value = ''
+            elif option.isMultiValued:
+                value = ':*-*:value:_files'  # values until the next option
+            else:
+                value = ':value:_files'
+            if option.hasShortName:
+                exclusions = '(--%s -%s)' % (option.name, option.shortName)
+                specs.append(_CompletionScript.__quote(exclusions) + '{--%s,-%s}' % (option.name, option.shortName) + _CompletionScript.__quote(description + value))
+            else:
+                specs.append(_CompletionScript.__quote('--' + option.name + description + value))
+        for argument in self.__positionalArguments:
+            specs.append(_CompletionScript.__quote(':%s:_files' % escape(argument.name)))
+        return ['%s() {' % self.__functionName,
+                '    _arguments -S \\',
+                '        ' + ' \\\n        '.join(specs),
+                '}',
+                'if [ "$funcstack[1]" = %s ]; then  # autoloaded from $fpath' % _CompletionScript.__quote('_' + self.__prog),
+                '    %s "$@"' % self.__functionName,
+                'else',
+                '    compdef %s %s' % (self.__functionName, _CompletionScript.__quote(self.__prog)),
+                'fi']
+
+    def __fish(self):
+        command = 'complete -c %s' % _CompletionScript.__quote(self.__prog)
+        lines = [command + " -l help -d 'show the help text'", command + " -s '?' -d 'show the help text'"]
+        for option in self.__options:
+            line = command + ' -l ' + option.name
             if option.hasShortName:
-                self.__shortOptions[option.shortName] = option.name
+                line += (' -s ' if len(option.shortName) == 1 else ' -o ') + _CompletionScript.__quote(option.shortName)
+            summary = _CompletionScript.__summary(option)
+            if summary:
+                line += ' -d ' + _CompletionScript.__quote(summary)
+            if not option.isBoolean:
+                line += ' -r'
+            lines.append(line)
+        return lines
+
+
+def _parseChunk(optionsClass, prog, purpose, lazyFormatting, expandArgumentFiles, bytesArguments, allowAbbreviations, chunk):
+    '''Parses a chunk of (index, args) pairs within a worker process of
+    Cli.parseManyInParallel.
+    '''
+    results = Cli(optionsClass, prog, purpose, lazyFormatting=lazyFormatting, expandArgumentFiles=expandArgumentFiles, bytesArguments=bytesArguments, allowAbbreviations=allowAbbreviations).parseMany([args for index, args in chunk])
+    spec = Cli._getSpec(optionsClass, prog, purpose, None)
+    parsedChunk = []
+    for position, result in results:
+        if lazyFormatting and not isinstance(result, CliError):
+            # The values are formatted here (rather than when pickled) so that
+            # an invalid value is returned as its CliError, like any other
+            try:
+                spec.formatValues(result)
+            except CliError as e:
+                result = e
+        parsedChunk.append((chunk[position][0], result))
+    return parsedChunk
+
+
+def _expandArgumentFiles(args, includingFiles=(), isBytes=False):
+    '''Yields each of the arguments, replacing each "@path" argument with the
+    arguments read from the file at "path" (which may themselves include
+    "@path" arguments). "includingFiles" are the real paths of the argument
+    files currently being read, so that a file including itself is detected.
+    '''
+    at = b'@' if isBytes else '@'
+    for arg in args:
+        if arg.startswith(at) and len(arg) > 1:
+            path = arg[1:]
+            realPath = os.path.realpath(path)
+            if realPath in includingFiles:
+                raise CliParseError('Argument file "%s" includes itself (via %s)' % (_decodeArgument(path), ' -> '.join(_map(_decodeArgument, includingFiles + (realPath,)))))
+            for expandedArg in _expandArgumentFiles(_readArgumentFile(path, not isBytes), includingFiles + (realPath,), isBytes):
+                yield expandedArg
+        else:
+            yield arg
+
+
+_decodeArgument = getattr(os, 'fsdecode', lambda argument: argument)  # decoded as for sys.argv (Python 2 keeps bytes)
+_encodeArgument = getattr(os, 'fsencode', lambda argument: argument)
 
-        self.__parsedOptions = {}
 
-    def addOption(self, optionName):
-        if optionName == 'help':
-            raise CliHelpError(self.__helpText)
-
-        methodNameSuffix = optionName[0].upper() + optionName[1:]
-        if 'get' + methodNameSuffix in self.__options:
-            self.__option = self.__options['get' + methodNameSuffix]
-            self.__parsedOptions[optionName] = []
-        elif 'is' + methodNameSuffix in self.__options:
-            self.__option = self.__options['is' + methodNameSuffix]
-            self.__parsedOptions[optionName] = True
+def _splitNulTerminated(buffer):
+    'Yields each NUL terminated argument (as bytes) in "buffer" (the terminator of the last one is optional)'
+    start = 0
+    size = len(buffer)
+    while start < size:
+        end = buffer.find(b'\0', start)
+        if end == -1:
+            end = size
+        yield bytes(buffer[start:end])
+        start = end + 1
+
+
+def _readArgumentFile(path, decode=True):
+    '''Yields each line (without its line ending) of the argument file at
+    "path", skipping blank lines. Regular files are read through mmap, a line
+    at a time, so the file is never held in memory as a whole. The lines are
+    decoded as for sys.argv unless "decode" is False.
+    '''
+    import mmap  # only imported when needed so as not to slow down start up
+    try:
+        argumentFile = open(path, 'rb')
+    except (IOError, OSError) as e:
+        raise CliParseError('Cannot read argument file "%s": %s' % (_decodeArgument(path), e.strerror))
+    try:
+        if not os.path.isfile(path):  # e.g. a pipe, which cannot be mapped
+            lines = argumentFile
+        elif os.fstat(argumentFile.fileno()).st_size == 0:  # which cannot be mapped either
+            return
         else:
-            raise CliParseError('Unrecognised option --%s' % optionName)
+            lines = _mappedLines(mmap.mmap(argumentFile.fileno(), 0, access=mmap.ACCESS_READ))
+        for line in lines:
+            line = line.rstrip(b'\r\n')
+            if line:
+                yield _decodeArgument(line) if decode else line
+    finally:
+        argumentFile.close()
+
+
+def _mappedLines(mappedFile):
+    'Yields each line (including its line ending) of "mappedFile", closing it when done'
+    try:
+        start = 0
+        size = len(mappedFile)
+        while start < size:
+            end = mappedFile.find(b'\n', start)
+            end = size if end == -1 else end + 1
+            yield mappedFile[start:end]
+            start = end
+    finally:
+        mappedFile.close()
+
+
+def _readDelimitedValues(stdin, delimiter, decode=True, chunkSize=65536):
+    '''Yields each value read from the binary file object or file descriptor
+    "stdin" (sys.stdin if None), reading a chunk at a time as the values are
+    consumed. Values are separated by "delimiter" (a newline, ignoring
+    carriage returns, or NUL), empty values are skipped and the values are
+    decoded as for sys.argv unless "decode" is False.
+    '''
+    if stdin is None:
+        stdin = getattr(sys.stdin, 'buffer', None) or sys.stdin.fileno()  # (Python 2 has no binary buffer)
+    if isinstance(stdin, int):
+        read = lambda size: os.read(stdin, size)
+    else:
+        read = getattr(stdin, 'read1', stdin.read)  # read1 returns what is available rather than waiting for a full chunk
+    isNewlineDelimited = delimiter == '\n'
+    delimiter = delimiter.encode('ascii')
+    pending = b''
+    while True:
+        chunk = read(chunkSize)
+        if not chunk:
+            break
+        values = (pending + chunk).split(delimiter)
+        pending = values.pop()
+        for value in values:
+            if isNewlineDelimited:
+                value = value.rstrip(b'\r')
+            if value:
+                yield _decodeArgument(value) if decode else value
+    if isNewlineDelimited:
+        pending = pending.rstrip(b'\r')
+    if pending:
+        yield _decodeArgument(pending) if decode else pending
+
+
+def _terminalWidth():
+    'Returns the width of the terminal (or $COLUMNS), defaulting to 80 columns'
+    import shutil  # only imported when needed so as not to slow down start up
+
+    try:
+        return shutil.get_terminal_size().columns
+    except AttributeError:  # Python 2 (or Python 3 before 3.3)
+        try:
+            return int(os.environ.get('COLUMNS', 80))
+        except ValueError:
+            return 80
+
+
+def _restoreParsedOptions(optionsClass, prog, purpose, values):
+    '''Recreates pickled parsed options (see _Spec.__createResultClass) from
+    their option "values" keyed on method name.
+    '''
+    spec = Cli._getSpec(optionsClass, prog, purpose, None)
+    optionsInstance = spec.resultClass()
+    for methodName, value in values.items():
+        optionDescription, setValue = spec.valueSetters[spec.allOptions[methodName].name]
+        setValue(optionsInstance, value)
+    return optionsInstance
+
+
+class _OptionValues(_Mapping):
+    'Read-only view of the values of parsed options keyed on option name (see _Spec.__createResultClass)'
+    def __init__(self, spec, optionsInstance):
+        self.__valueSetters = spec.valueSetters
+        self.__recordFields = spec.recordFields
+        self.__optionsInstance = optionsInstance
+
+    def __getitem__(self, name):
+        try:
+            option = self.__valueSetters[name][0]
+        except KeyError:
+            raise KeyError(name)
+        return getattr(self.__optionsInstance, option.methodName)()
+
+    def __iter__(self):
+        for option in self.__recordFields:
+            yield option.name
+
+    def __len__(self):
+        return len(self.__recordFields)
+
+    def __contains__(self, name):
+        return name in self.__valueSetters
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class _StreamedValues(object):
+    '''The unformatted values of a streamed multi-valued option, which are
+    formatted one at a time (every time) they are iterated over. A "-" value
+    of an option that reads stdin is replaced by the values read from
+    "stdin", which can only happen once.
+    '''
+    __slots__ = ('option', 'values', 'stdin', 'isBytes')
+    CONSUMED = object()  # the stdin of values that have been iterated over
+
+    def __init__(self, option, values, stdin=None, isBytes=False):
+        self.option = option
+        self.values = values
+        self.stdin = stdin
+        self.isBytes = isBytes
+
+    def __iter__(self):
+        option = self.option
+        formatValue = option.formatValue
+        if not option.readsStdin or '-' not in self.values:
+            for value in self.values:
+                yield formatValue(value)
+            return
+
+        # The number of values is only known once stdin has been read
+        valueCount = 0
+        for value in self.__expandStdin():
+            valueCount += 1
+            if option.hasMaxCount and valueCount > option.maxCount:
+                raise CliParseError('Multi-valued option --%s cannot have more than %d values' % (option.name, option.maxCount))
+            yield formatValue(value)
+        if option.hasMinCount and valueCount < option.minCount:
+            raise CliParseError('Multi-valued option --%s was given %d values - must have at least %d value(s)' % (option.name, valueCount, option.minCount))
+
+    def __expandStdin(self):
+        'Yields the unformatted values, reading those of the "-" value from stdin'
+        for value in self.values:
+            if value == '-':
+                stdin, self.stdin = self.stdin, _StreamedValues.CONSUMED
+                if stdin is _StreamedValues.CONSUMED:
+                    raise CliError('The values of option --%s have already been read from stdin' % self.option.name)
+                for stdinValue in _readDelimitedValues(stdin, self.option.stdinDelimiter, not self.isBytes):
+                    yield stdinValue
+            else:
+                yield value
+
+    def formatArguments(self):
+        'Formats the values given on the command line (but not those read from stdin)'
+        formatValue = self.option.formatValue
+        for value in self.values:
+            if value != '-':
+                formatValue(value)
+
+
+class _UnformattedValue(object):
+    'Holds the value(s) of an option until they are formatted when first accessed'
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Context(object):
+    'Context used to hold state information while parsing the command line'
+    def __init__(self, spec, lazyFormatting=False, stats=None, isBytes=False, allowAbbreviations=False):
+        self.__spec = spec
+        self.__allowAbbreviations = allowAbbreviations
+        self.__lazyFormatting = lazyFormatting
+        self.__stats = stats
+        self.__optionTokens = spec.optionByteTokens if isBytes else spec.optionTokens
+        self.__dash = b'-' if isBytes else '-'
+        self.__positionalArgumentValues = []
+        self.__parsedOptions = {}
+        self.__stdinOption = None  # the option given the value "-" (only one option can read stdin)
+        self.__isHelpRequested = False
 
-    def addShortOption(self, optionName):
-        if optionName == '?':
-            raise CliHelpError(self.__helpText)
+    def addOption(self, arg):
+        '''Adds the option named by the command line token "arg" (e.g. --name
+        or -n), returning it (or None for --help or -?).
+        '''
+        try:
+            option = self.__optionTokens[arg]
+        except KeyError:
+            arg = _decodeArgument(arg)
+            if not (self.__allowAbbreviations and arg.startswith('--') and len(arg) > 2):
+                self.__raiseUnrecognisedOption(arg)
+            try:
+                option = self.__spec.optionTrie.match(arg[2:])
+            except KeyError:
+                self.__raiseUnrecognisedOption(arg)
+
+        if option is None:
+            self.__isHelpRequested = True
+            return None
 
-        if optionName in self.__shortOptions:
-            self.addOption(self.__shortOptions[optionName])
+        self.__option = option
+        if option.isBoolean:
+            self.__optionValues = None
+            self.__parsedOptions[option.name] = True
         else:
-            raise CliParseError('Unrecognised short option -%s' % optionName)
+            self.__optionValues = self.__parsedOptions[option.name] = []
+        return option
+
+    def raiseHelp(self, arg):
+        '''Raises the CliHelpError for --help followed by the argument "arg":
+        the help for just the option named by "arg" if there is one, otherwise
+        the full help, both wrapped to the width of the terminal.
+        '''
+        option = self.__spec.optionNamed(_decodeArgument(arg))
+        raise CliHelpError(self.__spec.wrappedHelpText(_terminalWidth(), option))
+
+    def __raiseUnrecognisedOption(self, arg):
+        if arg.startswith('--'):
+            if len(arg) < 3:
+                raise CliParseError('Missing option name after: ' + arg)
+            elif arg[2] == '-':
+                raise CliParseError('Too many -\'s in option: ' + arg)
+            elif arg[2].lower() != arg[2]:
+                raise CliParseError('Options must start with a lower case letter: ' + arg + self.__suggestions(arg))
+            raise CliParseError('Unrecognised option ' + arg + self.__suggestions(arg))
+        elif len(arg) < 2:
+            raise CliParseError('Missing option name after: ' + arg)
+        elif arg[1].lower() != arg[1]:
+            raise CliParseError('Short Options must start with a lower case letter: ' + arg + self.__suggestions(arg))
+        raise CliParseError('Unrecognised short option ' + arg + self.__suggestions(arg))
+
+    def __suggestions(self, arg):
+        'Returns the "did you mean" sentence naming the options closest to the unrecognised "arg" (if any)'
+        suggestions = self.__spec.suggestionIndex.suggestions(arg.lstrip('-'))
+        if not suggestions:
+            return ''
+        elif len(suggestions) == 1:
+            return '. Did you mean %s?' % suggestions[0]
+        return '. Did you mean one of %s?' % ', '.join(suggestions)
+
+    @property
+    def dash(self):
+        'The "-" that starts an option (bytes when parsing bytes)'
+        return self.__dash
+
+    def readsStdin(self):
+        'True if the current option reads its values from stdin when given "-"'
+        return self.__option.readsStdin
 
     def requiresValue(self):
-        if self.__option.isBoolean:
+        option = self.__option
+        if option.isBoolean:
             return False
 
-        valueCount = len(self.__parsedOptions[self.__option.name])
-        if self.__option.isMultiValued and self.__option.hasMinCount:
-            return valueCount < self.__option.minCount
+        valueCount = len(self.__optionValues)
+        if option.isMultiValued and option.hasMinCount:
+            return valueCount < option.minCount and option is not self.__stdinOption
 
         return valueCount == 0
 
     def appendOptionValue(self, value):
-        if self.__option.isBoolean:
-            raise CliParseError('Boolean option --%s cannot be followed by a value.\nFound unexpected value "%s" after this option.' % (self.__option.name, value))
-
-        valueCount = len(self.__parsedOptions[self.__option.name])
-        if self.__option.isMultiValued:
-            if self.__option.hasMaxCount and valueCount == self.__option.maxCount:
-                raise CliParseError('Multi-valued option --%s cannot have more than %d values' % (self.__option.name, self.__option.maxCount))
+        option = self.__option
+        if option.isBoolean:
+            raise CliParseError('Boolean option --%s cannot be followed by a value.\nFound unexpected value "%s" after this option.' % (option.name, _decodeArgument(value)))
+
+        optionValues = self.__optionValues
+        valueCount = len(optionValues)
+        if option.isMultiValued:
+            if option.hasMaxCount and valueCount == option.maxCount:
+                raise CliParseError('Multi-valued option --%s cannot have more than %d values' % (option.name, option.maxCount))
         elif valueCount > 0:
-            raise CliParseError('Single-valued option --%s cannot have multiple values' % self.__option.name)
-        self.__parsedOptions[self.__option.name].append(self.__option.formatValue(value))
-
-    @property
-    def numberOfPositionalArguments(self):
-        return len(self.__positionalArguments)
+            raise CliParseError('Single-valued option --%s cannot have multiple values' % option.name)
+        if value == self.__dash and option.readsStdin:
+            if self.__stdinOption is not None:
+                raise CliParseError('Option --%s cannot read stdin ("-") as it has already been read by --%s' % (option.name, self.__stdinOption.name))
+            self.__stdinOption = option
+            value = '-'  # (as expected by _StreamedValues, even when parsing bytes)
+        if self.__lazyFormatting or option.isFormattedLater:
+            optionValues.append(value)
+        elif self.__stats is None:
+            optionValues.append(option.formatValue(value))
+        else:
+            optionValues.append(self.__timedFormatValue(option, value))
 
     def addPositional(self, value):
-        option = self.__positionalArguments[len(self.__positionalArgumentValues)]
-        self.__positionalArgumentValues.append(option.formatValue(value))
+        option = self.__spec.positionalArguments[len(self.__positionalArgumentValues)]
+        if (self.__lazyFormatting or option.isFormattedLater) and not option.isBoolean:
+            self.__positionalArgumentValues.append(value)
+        elif self.__stats is None:
+            self.__positionalArgumentValues.append(option.formatValue(value))
+        else:
+            self.__positionalArgumentValues.append(self.__timedFormatValue(option, value))
+
+    def __timedFormatValue(self, option, value):
+        'Formats the value, recording the time taken in the stats'
+        startTime = _timer()
+        try:
+            return option.formatValue(value)
+        finally:
+            self.__stats.record('format --' + option.name, _timer() - startTime)
 
     def validateOptions(self):
-        for optionName in self.__parsedOptions.keys():
-            methodNameSuffix = optionName[0].upper() + optionName[1:]
-            if 'get' + methodNameSuffix in self.__options:
-                option = self.__options['get' + methodNameSuffix]
-                valueCount = len(self.__parsedOptions[optionName])
+        if self.__isHelpRequested:  # (--help was the last argument)
+            raise CliHelpError(self.__spec.wrappedHelpText(_terminalWidth()))
+
+        optionsByName = self.__spec.optionsByName
+        for optionName, values in self.__parsedOptions.items():
+            option = optionsByName[optionName]
+            if not option.isBoolean:
+                valueCount = len(values)
                 if valueCount == 0:
                     raise CliParseError('Missing value for option --%s' % optionName)
-                elif option.isMultiValued:
+                elif option.isMultiValued and option is not self.__stdinOption:
                     if option.hasMinCount and valueCount < option.minCount:
                         raise CliParseError('Multi-valued option --%s was given %d values - must have at least %d value(s)' % (optionName, valueCount, option.minCount))
 
-        for option in self.__options.values():
-            if option.isMandatory and option.name not in self.__parsedOptions:
-                raise CliParseError('Missing mandatory option --%s' % option.name)
-            elif option.isMultiValued and option.hasMinCount and option.minCount > 0 and option.name not in self.__parsedOptions:
-                raise CliParseError('Multi-valued option --%s must be given with at least %d value(s)' % (option.name, option.minCount))
+        for option in self.__spec.requiredOptions:
+            if option.name not in self.__parsedOptions:
+                if option.isMandatory:
+                    raise CliParseError('Missing mandatory option --%s' % option.name)
+                else:
+                    raise CliParseError('Multi-valued option --%s must be given with at least %d value(s)' % (option.name, option.minCount))
 
-        numberOfMissingPositionalArguments = len(self.__positionalArguments) - len(self.__positionalArgumentValues)
+        positionalArguments = self.__spec.positionalArguments
+        numberOfMissingPositionalArguments = len(positionalArguments) - len(self.__positionalArgumentValues)
         if numberOfMissingPositionalArguments > 1:
-            raise CliParseError('Missing values for positional arguments: %s' % [option.name for option in self.__positionalArguments[len(self.__positionalArgumentValues):]])
+            raise CliParseError('Missing values for positional arguments: %s' % [option.name for option in positionalArguments[len(self.__positionalArgumentValues):]])
         elif numberOfMissingPositionalArguments == 1:
-            raise CliParseError('Missing value for last positional argument: %s' % [option.name for option in self.__positionalArguments[len(self.__positionalArgumentValues):]])
+            raise CliParseError('Missing value for last positional argument: %s' % [option.name for option in positionalArguments[len(self.__positionalArgumentValues):]])
         else:
-            for index in range(0, len(self.__positionalArguments)):
-                option = self.__positionalArguments[index]
+            for index in range(0, len(positionalArguments)):
+                option = positionalArguments[index]
                 value = self.__positionalArgumentValues[index]
                 if option.isBoolean:
+                    value = _decodeArgument(value)
                     if value.lower() not in ['true', 'false']:
                         raise CliParseError('Invalid boolean value "%s" for positional argument "%s". Must be "True" or "False" (case insensitive).' % (value, option.name))
                     self.__parsedOptions[option.name] = value.lower() == 'true'
@@ -918,126 +2954,63 @@ class _Context(object):
         return self.__parsedOptions
 
 
-class _StartCheckState(object):
-    'The initial state during parsing of the command line while checking positional arguments'
-    def __init__(self, context):
-        self.__context = context
-
-    def process(self, arg):
-        if arg.startswith('-'):
-            return _OptionCheckState(self.__context, arg)
-        else:
-            return None
-
-
-class _OptionCheckState(object):
-    'We are processing an option in this state while checking positional arguments'
-    def __init__(self, context, arg):
-        self.__context = context
-        if arg.startswith('--'):
-            if len(arg) < 3:
-                raise CliParseError('Missing option name after: ' + arg)
-            elif arg[2] == '-':
-                raise CliParseError('Too many -\'s in option: ' + arg)
-            elif arg[2].lower() != arg[2]:
-                raise CliParseError('Options must start with a lower case letter: ' + arg)
-            context.addOption(arg[2:])
-        elif len(arg) < 2:
-            raise CliParseError('Missing option name after: ' + arg)
-        elif arg[1].lower() != arg[1]:
-            raise CliParseError('Short Options must start with a lower case letter: ' + arg)
-        else:  # startswith '-'
-            context.addShortOption(arg[1:])
-
-    def process(self, arg):
-        if arg.startswith('-'):
-            return _OptionCheckState(self.__context, arg)
-        elif self.__context.requiresValue():
-            self.__context.appendOptionValue(arg)
-            return self
-        else:
-            return None
-
-
 class _StartState(object):
     'The initial state during parsing of the command line'
     def __init__(self, context):
         self.__context = context
+        self.__dash = context.dash
 
-    def process(self, arg, argsLeft):
-        if arg.startswith('-'):
-            return _OptionState(self.__context, arg)
-        elif argsLeft < self.__context.numberOfPositionalArguments:
+    def process(self, arg, isTrailing):
+        if arg.startswith(self.__dash):
+            return _OptionState.create(self.__context, arg)
+        elif isTrailing:
             return _PositionalState(self.__context, arg)
         else:
-            raise CliParseError('Expected option beginning with "-" or "--" but found: ' + arg)
+            raise CliParseError('Expected option beginning with "-" or "--" but found: ' + _decodeArgument(arg))
 
 
 class _OptionState(object):
     'We are processing an option in this state'
-    def __init__(self, context, arg):
+    def __init__(self, context):
         self.__context = context
-        if arg.startswith('--'):
-            context.addOption(arg[2:])
-        else:  # startswith '-'
-            context.addShortOption(arg[1:])
-
-    def process(self, arg, argsLeft):
-        if arg.startswith('-'):
-            return _OptionState(self.__context, arg)
-        elif argsLeft < self.__context.numberOfPositionalArguments:
+        self.__dash = context.dash
+
+    @classmethod
+    def create(cls, context, arg):
+        'Returns the state for processing the option named by "arg" (a _HelpState for --help or -?)'
+        if context.addOption(arg) is None:
+            return _HelpState(context)
+        return _OptionState(context)
+
+    def process(self, arg, isTrailing):
+        if arg.startswith(self.__dash) and (arg != self.__dash or not self.__context.readsStdin()):
+            return _OptionState.create(self.__context, arg)
+        elif isTrailing and not self.__context.requiresValue():
             return _PositionalState(self.__context, arg)
         else:
             self.__context.appendOptionValue(arg)
             return self
 
 
+class _HelpState(object):
+    'We have processed --help (or -?) in this state'
+    def __init__(self, context):
+        self.__context = context
+
+    def process(self, arg, isTrailing):
+        self.__context.raiseHelp(arg)
+
+
 class _PositionalState(object):
     'We are processing the positional arguments in this state'
     def __init__(self, context, arg):
         self.__context = context
+        self.__dash = context.dash
         context.addPositional(arg)
 
-    def process(self, arg, argsLeft):
-        if arg.startswith('-'):
-            raise CliParseError('Unexpected option "%s" found while processing positional arguments' % arg)
+    def process(self, arg, isTrailing):
+        if arg.startswith(self.__dash):
+            raise CliParseError('Unexpected option "%s" found while processing positional arguments' % _decodeArgument(arg))
         else:
             self.__context.addPositional(arg)
             return self
-
-
-class _Option(object):
-    'Provides access to the value(s) of a parsed command line option'
-    def __init__(self, optionsClass, optionDescription, values=None):
-        self.__optionsClass = optionsClass
-        self.__optionDescription = optionDescription
-        self.__name__ = optionDescription.methodName
-
-        if values is None:
-            if optionDescription.hasDefault:
-                self.__values = optionDescription.default
-            else:
-                self.__values = None
-        elif type(values) is list:
-            if len(values) == 0:
-                self.__values = True
-            elif len(values) == 1 and not optionDescription.isMultiValued:
-                self.__values = values[0]
-            else:
-                self.__values = values
-        else:
-            self.__values = values
-
-    def __call__(self, *params, **namedParams):
-        return self.__values
-
-    def __str__(self):
-        return self.__optionDescription
-
-    def __eq__(self, rhs):
-        return (isinstance(rhs, _Option) and
-                self.__optionsClass == rhs.__optionsClass and
-                self.__name__ == rhs.__name__)
-
-    def __ne__(self, rhs):
-        return not self == rhs
@@ -0,0 +1,69 @@
+from nose.tools import *
+
+from Cli import Cli
+from Cli import CliHelpError
+from Cli import CliParseError
+from Cli import option
+
+class MyOptions(object):
+   @option(shortName='o')
+   def getOutputFile(self): pass
+
+   @option
+   def getOutputDir(self): pass
+
+   @option
+   def getOut(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @option(multiValued=True)
+   def getHosts(self): pass
+
+class TestCliWithAbbreviations(object):
+   def setup(self):
+      self.cli = Cli(MyOptions, allowAbbreviations=True)
+
+   def testUnambiguousPrefixesAreAccepted(self):
+      myOptions = self.cli.parseArguments(['--outputF', 'a.txt', '--v', '--ho', 'x', 'y'])
+      assert_equals(myOptions.getOutputFile(), 'a.txt')
+      assert_true(myOptions.isVerbose())
+      assert_equals(myOptions.getHosts(), ['x', 'y'])
+
+   def testExactNameWinsOverLongerNames(self):
+      assert_equals(self.cli.parseArguments(['--out', 'x']).getOut(), 'x')
+
+   def testAmbiguousPrefixReportsEveryCandidate(self):
+      try:
+         self.cli.parseArguments(['--outp', 'x'])
+         assert_true(False)
+      except CliParseError as e:
+         assert_equals(str(e), 'Ambiguous option --outp could be any of: --outputDir, --outputFile')
+      try:
+         self.cli.parseArguments(['--h'])
+         assert_true(False)
+      except CliParseError as e:
+         assert_true('--help, --hosts' in str(e))
+
+   def testHelpCanBeAbbreviated(self):
+      assert_raises(CliHelpError, self.cli.parseArguments, ['--he'])
+
+   def testUnknownAndShortPrefixesAreStillRejected(self):
+      assert_raises(CliParseError, self.cli.parseArguments, ['--x', 'y'])
+      assert_raises(CliParseError, self.cli.parseArguments, ['-v'])
+      assert_raises(CliParseError, self.cli.parseArguments, ['--', 'y'])
+
+   def testAbbreviationsAreNotAcceptedByDefault(self):
+      assert_raises(CliParseError, Cli(MyOptions).parseArguments, ['--outputF', 'a.txt'])
+
+   def testCompletionsShareTheTrie(self):
+      assert_equals(self.cli.completions('--outp'), ['--outputDir', '--outputFile'])
+      assert_equals(self.cli.completions('--z'), [])
+      assert_equals(self.cli.completions('-o'), ['-o'])
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
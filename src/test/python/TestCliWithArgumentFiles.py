@@ -0,0 +1,100 @@
+from nose.tools import *
+import os
+import shutil
+import tempfile
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class MyOptions(object):
+   @option(multiValued=True, shortName='f')
+   def getFiles(self): pass
+
+   @option(valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getSize(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+class TestCliWithArgumentFiles(object):
+   def setup(self):
+      self.directory = tempfile.mkdtemp()
+
+   def teardown(self):
+      shutil.rmtree(self.directory)
+
+   def createArgumentFile(self, name, content):
+      path = os.path.join(self.directory, name)
+      argumentFile = open(path, 'wb')
+      try:
+         argumentFile.write(content.encode('utf-8'))
+      finally:
+         argumentFile.close()
+      return path
+
+   def testArgumentFileIsExpanded(self):
+      path = self.createArgumentFile('args.txt', '-f\na file.txt\r\n\nb.txt\n--size\n0x10')
+      myOptions = Cli(MyOptions, expandArgumentFiles=True).parseArguments(['--verbose', '@' + path, 'run'])
+      assert_equals(myOptions.getFiles(), ['a file.txt', 'b.txt'])
+      assert_equals(myOptions.getSize(), 16)
+      assert_true(myOptions.isVerbose())
+      assert_equals(myOptions.getCommand(), 'run')
+
+   def testLargeArgumentFile(self):
+      path = self.createArgumentFile('args.txt', '-f\n' + '\n'.join(['file%d.txt' % index for index in range(100000)]) + '\n')
+      myOptions = Cli(MyOptions, expandArgumentFiles=True).parseArguments(['@' + path, 'run'])
+      assert_equals(len(myOptions.getFiles()), 100000)
+      assert_equals(myOptions.getFiles()[-1], 'file99999.txt')
+
+   def testPositionalArgumentsCanComeFromArgumentFile(self):
+      path = self.createArgumentFile('args.txt', 'run\n')
+      myOptions = Cli(MyOptions, expandArgumentFiles=True).parseArguments(['-f', 'a', '@' + path])
+      assert_equals(myOptions.getFiles(), ['a'])
+      assert_equals(myOptions.getCommand(), 'run')
+
+   def testNestedArgumentFilesAreExpanded(self):
+      innerPath = self.createArgumentFile('inner.txt', 'b.txt\nc.txt\n')
+      outerPath = self.createArgumentFile('outer.txt', '-f\na.txt\n@%s\n--verbose\n' % innerPath)
+      myOptions = Cli(MyOptions, expandArgumentFiles=True).parseArguments(['@' + outerPath, 'run'])
+      assert_equals(myOptions.getFiles(), ['a.txt', 'b.txt', 'c.txt'])
+      assert_true(myOptions.isVerbose())
+
+   def testSameArgumentFileCanBeIncludedTwice(self):
+      path = self.createArgumentFile('files.txt', 'a.txt\n')
+      myOptions = Cli(MyOptions, expandArgumentFiles=True).parseArguments(['-f', '@' + path, '@' + path, 'run'])
+      assert_equals(myOptions.getFiles(), ['a.txt', 'a.txt'])
+
+   def testCyclicArgumentFilesThrow(self):
+      firstPath = os.path.join(self.directory, 'first.txt')
+      secondPath = self.createArgumentFile('second.txt', '@%s\n' % firstPath)
+      self.createArgumentFile('first.txt', '-f\na.txt\n@%s\n' % secondPath)
+      assert_raises(CliParseError, Cli(MyOptions, expandArgumentFiles=True).parseArguments, ['@' + firstPath, 'run'])
+
+   def testMissingArgumentFileThrows(self):
+      cli = Cli(MyOptions, expandArgumentFiles=True)
+      assert_raises(CliParseError, cli.parseArguments, ['@' + os.path.join(self.directory, 'missing.txt'), 'run'])
+
+   def testEmptyArgumentFileAddsNoArguments(self):
+      path = self.createArgumentFile('empty.txt', '')
+      assert_equals(Cli(MyOptions, expandArgumentFiles=True).parseArguments(['@' + path, 'run']).getCommand(), 'run')
+
+   def testArgumentFilesAreNotExpandedByDefault(self):
+      assert_equals(Cli(MyOptions).parseArguments(['-f', '@args.txt', 'run']).getFiles(), ['@args.txt'])
+
+   def testParseManyExpandsArgumentFiles(self):
+      path = self.createArgumentFile('args.txt', '--size\n7\n')
+      results = list(Cli(MyOptions, expandArgumentFiles=True).parseMany([['@' + path, 'run'], ['run']]))
+      assert_equals(results[0][1].getSize(), 7)
+      assert_true(results[1][1].getSize() is None)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,118 @@
+from nose.tools import *
+from nose.plugins.skip import SkipTest
+import warnings
+
+from Cli import Cli
+from Cli import CliError
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+# The asynchronous valueFormatters need Python 3.5+ syntax, so are compiled at runtime
+try:
+   import asyncio
+   exec('''
+class SlowNumericFormatter(object):
+   def __init__(self):
+      self.running = 0
+      self.maxRunning = 0
+
+   async def __call__(self, optionName, value):
+      self.running += 1
+      self.maxRunning = max(self.maxRunning, self.running)
+      try:
+         await asyncio.sleep(0.01)
+         return NUMERIC_VALUE_FORMATTER(optionName, value)
+      finally:
+         self.running -= 1
+
+async def upperCaseFormatter(optionName, value):
+   await asyncio.sleep(0)
+   return value.upper()
+
+async def parse(cli, args, **kwargs):
+   return await cli.parseArgumentsAsync(args, **kwargs)
+''')
+except (ImportError, SyntaxError):  # Python 2
+   asyncio = None
+   SlowNumericFormatter = lambda: NUMERIC_VALUE_FORMATTER
+   upperCaseFormatter = lambda optionName, value: value.upper()
+
+class MyOptions(object):
+   @option(multiValued=True, valueFormatter=SlowNumericFormatter())
+   def getNumbers(self): pass
+
+   @option(default='none', valueFormatter=upperCaseFormatter)
+   def getName(self): pass
+
+   @option(valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getSize(self): pass
+
+   @positional(1, valueFormatter=upperCaseFormatter)
+   def getMode(self): pass
+
+def run(cli, args, **kwargs):
+   loop = asyncio.new_event_loop()
+   try:
+      return loop.run_until_complete(parse(cli, args, **kwargs))
+   finally:
+      loop.close()
+
+class TestCliWithAsyncValueFormatter(object):
+   def setup(self):
+      if asyncio is None:
+         raise SkipTest('Asynchronous valueFormatters require Python 3.5 or later')
+      self.formatter = MyOptions.getNumbers.valueFormatter
+      self.formatter.maxRunning = 0
+
+   def testValuesAreFormattedByAsynchronousFormatters(self):
+      myOptions = run(Cli(MyOptions), ['--numbers', '1', '0x2', '--name', 'fred', '--size', '0x10', 'fast'])
+      assert_equals(myOptions.getNumbers(), [1, 2])
+      assert_equals(myOptions.getName(), 'FRED')
+      assert_equals(myOptions.getSize(), 16)
+      assert_equals(myOptions.getMode(), 'FAST')
+
+   def testFormattersRunConcurrentlyUpToTheLimit(self):
+      numbers = [str(number) for number in range(10)]
+      myOptions = run(Cli(MyOptions), ['--numbers'] + numbers + ['fast'], maxConcurrency=3)
+      assert_equals(myOptions.getNumbers(), list(range(10)))
+      assert_equals(self.formatter.maxRunning, 3)
+
+      myOptions = run(Cli(MyOptions), ['--numbers'] + numbers + ['fast'], maxConcurrency=None)
+      assert_equals(self.formatter.maxRunning, 10)
+
+   def testDefaultsOfAsynchronousFormattersAreFormattedLikeSpecifiedValues(self):
+      myOptions = run(Cli(MyOptions), ['fast'])
+      assert_equals(myOptions.getName(), 'NONE')
+      assert_true(myOptions.getNumbers() is None)
+      assert_equals(run(Cli(MyOptions), ['--name', 'none', 'fast']).getName(), myOptions.getName())
+
+   def testErrorRaisedByAsynchronousFormatterIsRaisedWhenAwaited(self):
+      assert_raises(CliParseError, run, Cli(MyOptions), ['--numbers', '1', 'abc', 'fast'])
+
+   def testSynchronousFormattersStillRaiseDuringParsing(self):
+      cli = Cli(MyOptions)
+      assert_raises(CliParseError, cli.parseArgumentsAsync, ['--size', 'abc', 'fast'])
+
+   def testParseArgumentsRejectsAsynchronousFormatters(self):
+      assert_raises(CliParseError, Cli(MyOptions).parseArguments, ['--numbers', '1', 'fast'])
+      assert_raises(CliParseError, Cli(MyOptions, lazyFormatting=True).parseArguments, ['--name', 'fred', 'fast'])
+      assert_raises(CliParseError, Cli(MyOptions).parseArguments, ['fast'])
+      assert_raises(CliParseError, Cli(MyOptions).parseArguments, ['fast'], asRecord=True)
+
+   def testCallingOutsideARunningLoopThrows(self):
+      warnings.simplefilter('error', DeprecationWarning)
+      try:
+         assert_raises(CliError, Cli(MyOptions).parseArgumentsAsync, ['--name', 'fred', 'fast'])
+      finally:
+         warnings.resetwarnings()
+
+   def testInvalidConcurrencyLimitThrows(self):
+      assert_raises(CliError, Cli(MyOptions).parseArgumentsAsync, ['fast'], 0)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,100 @@
+from nose.tools import *
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+from Cli import Cli
+from Cli import CliHelpError
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class MyOptions(object):
+   @option(multiValued=True, stdin=True, shortName='f')
+   def getFiles(self): pass
+
+   @option(valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getSize(self): pass
+
+   @option(valueFormatter=lambda optionName, value: value.decode('utf-8'))
+   def getName(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @positional(1)
+   def isEnabled(self): pass
+
+class TestCliWithBytesArguments(object):
+   def testValuesStayBytes(self):
+      myOptions = Cli(MyOptions, bytesArguments=True).parseArguments([b'-f', b'caf\xe9.txt', b'\xff\xfe', b'--size', b'0x10', b'--verbose', b'TRUE'])
+      assert_equals(list(myOptions.getFiles()), [b'caf\xe9.txt', b'\xff\xfe'])
+      assert_equals(myOptions.getSize(), 16)
+      assert_true(myOptions.isVerbose())
+      assert_true(myOptions.isEnabled())
+
+   def testFormatterCanConvertBytes(self):
+      myOptions = Cli(MyOptions, bytesArguments=True).parseArguments([b'--name', b'caf\xc3\xa9', b'false'])
+      assert_equals(myOptions.getName(), b'caf\xc3\xa9'.decode('utf-8'))
+      assert_false(myOptions.isEnabled())
+
+   def testNulTerminatedBuffer(self):
+      buffer = b'--files\0a.txt\0\0b.txt\0--verbose\0true\0'
+      myOptions = Cli(MyOptions, bytesArguments=True).parseArguments(buffer)
+      assert_equals(list(myOptions.getFiles()), [b'a.txt', b'', b'b.txt'])
+      assert_true(myOptions.isVerbose())
+      assert_equals(Cli(MyOptions, bytesArguments=True).parseArguments(bytearray(b'false')).isEnabled(), False)
+
+   def testSysArgvIsEncoded(self):
+      originalArgv = sys.argv
+      sys.argv = ['prog', '-f', 'a.txt', 'true']
+      try:
+         assert_equals(list(Cli(MyOptions, bytesArguments=True).parseArguments().getFiles()), [b'a.txt'])
+      finally:
+         sys.argv = originalArgv
+
+   def testStdinValuesStayBytes(self):
+      myOptions = Cli(MyOptions, bytesArguments=True, stdin=io.BytesIO(b'\xff.txt\nb.txt\n')).parseArguments([b'-f', b'a.txt', b'-', b'true'])
+      assert_equals(list(myOptions.getFiles()), [b'a.txt', b'\xff.txt', b'b.txt'])
+
+   def testArgumentFilesAreReadAsBytes(self):
+      directory = tempfile.mkdtemp()
+      try:
+         path = os.path.join(directory, 'args.txt')
+         argumentFile = open(path, 'wb')
+         try:
+            argumentFile.write(b'-f\n\xff.txt\n')
+         finally:
+            argumentFile.close()
+         myOptions = Cli(MyOptions, bytesArguments=True, expandArgumentFiles=True).parseArguments([b'@' + path.encode('utf-8'), b'true'])
+         assert_equals(list(myOptions.getFiles()), [b'\xff.txt'])
+      finally:
+         shutil.rmtree(directory)
+
+   def testMissingArgumentFileIsNamedInTheError(self):
+      directory = tempfile.mkdtemp()
+      try:
+         path = os.path.join(directory, 'missing.txt')
+         try:
+            Cli(MyOptions, bytesArguments=True, expandArgumentFiles=True).parseArguments([b'@' + path.encode('utf-8'), b'true'])
+            assert_true(False)
+         except CliParseError as e:
+            assert_true(str(e).startswith('Cannot read argument file "%s": ' % path), str(e))
+      finally:
+         shutil.rmtree(directory)
+
+   def testErrorsAndHelp(self):
+      cli = Cli(MyOptions, bytesArguments=True)
+      assert_raises(CliParseError, cli.parseArguments, [b'--unknown', b'true'])
+      assert_raises(CliParseError, cli.parseArguments, [b'maybe'])
+      assert_raises(CliParseError, cli.parseArguments, [b'--verbose', b'x', b'true'])
+      assert_raises(CliHelpError, cli.parseArguments, [b'--help'])
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
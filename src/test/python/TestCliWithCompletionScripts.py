@@ -0,0 +1,90 @@
+from nose.tools import *
+from nose.plugins.skip import SkipTest
+import os
+import shutil
+import subprocess
+import tempfile
+
+from Cli import Cli
+from Cli import CliError
+from Cli import option
+from Cli import positional
+
+class MyOptions(object):
+   @option(multiValued=True, shortName='f')
+   def getInputFiles(self):
+      "List of input files (it's [optional])"
+
+   @option(shortName='o')
+   def getOutputFile(self): pass
+
+   @option
+   def isReplace(self): pass
+
+   @positional(1)
+   def getTarget(self): pass
+
+class MyChangedOptions(MyOptions):
+   @option
+   def isDryRun(self): pass
+
+class TestCliWithCompletionScripts(object):
+   def setup(self):
+      self.directory = tempfile.mkdtemp()
+
+   def teardown(self):
+      shutil.rmtree(self.directory)
+
+   def testBashScriptCompletesOptions(self):
+      script = Cli(MyOptions, prog='my-app').completionScript('bash')
+      assert_true("'--inputFiles -f --outputFile -o --replace --help -?'" in script)
+      assert_true("complete -o filenames -F _cli_complete_my_app 'my-app'" in script)
+      path = os.path.join(self.directory, 'my-app.bash')
+      Cli(MyOptions, prog='my-app').writeCompletionScript(path)
+      try:
+         output = subprocess.Popen(['bash', '-c', 'source "$0"; COMP_WORDS=(my-app --in); COMP_CWORD=1; _cli_complete_my_app; echo "${COMPREPLY[@]}"', path], stdout=subprocess.PIPE).communicate()[0]
+      except OSError:
+         raise SkipTest('bash is not installed')
+      assert_equals(output.decode('utf-8').strip(), '--inputFiles')
+
+   def testBashScriptDoesNotExpandTheHelpTokenAsAPathname(self):
+      script = Cli(MyOptions, prog='my-app').completionScript('bash')
+      assert_true("        while IFS= read -r completion; do COMPREPLY+=(\"$completion\"); done < <(compgen -W '--inputFiles -f --outputFile -o --replace --help -?' -- \"$current\")" in script)
+      path = os.path.join(self.directory, 'my-app.bash')
+      Cli(MyOptions, prog='my-app').writeCompletionScript(path)
+      open(os.path.join(self.directory, '-x'), 'w').close()
+      try:
+         output = subprocess.Popen(['bash', '-c', 'source "$0"; COMP_WORDS=(my-app -); COMP_CWORD=1; _cli_complete_my_app; printf "%s\\n" "${COMPREPLY[@]}"', path], stdout=subprocess.PIPE, cwd=self.directory).communicate()[0]
+      except OSError:
+         raise SkipTest('bash is not installed')
+      assert_equals(output.decode('utf-8').split(), ['--inputFiles', '-f', '--outputFile', '-o', '--replace', '--help', '-?'])
+
+   def testZshScriptDescribesOptionsAndPositionalArguments(self):
+      script = Cli(MyOptions, prog='my-app').completionScript('zsh')
+      assert_true(script.startswith('#compdef my-app\n'))
+      assert_true("'(--inputFiles -f)'{--inputFiles,-f}'[List of input files (it'\\''s \\[optional\\])]:*-*:value:_files'" in script)
+      assert_true("'(--outputFile -o)'{--outputFile,-o}':value:_files'" in script)
+      assert_true("'--replace'" in script)
+      assert_true("':target:_files'" in script)
+
+   def testFishScriptCompletesOptions(self):
+      script = Cli(MyOptions, prog='my-app').completionScript('fish')
+      assert_true("complete -c 'my-app' -l inputFiles -s 'f' -d 'List of input files (it'\\''s [optional])' -r\n" in script)
+      assert_true("complete -c 'my-app' -l replace\n" in script)
+
+   def testScriptIsOnlyRewrittenWhenTheOptionsChange(self):
+      path = os.path.join(self.directory, 'my-app.fish')
+      assert_true(Cli(MyOptions, prog='my-app').writeCompletionScript(path, 'fish'))
+      assert_false(Cli(MyOptions, prog='my-app').writeCompletionScript(path, 'fish'))
+      assert_true(Cli(MyChangedOptions, prog='my-app').writeCompletionScript(path, 'fish'))
+      assert_true('-l dryRun' in open(path).read())
+      assert_false(Cli(MyChangedOptions, prog='my-app').writeCompletionScript(path, 'fish'))
+
+   def testUnsupportedShellThrows(self):
+      assert_raises(CliError, Cli(MyOptions).completionScript, 'tcsh')
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
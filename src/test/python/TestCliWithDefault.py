@@ -12,6 +12,22 @@ class BooleanOptionWithDefaultSpecified(object):
    @option(default=True)
    def isBadOption(self): pass
 
+class CountingFormatter(object):
+   def __init__(self):
+      self.callCount = 0
+
+   def __call__(self, optionName, value):
+      self.callCount += 1
+      return str(value)
+
+class CountedDefaultOptions(object):
+   @option(default=123, valueFormatter=CountingFormatter())
+   def getOptionWithDefault(self): pass
+
+class DefaultListOptions(object):
+   @option(multiValued=True, default=['a', 'b'])
+   def getOptionWithDefaultList(self): pass
+
 class TestCliWithDefault(object):
    def testUnspecifiedNonBooleanOptionWithDefaultReturnsDefault(self):
       myOptions = Cli(MyOptions).parseArguments([])
@@ -24,6 +40,22 @@ class TestCliWithDefault(object):
    def testBooleanOptionWithDefaultThrows(self):
       assert_raises(CliParseError, Cli, BooleanOptionWithDefaultSpecified)
 
+   def testDefaultIsOnlyFormattedOnceWhenFirstNeeded(self):
+      formatter = CountedDefaultOptions.getOptionWithDefault.valueFormatter
+      cli = Cli(CountedDefaultOptions)
+      cli.parseArguments(['--optionWithDefault', '456'])
+      assert_equals(formatter.callCount, 1)
+      assert_equals(cli.parseArguments([]).getOptionWithDefault(), '123')
+      assert_equals(formatter.callCount, 2)
+      cli.parseArguments([])
+      cli.helpText
+      assert_equals(formatter.callCount, 2)
+
+   def testDefaultListIsNotSharedBetweenParses(self):
+      cli = Cli(DefaultListOptions)
+      cli.parseArguments([]).getOptionWithDefaultList().append('c')
+      assert_equals(cli.parseArguments([]).getOptionWithDefaultList(), ['a', 'b'])
+
 if __name__ == '__main__':
    import sys, inspect, nose
 
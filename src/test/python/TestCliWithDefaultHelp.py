@@ -72,6 +72,13 @@ class MyOptions(object):
    @positional(2)
    def getArgumentB(self): pass
 
+class HelpFile(object):
+   def __init__(self):
+      self.lines = []
+
+   def write(self, line):
+      self.lines.append(line)
+
 class TestCliWithDefaultHelp(object):
    def testCanRequestHelpTextFromCliInstance(self):
       self.__checkHelpText(Cli(MyOptions).helpText)
@@ -90,19 +97,45 @@ class TestCliWithDefaultHelp(object):
                                                           '--optionWithMin3Max5', '1', '2', '3',
                                                           'positionalA', 'positionalB']).helpText)
 
+   def testHelpTextIsOnlyConstructedOnce(self):
+      cli = Cli(MyOptions)
+      assert_true(cli.helpText is cli.helpText)
+
+   def testParsedArgumentsAreAnInstanceOfTheOptionsClass(self):
+      myOptions = Cli(MyOptions).parseArguments(['--optionWithMin1', '1',
+                                                 '--optionWithMin2', '1', '2',
+                                                 '--optionWithMin3', '1', '2', '3',
+                                                 '--optionWithMin1Max2', '1',
+                                                 '--optionWithMin1Max3', '1',
+                                                 '--optionWithMin2Max2', '1', '2',
+                                                 '--optionWithMin2Max3', '1', '2',
+                                                 '--optionWithMin2Max4', '1', '2',
+                                                 '--optionWithMin3Max3', '1', '2', '3',
+                                                 '--optionWithMin3Max4', '1', '2', '3',
+                                                 '--optionWithMin3Max5', '1', '2', '3',
+                                                 'positionalA', 'positionalB'])
+      assert_true(isinstance(myOptions, MyOptions))
+
+   def testHelpTextListsTheOptionsInColumns(self):
+      self.__checkHelpText(Cli(MyOptions).helpText)
+
    def testMinusMinusHelpGeneratesHelpText(self):
-      try:
-         Cli(MyOptions).parseArguments(['--help'])
-         assert False
-      except CliHelpError as e:
-         self.__checkHelpText(e.helpText)
+      self.__checkHelpArgument('--help')
 
    def testMinusQuestionMarkGeneratesHelpText(self):
+      self.__checkHelpArgument('-?')
+
+   def __checkHelpArgument(self, helpArgument):
+      cli = Cli(MyOptions)
       try:
-         Cli(MyOptions).parseArguments(['-?'])
+         cli.parseArguments([helpArgument])
          assert False
       except CliHelpError as e:
-         self.__checkHelpText(e.helpText)
+         helpFile = HelpFile()
+         cli.writeHelp(helpFile)
+         assert_equals(e.helpText, ''.join(helpFile.lines).rstrip('\n'))
+         assert_true(e.helpText.startswith('Usage: TestCliWithDefaultHelp.py '))
+         assert_true(e.helpText.find('\nwhere:\n') != -1)
 
    def __checkHelpText(self, helpText):
       helpLines = helpText.splitlines()
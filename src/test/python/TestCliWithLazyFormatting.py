@@ -0,0 +1,95 @@
+from nose.tools import *
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class CountingFormatter(object):
+   def __init__(self):
+      self.callCount = 0
+
+   def __call__(self, optionName, value):
+      self.callCount += 1
+      return NUMERIC_VALUE_FORMATTER(optionName, value)
+
+class MyOptions(object):
+   @option(multiValued=True, valueFormatter=CountingFormatter())
+   def getNumbers(self): pass
+
+   @option(valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getSize(self): pass
+
+   @option(default=7, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getCount(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @positional(1, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getLength(self): pass
+
+   @positional(2)
+   def isEnabled(self): pass
+
+class MyOptionsWithValidate(object):
+   @option(valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getSize(self): pass
+
+   def validate(self):
+      return 'user validate'
+
+   def asDict(self):
+      return {'size': self.getSize()}
+
+class TestCliWithLazyFormatting(object):
+   def testValuesAreFormattedWhenFirstAccessed(self):
+      formatter = MyOptions.getNumbers.valueFormatter
+      formatter.callCount = 0
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['--numbers', '1', '0x2', '3', '4', 'true'])
+      assert_equals(formatter.callCount, 0)
+      assert_equals(myOptions.getNumbers(), [1, 2, 3])
+      assert_equals(formatter.callCount, 3)
+      assert_equals(myOptions.getNumbers(), [1, 2, 3])
+      assert_equals(formatter.callCount, 3)
+
+   def testAllKindsOfOptionsAreReturnedCorrectly(self):
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['--size', '0x10', '--verbose', '12', 'FALSE'])
+      assert_equals(myOptions.getSize(), 16)
+      assert_equals(myOptions.getCount(), 7)
+      assert_true(myOptions.isVerbose())
+      assert_equals(myOptions.getLength(), 12)
+      assert_false(myOptions.isEnabled())
+      assert_true(myOptions.getNumbers() is None)
+
+   def testInvalidValueThrowsWhenAccessed(self):
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['--size', 'abc', '12', 'true'])
+      assert_equals(myOptions.getLength(), 12)
+      assert_raises(CliParseError, myOptions.getSize)
+
+   def testValidateThrowsForAnyInvalidValue(self):
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['12', 'true'])
+      assert_true(myOptions.validate() is myOptions)
+
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['abc', 'true'])
+      assert_raises(CliParseError, myOptions.validate)
+
+   def testOptionsClassMethodsAreNotReplaced(self):
+      myOptions = Cli(MyOptionsWithValidate, lazyFormatting=True).parseArguments(['--size', '0x10'])
+      assert_equals(myOptions.validate(), 'user validate')
+      assert_equals(myOptions.asDict(), {'size': 16})
+
+   def testInvalidBooleanPositionalStillThrowsDuringParsing(self):
+      cli = Cli(MyOptions, lazyFormatting=True)
+      assert_raises(CliParseError, cli.parseArguments, ['12', 'maybe'])
+
+   def testValuesAreFormattedDuringParsingByDefault(self):
+      cli = Cli(MyOptions)
+      assert_raises(CliParseError, cli.parseArguments, ['--size', 'abc', '12', 'true'])
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,37 @@
+from nose.tools import *
+
+from Cli import Cli
+from Cli import option
+
+def createOptionsClass(numberOfOptions):
+   methods = {}
+   for index in range(numberOfOptions):
+      def method(self): pass
+      method.__name__ = 'getOption%d' % index
+      methods[method.__name__] = option(shortName='o%d' % index)(method)
+   return type('ManyOptions%d' % numberOfOptions, (object,), methods)
+
+class TestCliWithManyOptions(object):
+   def setup(self):
+      self.largeOptions = createOptionsClass(1000)
+
+   def testAllOptionsCanBeParsed(self):
+      myOptions = Cli(self.largeOptions).parseArguments(['--option0', 'a', '-o999', 'b'])
+      assert_equals(myOptions.getOption0(), 'a')
+      assert_equals(myOptions.getOption999(), 'b')
+      assert_true(myOptions.getOption500() is None)
+
+   def testEveryTokenIsLookedUpInOneTable(self):
+      # (so the cost of each argument does not grow with the number of options, see BenchmarkSuite.py)
+      optionTokens = Cli._getSpec(self.largeOptions, 'prog', None, None).optionTokens
+      assert_equals(type(optionTokens), dict)
+      assert_equals(len(optionTokens), 2 * 1000 + 2)
+      assert_true(optionTokens['--option999'] is optionTokens['-o999'])
+      assert_equals(optionTokens['--option999'].name, 'option999')
+      assert_true(optionTokens['--help'] is None and optionTokens['-?'] is None)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,87 @@
+from nose.tools import *
+import threading
+
+from Cli import Cli
+from Cli import CliError
+from Cli import CliParseError
+from Cli import memoizedValueFormatter
+from Cli import option
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class CountingFormatter(object):
+   def __init__(self):
+      self.callCount = 0
+
+   def __call__(self, optionName, value):
+      self.callCount += 1
+      return NUMERIC_VALUE_FORMATTER(optionName, value)
+
+class TestCliWithMemoizedValueFormatter(object):
+   def setup(self):
+      self.formatter = CountingFormatter()
+      self.memoizedFormatter = memoizedValueFormatter(self.formatter, maxSize=3)
+      class MyOptions(object):
+         @option(multiValued=True, valueFormatter=self.memoizedFormatter)
+         def getIds(self): pass
+
+         @option(valueFormatter=self.memoizedFormatter)
+         def getSize(self): pass
+      self.cli = Cli(MyOptions)
+
+   def testRepeatedValuesAreOnlyFormattedOnce(self):
+      myOptions = self.cli.parseArguments(['--ids', '1', '0x2', '1', '1', '--size', '0x2'])
+      assert_equals(myOptions.getIds(), [1, 2, 1, 1])
+      assert_equals(myOptions.getSize(), 2)
+      assert_equals(self.formatter.callCount, 2)
+      assert_equals(self.memoizedFormatter.cacheStats(), {'hits': 3, 'misses': 2, 'size': 2, 'maxSize': 3})
+
+   def testLeastRecentlyUsedValueIsEvicted(self):
+      self.cli.parseArguments(['--ids', '1', '2', '3', '1', '4'])
+      assert_equals(self.memoizedFormatter.cacheStats()['size'], 3)
+      assert_equals(self.formatter.callCount, 4)
+      self.cli.parseArguments(['--ids', '1', '3', '4'])
+      assert_equals(self.formatter.callCount, 4)
+      self.cli.parseArguments(['--ids', '2', '4'])
+      assert_equals(self.formatter.callCount, 5)
+
+   def testErrorsAreNotCached(self):
+      assert_raises(CliParseError, self.cli.parseArguments, ['--size', 'abc'])
+      assert_raises(CliParseError, self.cli.parseArguments, ['--size', 'abc'])
+      assert_equals(self.formatter.callCount, 2)
+      assert_equals(self.memoizedFormatter.cacheStats()['size'], 0)
+
+   def testClearCache(self):
+      self.cli.parseArguments(['--ids', '1', '1'])
+      self.memoizedFormatter.clearCache()
+      assert_equals(self.memoizedFormatter.cacheStats(), {'hits': 0, 'misses': 0, 'size': 0, 'maxSize': 3})
+      self.cli.parseArguments(['--size', '1'])
+      assert_equals(self.formatter.callCount, 2)
+
+   def testCanBeUsedFromManyThreads(self):
+      errors = []
+      def parse():
+         try:
+            for index in range(200):
+               values = [str(value) for value in range(index % 7, index % 7 + 5)]
+               assert_equals(self.cli.parseArguments(['--ids'] + values).getIds(), [int(value) for value in values])
+         except Exception as e:
+            errors.append(e)
+      threads = [threading.Thread(target=parse) for index in range(4)]
+      for thread in threads:
+         thread.start()
+      for thread in threads:
+         thread.join()
+      assert_equals(errors, [])
+      stats = self.memoizedFormatter.cacheStats()
+      assert_equals(stats['hits'] + stats['misses'], 4 * 200 * 5)
+      assert_true(stats['size'] <= 3)
+
+   def testInvalidParameters(self):
+      assert_raises(CliError, memoizedValueFormatter, 'notCallable')
+      assert_raises(CliError, memoizedValueFormatter, NUMERIC_VALUE_FORMATTER, 0)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,85 @@
+from nose.tools import *
+from nose.plugins.skip import SkipTest
+import array
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_ARRAY_VALUE_FORMATTER
+from Cli import NUMERIC_NUMPY_VALUE_FORMATTER
+
+class MyOptions(object):
+   @option(multiValued=True, valueFormatter=NUMERIC_ARRAY_VALUE_FORMATTER)
+   def getIds(self): pass
+
+   @option(multiValued=True, default=['1', '0x2'], valueFormatter=NUMERIC_ARRAY_VALUE_FORMATTER)
+   def getSizes(self): pass
+
+   @option(valueFormatter=NUMERIC_ARRAY_VALUE_FORMATTER)
+   def getCount(self): pass
+
+   @positional(1, valueFormatter=NUMERIC_ARRAY_VALUE_FORMATTER)
+   def getLimit(self): pass
+
+class TestCliWithNumericArrays(object):
+   def testValuesAreFormattedIntoAnArray(self):
+      myOptions = Cli(MyOptions).parseArguments(['--ids'] + [str(index) for index in range(10000)] + ['--count', '0x10', '0b101'])
+      ids = myOptions.getIds()
+      assert_true(isinstance(ids, array.array))
+      assert_equals(len(ids), 10000)
+      assert_equals(ids[9999], 9999)
+      assert_equals(myOptions.getCount(), 16)
+      assert_equals(myOptions.getLimit(), 5)
+
+   def testPrefixedValuesAreFormattedAsNumericValueFormatterWould(self):
+      ids = Cli(MyOptions).parseArguments(['--ids', '10', '0x10', '010', '0b10', '0', '7', '1'])
+      assert_equals(list(ids.getIds()), [10, 16, 8, 2, 0, 7])
+
+   def testFirstInvalidValueIsReportedWithItsIndex(self):
+      try:
+         Cli(MyOptions).parseArguments(['--ids', '1', '2', 'abc', '4', 'xyz', '1'])
+         assert_true(False)
+      except CliParseError as e:
+         assert_true('index 2' in str(e))
+         assert_true('abc' in str(e))
+
+   def testTooLargeValueIsReported(self):
+      try:
+         Cli(MyOptions).parseArguments(['--ids', '1', str(2 ** 64), '1'])
+         assert_true(False)
+      except CliParseError as e:
+         assert_true('index 1' in str(e))
+
+   def testDefaultIsCopied(self):
+      cli = Cli(MyOptions)
+      sizes = cli.parseArguments(['1']).getSizes()
+      assert_equals(list(sizes), [1, 2])
+      sizes.append(3)
+      assert_equals(list(cli.parseArguments(['1']).getSizes()), [1, 2])
+
+   def testLazyFormattingFormatsAllValuesWhenFirstUsed(self):
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['--ids', '1', 'abc', '1'])
+      assert_raises(CliParseError, myOptions.getIds)
+
+   def testRecordHoldsTheArray(self):
+      record = Cli(MyOptions).parseArguments(['--ids', '3', '4', '1'], asRecord=True)
+      assert_equals(list(record.ids), [3, 4])
+
+   def testNumpyArray(self):
+      try:
+         import numpy
+      except ImportError:
+         raise SkipTest('numpy is not installed')
+      class MyNumpyOptions(object):
+         @option(multiValued=True, valueFormatter=NUMERIC_NUMPY_VALUE_FORMATTER)
+         def getIds(self): pass
+      ids = Cli(MyNumpyOptions).parseArguments(['--ids', '1', '0x2', '3']).getIds()
+      assert_equals(ids.dtype, numpy.int64)
+      assert_equals(ids.tolist(), [1, 2, 3])
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,104 @@
+from nose.tools import *
+from nose.plugins.skip import SkipTest
+
+import pickle
+
+from Cli import Cli
+from Cli import CliHelpError
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class MyOptions(object):
+   @option(shortName='p', default=0, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getPriority(self): pass
+
+   @option(multiValued=True)
+   def getInputFiles(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+class TestCliWithParseMany(object):
+   def testEachArgumentsIsParsedInTurn(self):
+      results = list(Cli(MyOptions).parseMany([['run'], ['-p', '3', '--inputFiles', 'a', 'b', 'stop']]))
+      assert_equals([index for index, result in results], [0, 1])
+      assert_equals(results[0][1].getCommand(), 'run')
+      assert_equals(results[0][1].getPriority(), 0)
+      assert_equals(results[1][1].getCommand(), 'stop')
+      assert_equals(results[1][1].getPriority(), 3)
+      assert_equals(results[1][1].getInputFiles(), ['a', 'b'])
+
+   def testInvalidArgumentsYieldTheirError(self):
+      results = list(Cli(MyOptions).parseMany([['run'], ['-p', 'x', 'run'], [], ('--help',), 'run', ('walk',)]))
+      assert_equals(len(results), 6)
+      assert_true(isinstance(results[1][1], CliParseError))
+      assert_true(isinstance(results[2][1], CliParseError))
+      assert_true(isinstance(results[3][1], CliHelpError))
+      assert_true(isinstance(results[4][1], CliParseError))
+      assert_equals(results[5][1].getCommand(), 'walk')
+
+   def testResultsAreStreamed(self):
+      def argsList():
+         yield ['run']
+         raise AssertionError('Only the first arguments should have been read')
+      results = Cli(MyOptions).parseMany(argsList())
+      index, myOptions = next(results)
+      assert_equals(myOptions.getCommand(), 'run')
+
+   def testInvalidArgumentsRaiseTheirErrorIfRequested(self):
+      results = Cli(MyOptions).parseMany([['run'], []], raiseErrors=True)
+      next(results)
+      assert_raises(CliParseError, next, results)
+
+   def testParsedOptionsCanBePickled(self):
+      myOptions = Cli(MyOptions).parseArguments(['-p', '3', '--inputFiles', 'a', 'b', 'stop'])
+      unpickledOptions = pickle.loads(pickle.dumps(myOptions))
+      assert_true(isinstance(unpickledOptions, MyOptions))
+      assert_equals(unpickledOptions.getPriority(), 3)
+      assert_equals(unpickledOptions.getInputFiles(), ['a', 'b'])
+      assert_equals(unpickledOptions.getCommand(), 'stop')
+      assert_equals(unpickledOptions.helpText, myOptions.helpText)
+
+   def testEachArgumentsIsParsedInParallel(self):
+      self.__requireFutures()
+      argsList = [['-p', str(index), 'run%d' % index] for index in range(50)]
+      argsList[7] = ['-p', 'x', 'run']
+      results = list(Cli(MyOptions).parseManyInParallel(argsList, maxWorkers=2, chunkSize=4))
+      assert_equals([index for index, result in results], list(range(50)))
+      assert_true(isinstance(results[7][1], CliParseError))
+      assert_equals(results[8][1].getPriority(), 8)
+      assert_equals(results[8][1].getCommand(), 'run8')
+
+   def testUnorderedResultsFromParallelParsingHaveTheirIndex(self):
+      self.__requireFutures()
+      argsList = (['-p', str(index), 'run%d' % index] for index in range(50))
+      results = sorted(Cli(MyOptions).parseManyInParallel(argsList, maxWorkers=2, chunkSize=3, ordered=False), key=lambda result: result[0])
+      assert_equals([index for index, result in results], list(range(50)))
+      assert_equals([result.getPriority() for index, result in results], list(range(50)))
+
+   def testInvalidArgumentsRaiseTheirErrorInParallelIfRequested(self):
+      self.__requireFutures()
+      results = Cli(MyOptions).parseManyInParallel([['run'], []], maxWorkers=1, raiseErrors=True)
+      assert_raises(CliParseError, list, results)
+
+   def testLazilyFormattedValuesAreValidatedInParallel(self):
+      self.__requireFutures()
+      cli = Cli(MyOptions, lazyFormatting=True)
+      results = list(cli.parseManyInParallel([['-p', '1', 'run'], ['-p', 'x', 'run']], maxWorkers=1))
+      assert_equals(results[0][1].getPriority(), 1)
+      assert_true(isinstance(results[1][1], CliParseError))
+      assert_raises(CliParseError, list, cli.parseManyInParallel([['-p', 'x', 'run']], maxWorkers=1, raiseErrors=True))
+
+   def __requireFutures(self):
+      try:
+         import concurrent.futures
+      except ImportError:
+         raise SkipTest('concurrent.futures is not available')
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
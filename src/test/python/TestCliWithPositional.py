@@ -124,6 +124,16 @@ class TestCliWithPositional(object):
       assert_equals(myOptions.getPositionalArgumentA(), 'pA')
       assert_equals(myOptions.getPositionalArgumentB(), 'pB')
 
+   def testPositionalArgumentsFromAGeneratorRetrievedCorrectly(self):
+      myOptions = Cli(MultiValuedAndPositionalOptions).parseArguments(arg for arg in ['--option', 'A', 'B', 'pA', 'pB'])
+      assert_equals(myOptions.getOption(), ['A', 'B'])
+      assert_equals(myOptions.getPositionalArgumentA(), 'pA')
+      assert_equals(myOptions.getPositionalArgumentB(), 'pB')
+
+   def testOptionValuesInPlaceOfPositionalArgumentsThrows(self):
+      cli = Cli(MyOptions)
+      assert_raises(CliParseError, cli.parseArguments, iter(['--optionalA', 'A', 'pA']))
+
    def testNonIntPositionalDataTypeThrows(self):
       try:
          class BadPositionalDataType(object):
@@ -0,0 +1,90 @@
+from nose.tools import *
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class MyOptions(object):
+   @option(multiValued=True, shortName='f')
+   def getInputFiles(self): pass
+
+   @option(default='0x10', valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getSize(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @option(multiValued=True, default=['a', 'b'])
+   def getLabels(self): pass
+
+   @positional(1, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getCount(self): pass
+
+   @positional(2)
+   def isEnabled(self): pass
+
+class MyKeywordOptions(object):
+   @option
+   def getFrom(self): pass
+
+   @option
+   def getClass(self): pass
+
+   @option
+   def getImport(self): pass
+
+   @positional(1)
+   def getTo(self): pass
+
+class TestCliWithRecords(object):
+   def testRecordHoldsEveryFormattedValue(self):
+      record = Cli(MyOptions).parseArguments(['-f', 'a.txt', 'b.txt', '--verbose', '0x3', 'true'], asRecord=True)
+      assert_equals(record.inputFiles, ['a.txt', 'b.txt'])
+      assert_equals(record.size, 16)
+      assert_true(record.verbose)
+      assert_equals(record.labels, ['a', 'b'])
+      assert_equals(record.count, 3)
+      assert_true(record.enabled)
+
+   def testRecordFieldsAreOptionsByNameThenPositionalArguments(self):
+      cli = Cli(MyOptions)
+      assert_equals(cli.recordFields, ('inputFiles', 'labels', 'size', 'verbose', 'count', 'enabled'))
+      record = cli.parseArguments(['1', 'false'], asRecord=True)
+      assert_equals(tuple(record), (None, ['a', 'b'], 16, False, 1, False))
+      assert_equals(record._asdict()['count'], 1)
+
+   def testRecordIsImmutable(self):
+      record = Cli(MyOptions).parseArguments(['1', 'false'], asRecord=True)
+      assert_raises(AttributeError, setattr, record, 'size', 4)
+
+   def testRecordIsFormattedStraightAwayEvenWithLazyFormatting(self):
+      cli = Cli(MyOptions, lazyFormatting=True)
+      assert_equals(cli.parseArguments(['--size', '0x20', '1', 'false'], asRecord=True).size, 32)
+      assert_raises(CliParseError, cli.parseArguments, ['--size', 'abc', '1', 'false'], asRecord=True)
+
+   def testKeywordFieldsHaveAnUnderscoreAppended(self):
+      cli = Cli(MyKeywordOptions)
+      assert_equals(cli.recordFields, ('class_', 'from_', 'import_', 'to'))
+      record = cli.parseArguments(['--from', 'a', '--class', 'b', 'c'], asRecord=True)
+      assert_equals((record.from_, record.class_, record.import_, record.to), ('a', 'b', None, 'c'))
+      assert_equals(dict(cli.parseArguments(['--from', 'a', 'c']).asDict())['from'], 'a')
+
+   def testAsDictIsAViewOfTheOptionValues(self):
+      myOptions = Cli(MyOptions, lazyFormatting=True).parseArguments(['-f', 'a.txt', '0x3', 'true'])
+      values = myOptions.asDict()
+      assert_equals(len(values), 6)
+      assert_equals(list(values), ['inputFiles', 'labels', 'size', 'verbose', 'count', 'enabled'])
+      assert_equals(values['count'], 3)
+      assert_true(values['labels'] is myOptions.getLabels())
+      assert_equals(dict(values), {'inputFiles': ['a.txt'], 'labels': ['a', 'b'], 'size': 16, 'verbose': False, 'count': 3, 'enabled': True})
+      assert_true('size' in values)
+      assert_false('getSize' in values)
+      assert_raises(KeyError, lambda: values['getSize'])
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
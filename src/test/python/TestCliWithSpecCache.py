@@ -0,0 +1,145 @@
+from nose.tools import *
+
+import gc
+import glob
+import json
+import os
+import shutil
+import tempfile
+import weakref
+
+from Cli import Cli
+from Cli import option
+from Cli import positional
+
+class MyOptions(object):
+   @option
+   def getSimpleOption(self): pass
+
+class MyCachedOptions(object):
+   @option(shortName='o', default='x')
+   def getSimpleOption(self): pass
+
+   @positional(2)
+   def getArgumentB(self): pass
+
+   @positional(1)
+   def getArgumentA(self): pass
+
+class TestCliWithSpecCache(object):
+   def setup(self):
+      Cli.clearSpecCache()
+      self.cacheDir = tempfile.mkdtemp()
+
+   def teardown(self):
+      shutil.rmtree(self.cacheDir)
+
+   def testFirstConstructionIsACacheMiss(self):
+      Cli(MyOptions)
+      stats = Cli.specCacheStats()
+      assert_equals(stats['hits'], 0)
+      assert_equals(stats['misses'], 1)
+      assert_equals(stats['size'], 1)
+
+   def testSubsequentConstructionIsACacheHit(self):
+      Cli(MyOptions)
+      myOptions = Cli(MyOptions).parseArguments(['--simpleOption', 'abc'])
+      assert_equals(myOptions.getSimpleOption(), 'abc')
+      stats = Cli.specCacheStats()
+      assert_equals(stats['hits'], 1)
+      assert_equals(stats['misses'], 1)
+
+   def testDifferentProgOrPurposeIsACacheMiss(self):
+      Cli(MyOptions)
+      assert_true(Cli(MyOptions, prog='MyApp.py').helpText.startswith('Usage: MyApp.py '))
+      assert_true(Cli(MyOptions, purpose='My purpose').helpText.find('My purpose\n') != -1)
+      stats = Cli.specCacheStats()
+      assert_equals(stats['hits'], 0)
+      assert_equals(stats['misses'], 3)
+      assert_equals(stats['size'], 3)
+
+   def testRedefinedClassIsACacheMiss(self):
+      class RedefinedOptions(object):
+         @option
+         def getOldOption(self): pass
+      Cli(RedefinedOptions)
+
+      class RedefinedOptions(object):
+         @option
+         def getNewOption(self): pass
+      myOptions = Cli(RedefinedOptions).parseArguments(['--newOption', 'abc'])
+      assert_equals(myOptions.getNewOption(), 'abc')
+      assert_equals(Cli.specCacheStats()['misses'], 2)
+
+   def testClearSpecCacheResetsStats(self):
+      Cli(MyOptions)
+      Cli(MyOptions)
+      Cli.clearSpecCache()
+      assert_equals(Cli.specCacheStats(), {'hits': 0, 'misses': 0, 'size': 0})
+
+   def testDiscardedClassIsReleasedFromTheCache(self):
+      def createOptionsClass():
+         class MyDynamicOptions(object):
+            @option
+            def getSimpleOption(self): pass
+         return MyDynamicOptions
+      optionsClass = createOptionsClass()
+      assert_equals(Cli(optionsClass).parseArguments(['--simpleOption', 'a']).getSimpleOption(), 'a')
+      assert_equals(Cli.specCacheStats()['size'], 1)
+      optionsClassReference = weakref.ref(optionsClass)
+      del optionsClass
+      gc.collect()
+      assert_true(optionsClassReference() is None)
+      assert_equals(Cli.specCacheStats()['size'], 0)
+
+   def testSubclassDoesNotShareTheCachedSpecOfItsBaseClass(self):
+      class MySubclassOptions(MyCachedOptions):
+         @option
+         def getOtherOption(self): pass
+      Cli(MyCachedOptions)
+      assert_equals(Cli(MySubclassOptions).parseArguments(['--otherOption', 'b', 'x', 'y']).getOtherOption(), 'b')
+      assert_equals(Cli.specCacheStats()['size'], 2)
+
+   def testSpecIsPersistedToCacheDir(self):
+      helpText = Cli(MyCachedOptions, cacheDir=self.cacheDir).helpText
+      cacheFiles = glob.glob(os.path.join(self.cacheDir, '*.json'))
+      assert_equals(len(cacheFiles), 1)
+      cachedSpec = json.load(open(cacheFiles[0]))
+      assert_equals(cachedSpec['helpText'], helpText)
+      assert_equals(cachedSpec['positionalArguments'], ['getArgumentA', 'getArgumentB'])
+
+   def testSpecIsLoadedFromCacheDir(self):
+      Cli(MyCachedOptions, cacheDir=self.cacheDir)
+      cacheFile = glob.glob(os.path.join(self.cacheDir, '*.json'))[0]
+      cachedSpec = json.load(open(cacheFile))
+      cachedSpec['helpText'] = 'Help text from the cache'
+      json.dump(cachedSpec, open(cacheFile, 'w'))
+
+      Cli.clearSpecCache()
+      cli = Cli(MyCachedOptions, cacheDir=self.cacheDir)
+      assert_equals(cli.helpText, 'Help text from the cache')
+      myOptions = cli.parseArguments(['-o', 'abc', 'pA', 'pB'])
+      assert_equals(myOptions.getSimpleOption(), 'abc')
+      assert_equals(myOptions.getArgumentA(), 'pA')
+      assert_equals(myOptions.getArgumentB(), 'pB')
+      assert_equals(cli.parseArguments(['pA', 'pB']).getSimpleOption(), 'x')
+
+   def testCorruptCacheFileIsIgnored(self):
+      Cli(MyCachedOptions, cacheDir=self.cacheDir)
+      cacheFile = glob.glob(os.path.join(self.cacheDir, '*.json'))[0]
+      open(cacheFile, 'w').write('{not json')
+
+      Cli.clearSpecCache()
+      myOptions = Cli(MyCachedOptions, cacheDir=self.cacheDir).parseArguments(['-o', 'abc', 'pA', 'pB'])
+      assert_equals(myOptions.getSimpleOption(), 'abc')
+
+   def testDifferentProgIsCachedSeparately(self):
+      Cli(MyCachedOptions, cacheDir=self.cacheDir)
+      Cli(MyCachedOptions, prog='MyApp.py', cacheDir=self.cacheDir)
+      assert_equals(len(glob.glob(os.path.join(self.cacheDir, '*.json'))), 2)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
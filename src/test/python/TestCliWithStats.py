@@ -0,0 +1,85 @@
+from nose.tools import *
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import CliStats
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+def createOptionsClass():
+   'Returns a new options class, so that its spec has not been cached'
+   class MyOptions(object):
+      @option(multiValued=True, valueFormatter=NUMERIC_VALUE_FORMATTER)
+      def getSizes(self): pass
+
+      @option
+      def isVerbose(self): pass
+
+      @positional(1)
+      def getCommand(self): pass
+   return MyOptions
+
+class TestCliWithStats(object):
+   def testConstructionPhasesAreRecorded(self):
+      stats = CliStats()
+      optionsClass = createOptionsClass()
+      Cli(optionsClass, stats=stats)
+      Cli(optionsClass, stats=stats)
+      assert_equals(stats.calls('spec'), 2)
+      assert_equals(stats.calls('introspection'), 1)
+      assert_equals(stats.calls('compile'), 1)
+      assert_equals(stats.calls('loadSpec'), 0)
+      assert_true(stats.seconds('spec') >= stats.seconds('introspection') + stats.seconds('compile'))
+
+   def testParsePhasesAndFormattersAreRecorded(self):
+      stats = CliStats()
+      cli = Cli(createOptionsClass(), stats=stats)
+      cli.parseArguments(['--sizes', '1', '2', '3', '--verbose', 'run'])
+      cli.parseArguments(['--sizes', '4', 'run'])
+      assert_equals(stats.calls('parse'), 2)
+      assert_equals(stats.calls('validation'), 2)
+      assert_equals(stats.calls('build'), 2)
+      assert_equals(stats.calls('format --sizes'), 4)
+      assert_equals(stats.calls('format --command'), 2)
+      assert_equals(sorted(stats.phases['parse'].keys()), ['calls', 'seconds'])
+
+   def testLazilyFormattedValuesAreNotRecorded(self):
+      stats = CliStats()
+      cli = Cli(createOptionsClass(), lazyFormatting=True, stats=stats)
+      assert_equals(cli.parseArguments(['--sizes', '1', 'run']).getSizes(), [1])
+      assert_equals(stats.calls('parse'), 1)
+      assert_equals(stats.calls('format --sizes'), 0)
+
+   def testHelpTextIsRecorded(self):
+      stats = CliStats()
+      cli = Cli(createOptionsClass(), stats=stats)
+      cli.helpText
+      cli.helpText
+      assert_equals(stats.calls('helpText'), 2)
+
+   def testCallbackIsCalledForEveryPhase(self):
+      recorded = []
+      stats = CliStats(lambda phase, seconds: recorded.append(phase))
+      Cli(createOptionsClass(), stats=stats).parseArguments(['--sizes', '1', 'run'])
+      assert_equals(recorded, ['introspection', 'compile', 'spec', 'format --sizes', 'format --command', 'parse', 'validation', 'build'])
+
+   def testFailedParseOnlyRecordsCompletedPhases(self):
+      stats = CliStats()
+      cli = Cli(createOptionsClass(), stats=stats)
+      assert_raises(CliParseError, cli.parseArguments, ['--sizes', 'abc', 'run'])
+      assert_equals(stats.calls('format --sizes'), 1)
+      assert_equals(stats.calls('parse'), 0)
+
+   def testResetForgetsEverything(self):
+      stats = CliStats()
+      Cli(createOptionsClass(), stats=stats)
+      assert_true('spec' in str(stats))
+      stats.reset()
+      assert_equals(stats.phases, {})
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,107 @@
+from nose.tools import *
+import io
+import os
+import threading
+
+from Cli import Cli
+from Cli import CliError
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class MyOptions(object):
+   @option(multiValued=True, stdin=True, shortName='f')
+   def getFiles(self): pass
+
+   @option(multiValued=True, stdin=True, stdinDelimiter='\0', max=4, valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getNumbers(self): pass
+
+   @option(multiValued=True)
+   def getNames(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+class MyMinimumOptions(object):
+   @option(multiValued=True, stdin=True, min=2)
+   def getFiles(self): pass
+
+class TestCliWithStdinValues(object):
+   def parse(self, args, stdinContent):
+      return Cli(MyOptions, stdin=io.BytesIO(stdinContent)).parseArguments(args)
+
+   def testDashIsReplacedByTheLinesReadFromStdin(self):
+      myOptions = self.parse(['--files', 'a.txt', '-', 'z.txt', 'run'], b'b.txt\r\n\nc d.txt\n')
+      assert_equals(list(myOptions.getFiles()), ['a.txt', 'b.txt', 'c d.txt', 'z.txt'])
+      assert_equals(myOptions.getCommand(), 'run')
+
+   def testLastValueNeedNotBeDelimited(self):
+      assert_equals(list(self.parse(['-f', '-', 'run'], b'a.txt\nb.txt').getFiles()), ['a.txt', 'b.txt'])
+
+   def testNulDelimitedValuesAreFormattedAsTheyAreRead(self):
+      numbers = self.parse(['--numbers', '-', 'run'], b'1\x000x2\x00abc\x00').getNumbers()
+      assert_equals(next(numbers), 1)
+      assert_equals(next(numbers), 2)
+      assert_raises(CliParseError, next, numbers)
+
+   def testMinAndMaxAreEnforcedAsStdinIsRead(self):
+      files = Cli(MyMinimumOptions, stdin=io.BytesIO(b'a.txt\n')).parseArguments(['--files', '-']).getFiles()
+      assert_equals(next(files), 'a.txt')
+      assert_raises(CliParseError, next, files)
+      assert_equals(list(Cli(MyMinimumOptions, stdin=io.BytesIO(b'b.txt\n')).parseArguments(['--files', 'a.txt', '-']).getFiles()), ['a.txt', 'b.txt'])
+      numbers = self.parse(['--numbers', '1', '-', 'run'], b'2\x003\x004\x005\x00').getNumbers()
+      assert_equals([next(numbers) for index in range(4)], [1, 2, 3, 4])
+      assert_raises(CliParseError, next, numbers)
+
+   def testStdinCanOnlyBeReadOnce(self):
+      myOptions = self.parse(['-f', '-', 'run'], b'a.txt\n')
+      assert_equals(list(myOptions.getFiles()), ['a.txt'])
+      assert_raises(CliError, list, myOptions.getFiles())
+
+   def testOnlyOneOptionCanReadStdin(self):
+      assert_raises(CliParseError, self.parse, ['-f', '-', '--numbers', '-', 'run'], b'')
+      assert_raises(CliParseError, self.parse, ['-f', '-', '-', 'run'], b'')
+
+   def testDashIsAnOptionForOtherOptions(self):
+      assert_raises(CliParseError, self.parse, ['--names', '-', 'run'], b'')
+
+   def testValidateDoesNotReadStdin(self):
+      myOptions = self.parse(['--numbers', '1', '-', 'run'], b'2\x00').validate()
+      assert_equals(list(myOptions.getNumbers()), [1, 2])
+      assert_raises(CliParseError, self.parse(['--numbers', 'abc', '-', 'run'], b'').validate)
+
+   def testValuesAreReadFromAFileDescriptorIncrementally(self):
+      readFd, writeFd = os.pipe()
+      try:
+         os.write(writeFd, b'a.txt\nb.')
+         files = Cli(MyOptions, stdin=readFd).parseArguments(['-f', '-', 'run']).getFiles()
+         assert_equals(next(files), 'a.txt')
+         writer = threading.Thread(target=lambda: (os.write(writeFd, b'txt\nc.txt'), os.close(writeFd)))
+         writer.start()
+         assert_equals(list(files), ['b.txt', 'c.txt'])
+         writer.join()
+      finally:
+         os.close(readFd)
+
+   def testRecordHoldsTheStdinIterator(self):
+      record = Cli(MyOptions, stdin=io.BytesIO(b'a\nb\n')).parseArguments(['-f', '-', 'run'], asRecord=True)
+      assert_equals(list(record.files), ['a', 'b'])
+
+   def testStdinDelimiterMustBeNewlineOrNul(self):
+      class MyInvalidOptions(object):
+         @option(multiValued=True, stdin=True, stdinDelimiter=',')
+         def getFiles(self): pass
+      assert_raises(CliParseError, Cli, MyInvalidOptions)
+
+   def testOnlyMultiValuedOptionsCanReadStdin(self):
+      class MyInvalidOptions(object):
+         @option(stdin=True)
+         def getFile(self): pass
+      assert_raises(CliParseError, Cli, MyInvalidOptions)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,91 @@
+from nose.tools import *
+import pickle
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+class CountingFormatter(object):
+   def __init__(self):
+      self.callCount = 0
+
+   def __call__(self, optionName, value):
+      self.callCount += 1
+      return NUMERIC_VALUE_FORMATTER(optionName, value)
+
+class MyOptions(object):
+   @option(multiValued=True, streamed=True, min=2, max=5, valueFormatter=CountingFormatter())
+   def getNumbers(self): pass
+
+   @option(multiValued=True, streamed=True, default=['a', 'b'])
+   def getNames(self): pass
+
+   @option(multiValued=True, streamed=True)
+   def getFiles(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+class TestCliWithStreamedValues(object):
+   def setup(self):
+      self.formatter = MyOptions.getNumbers.valueFormatter
+      self.formatter.callCount = 0
+
+   def testValuesAreFormattedAsTheIteratorIsConsumed(self):
+      myOptions = Cli(MyOptions).parseArguments(['--numbers', '1', '0x2', '3', 'run'])
+      assert_equals(self.formatter.callCount, 0)
+      numbers = myOptions.getNumbers()
+      assert_equals(next(numbers), 1)
+      assert_equals(self.formatter.callCount, 1)
+      assert_equals(list(numbers), [2, 3])
+      assert_equals(self.formatter.callCount, 3)
+
+   def testEveryCallReturnsANewIterator(self):
+      myOptions = Cli(MyOptions).parseArguments(['--numbers', '1', '2', 'run'])
+      assert_equals(list(myOptions.getNumbers()), [1, 2])
+      assert_equals(list(myOptions.getNumbers()), [1, 2])
+
+   def testMinAndMaxAreEnforcedWhileParsing(self):
+      cli = Cli(MyOptions)
+      assert_raises(CliParseError, cli.parseArguments, ['--numbers', '1', 'run'])
+      assert_raises(CliParseError, cli.parseArguments, ['--numbers', '1', '2', '3', '4', '5', '6', 'run'])
+      assert_equals(self.formatter.callCount, 0)
+
+   def testInvalidValueThrowsWhenReached(self):
+      numbers = Cli(MyOptions).parseArguments(['--numbers', '1', 'abc', 'run']).getNumbers()
+      assert_equals(next(numbers), 1)
+      assert_raises(CliParseError, next, numbers)
+
+   def testValidateFormatsEveryStreamedValue(self):
+      myOptions = Cli(MyOptions).parseArguments(['--numbers', '1', 'abc', 'run'])
+      assert_raises(CliParseError, myOptions.validate)
+
+   def testDefaultsAndMissingValues(self):
+      myOptions = Cli(MyOptions).parseArguments(['--numbers', '1', '2', 'run'])
+      assert_equals(list(myOptions.getNames()), ['a', 'b'])
+      assert_true(myOptions.getFiles() is None)
+
+   def testRecordHoldsAnIterator(self):
+      record = Cli(MyOptions).parseArguments(['--files', 'x', 'y', '--numbers', '1', '2', 'run'], asRecord=True)
+      assert_equals(list(record.files), ['x', 'y'])
+      assert_equals(list(record.names), ['a', 'b'])
+
+   def testParsedOptionsCanBePickled(self):
+      myOptions = Cli(MyOptions).parseArguments(['--numbers', '1', '2', 'run'])
+      unpickledOptions = pickle.loads(pickle.dumps(myOptions))
+      assert_equals(list(unpickledOptions.getNumbers()), [1, 2])
+      assert_equals(list(unpickledOptions.getNumbers()), [1, 2])
+
+   def testOnlyMultiValuedOptionsCanBeStreamed(self):
+      class MyInvalidOptions(object):
+         @option(streamed=True)
+         def getName(self): pass
+      assert_raises(CliParseError, Cli, MyInvalidOptions)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
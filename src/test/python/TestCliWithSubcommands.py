@@ -0,0 +1,100 @@
+from nose.tools import *
+import os
+import shutil
+import sys
+import tempfile
+
+from Cli import CliError
+from Cli import CliHelpError
+from Cli import CliParseError
+from Cli import CliSubcommands
+
+OPTIONS_MODULE = '''
+from Cli import option, positional, NUMERIC_VALUE_FORMATTER
+
+class %sOptions(object):
+   @option(valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getJobs(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @positional(1)
+   def getTarget(self): pass
+'''
+
+class TestCliWithSubcommands(object):
+   def setup(self):
+      self.directory = tempfile.mkdtemp()
+      self.package = 'subcommands%d' % id(self)
+      os.mkdir(os.path.join(self.directory, self.package))
+      open(os.path.join(self.directory, self.package, '__init__.py'), 'w').close()
+      self.subcommands = CliSubcommands('tool', 'Does things')
+      for index in range(40):
+         moduleFile = open(os.path.join(self.directory, self.package, 'command%d.py' % index), 'w')
+         try:
+            moduleFile.write(OPTIONS_MODULE % ('Command%d' % index))
+         finally:
+            moduleFile.close()
+         self.subcommands.add('command%d' % index, '%s.command%d.Command%dOptions' % (self.package, index, index), 'Runs command %d' % index)
+      sys.path.insert(0, self.directory)
+
+   def teardown(self):
+      sys.path.remove(self.directory)
+      for moduleName in list(sys.modules):
+         if moduleName.startswith(self.package):
+            del sys.modules[moduleName]
+      shutil.rmtree(self.directory)
+
+   def importedCommands(self):
+      # (Python 2 adds None entries for failed implicit relative imports)
+      return sorted([moduleName for moduleName, module in sys.modules.items() if moduleName.startswith(self.package + '.') and module is not None])
+
+   def testOnlyTheChosenSubcommandIsImported(self):
+      name, myOptions = self.subcommands.parseArguments(['command7', '--jobs', '0x4', '--verbose', 'all'])
+      assert_equals(name, 'command7')
+      assert_equals(myOptions.getJobs(), 4)
+      assert_true(myOptions.isVerbose())
+      assert_equals(myOptions.getTarget(), 'all')
+      assert_equals(self.importedCommands(), [self.package + '.command7'])
+
+   def testSubcommandHelpUsesItsOwnProg(self):
+      try:
+         self.subcommands.parseArguments(['command3', '--help'])
+         assert_true(False)
+      except CliHelpError as e:
+         assert_true(e.helpText.startswith('Usage: tool command3 '))
+
+   def testTopLevelHelpDoesNotImportAnything(self):
+      for args in ([], ['--help'], ['-?']):
+         try:
+            self.subcommands.parseArguments(args)
+            assert_true(False)
+         except CliHelpError as e:
+            assert_true(e.helpText.startswith('Usage: tool <subcommand> [arguments]\nDoes things\n'))
+            assert_true('command39 Runs command 39' in e.helpText)
+      assert_equals(self.importedCommands(), [])
+
+   def testUnknownSubcommandThrows(self):
+      assert_raises(CliParseError, self.subcommands.parseArguments, ['unknown', 'all'])
+
+   def testUnimportableOptionsClassThrows(self):
+      self.subcommands.add('missing', self.package + '.missing:MissingOptions')
+      self.subcommands.add('misnamed', self.package + '.command1:MissingOptions')
+      assert_raises(CliError, self.subcommands.parseArguments, ['missing', 'all'])
+      assert_raises(CliError, self.subcommands.parseArguments, ['misnamed', 'all'])
+
+   def testInvalidRegistrationsThrow(self):
+      assert_raises(CliError, self.subcommands.add, 'command1', 'other.Options')
+      assert_raises(CliError, self.subcommands.add, '--other', 'other.Options')
+      assert_raises(CliError, self.subcommands.add, 'other', 'Options')
+
+   def testCliIsCreatedOnce(self):
+      assert_true(self.subcommands.cli('command1') is self.subcommands.cli('command1'))
+      assert_equals(len(self.subcommands.subcommands), 40)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,63 @@
+from nose.tools import *
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+
+class MyOptions(object):
+   @option(shortName='o')
+   def getOutputFile(self): pass
+
+   @option
+   def getOutputDir(self): pass
+
+   @option(shortName='vb')
+   def isVerbose(self): pass
+
+   @option
+   def getHost(self): pass
+
+   @option
+   def getPort(self): pass
+
+def createManyOptionsClass(numberOfOptions):
+   methods = {}
+   for index in range(numberOfOptions):
+      def method(self): pass
+      method.__name__ = 'getOption%d' % index
+      methods[method.__name__] = option(method)
+   return type('ManyOptions', (object,), methods)
+
+class TestCliWithSuggestions(object):
+   def parseError(self, args, optionsClass=MyOptions):
+      try:
+         Cli(optionsClass).parseArguments(args)
+      except CliParseError as e:
+         return str(e)
+      assert_true(False)
+
+   def testClosestOptionIsSuggested(self):
+      assert_equals(self.parseError(['--outptuFile', 'x']), 'Unrecognised option --outptuFile. Did you mean --outputFile?')
+      assert_equals(self.parseError(['--verbos']), 'Unrecognised option --verbos. Did you mean --verbose?')
+      assert_equals(self.parseError(['--hlep']), 'Unrecognised option --hlep. Did you mean --help?')
+
+   def testEveryEquallyCloseOptionIsSuggested(self):
+      assert_equals(self.parseError(['--outputDile', 'x']), 'Unrecognised option --outputDile. Did you mean --outputFile?')
+      assert_equals(self.parseError(['--hort', 'x']), 'Unrecognised option --hort. Did you mean one of --host, --port?')
+
+   def testShortOptionsAndWrongCaseAreSuggested(self):
+      assert_equals(self.parseError(['-bv']), 'Unrecognised short option -bv. Did you mean -vb?')
+      assert_equals(self.parseError(['--OutputFile', 'x']), 'Options must start with a lower case letter: --OutputFile. Did you mean --outputFile?')
+
+   def testNothingIsSuggestedForDistantNames(self):
+      assert_equals(self.parseError(['--xyz', 'x']), 'Unrecognised option --xyz')
+      assert_equals(self.parseError(['-x']), 'Unrecognised short option -x')
+
+   def testSuggestionsForManyOptions(self):
+      assert_equals(self.parseError(['--optoin1500', 'x'], createManyOptionsClass(2000)), 'Unrecognised option --optoin1500. Did you mean --option1500?')
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -0,0 +1,113 @@
+from nose.tools import *
+import threading
+import time
+
+from Cli import Cli
+from Cli import CliParseError
+from Cli import option
+from Cli import positional
+from Cli import NUMERIC_VALUE_FORMATTER
+
+NUMBER_OF_THREADS = 8
+
+class SlowCountingFormatter(object):
+   'Counts its calls, sleeping so that concurrent callers overlap'
+   def __init__(self):
+      self.callCount = 0
+      self.lock = threading.Lock()
+
+   def __call__(self, optionName, value):
+      with self.lock:
+         self.callCount += 1
+      time.sleep(0.01)
+      return NUMERIC_VALUE_FORMATTER(optionName, value)
+
+class MyOptions(object):
+   @option(shortName='n', valueFormatter=NUMERIC_VALUE_FORMATTER)
+   def getNumber(self): pass
+
+   @option(multiValued=True, min=1, max=3)
+   def getNames(self): pass
+
+   @option(default='0x10', valueFormatter=SlowCountingFormatter())
+   def getSize(self): pass
+
+   @option
+   def isVerbose(self): pass
+
+   @positional(1)
+   def getCommand(self): pass
+
+def runConcurrently(function, numberOfThreads=NUMBER_OF_THREADS):
+   '''Calls function(threadIndex) from "numberOfThreads" threads, all released
+   at once, and returns the results (or raised exceptions) in thread order.
+   '''
+   start = threading.Event()
+   results = [None] * numberOfThreads
+
+   def run(threadIndex):
+      start.wait()
+      try:
+         results[threadIndex] = function(threadIndex)
+      except Exception as e:
+         results[threadIndex] = e
+
+   threads = [threading.Thread(target=run, args=(threadIndex,)) for threadIndex in range(numberOfThreads)]
+   for thread in threads:
+      thread.start()
+   start.set()
+   for thread in threads:
+      thread.join()
+   return results
+
+class TestCliWithThreads(object):
+   def teardown(self):
+      Cli.clearSpecCache()
+
+   def testOneCliCanParseFromManyThreadsAtOnce(self):
+      cli = Cli(MyOptions)
+      cli.helpText  # the default is formatted once, before the threads start
+
+      def parseMany(threadIndex):
+         mismatches = []
+         for index in range(500):
+            number = threadIndex * 1000 + index
+            args = ['-n', str(number), '--names'] + ['name%d' % number] * (1 + index % 3) + ['run%d' % number]
+            if index % 2:
+               args.insert(0, '--verbose')
+            myOptions = cli.parseArguments(args)
+            if (myOptions.getNumber() != number or myOptions.getNames() != ['name%d' % number] * (1 + index % 3) or
+                myOptions.isVerbose() != bool(index % 2) or myOptions.getCommand() != 'run%d' % number or
+                myOptions.getSize() != 16):
+               mismatches.append(args)
+            try:
+               cli.parseArguments(['-n', 'abc', '--names', 'x', 'run'])
+               mismatches.append('no error')
+            except CliParseError:
+               pass
+         return mismatches
+
+      assert_equals(runConcurrently(parseMany), [[]] * NUMBER_OF_THREADS)
+
+   def testConcurrentConstructionSharesOneSpec(self):
+      Cli.clearSpecCache()
+      helpTexts = runConcurrently(lambda threadIndex: Cli(MyOptions, 'MyProg').helpText)
+      for helpText in helpTexts:
+         assert_true(helpText is helpTexts[0])
+      assert_equals(Cli.specCacheStats()['size'], 1)
+
+   def testDefaultIsFormattedOnceAcrossThreads(self):
+      class MyFreshOptions(object):
+         @option(default='7', valueFormatter=SlowCountingFormatter())
+         def getCount(self): pass
+
+      formatter = MyFreshOptions.getCount.valueFormatter
+      cli = Cli(MyFreshOptions)
+      assert_equals(runConcurrently(lambda threadIndex: cli.parseArguments([]).getCount()), [7] * NUMBER_OF_THREADS)
+      assert_equals(formatter.callCount, 1)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
@@ -31,6 +31,23 @@ class MyPositionalArguments(object):
    @positional(1, valueFormatter=NUMERIC_VALUE_FORMATTER)
    def getSize(self): pass
 
+class CountingFormatter(object):
+   def __init__(self):
+      self.callCount = 0
+
+   def __call__(self, optionName, value):
+      self.callCount += 1
+      return value
+
+COUNTING_FORMATTER = CountingFormatter()
+
+class MyCountedOptions(object):
+   @option(multiValued=True, min=2, valueFormatter=COUNTING_FORMATTER)
+   def getCountedOption(self): pass
+
+   @positional(1, valueFormatter=COUNTING_FORMATTER)
+   def getCountedPositional(self): pass
+
 class TestCliWithValueFormatter(object):
    def testNoValueFormatterSpecifiedReturnsStringType(self):
       myOptions = Cli(MyOptions).parseArguments(['--simpleOption', '123'])
@@ -92,6 +109,13 @@ class TestCliWithValueFormatter(object):
       myPositionalArguments = Cli(MyPositionalArguments).parseArguments(['1024'])
       assert_equals(myPositionalArguments.getSize(), 1024)
 
+   def testValueFormatterIsCalledOncePerValue(self):
+      COUNTING_FORMATTER.callCount = 0
+      myOptions = Cli(MyCountedOptions).parseArguments(['--countedOption', 'a', 'b', 'c', 'p'])
+      assert_equals(myOptions.getCountedOption(), ['a', 'b', 'c'])
+      assert_equals(myOptions.getCountedPositional(), 'p')
+      assert_equals(COUNTING_FORMATTER.callCount, 4)
+
 if __name__ == '__main__':
    import sys, inspect, nose
 
@@ -0,0 +1,129 @@
+from nose.tools import *
+import os
+
+from Cli import Cli
+from Cli import CliError
+from Cli import CliHelpError
+from Cli import option
+from Cli import positional
+
+class MyOptions(object):
+   @option(shortName='o', default='output.csv')
+   def getOutputFile(self):
+      'Output filename'
+      pass
+
+   @option(shortName='r')
+   def isReplace(self):
+      'Do you want to replace the output file if it already exists'
+      pass
+
+   @option
+   def getVeryLongOptionNameThatWouldWidenEveryRow(self):
+      'Rarely used'
+      pass
+
+   @positional(1)
+   def getCommand(self):
+      'The command to run'
+      pass
+
+class RecordingFile(object):
+   'File object that records each write'
+   def __init__(self):
+      self.writes = []
+
+   def write(self, text):
+      self.writes.append(text)
+
+   def getvalue(self):
+      return ''.join(self.writes)
+
+class TestCliWithWrappedHelp(object):
+   def setup(self):
+      self.cli = Cli(MyOptions, prog='app', purpose='Copies the input to the output file')
+
+   def writeHelp(self, **kwargs):
+      helpFile = RecordingFile()
+      self.cli.writeHelp(helpFile, **kwargs)
+      return helpFile
+
+   def withColumns(self, columns, function):
+      originalColumns = os.environ.get('COLUMNS')
+      os.environ['COLUMNS'] = columns
+      try:
+         return function()
+      finally:
+         if originalColumns is None:
+            del os.environ['COLUMNS']
+         else:
+            os.environ['COLUMNS'] = originalColumns
+
+   def helpError(self, args):
+      try:
+         self.cli.parseArguments(args)
+         assert_true(False)
+      except CliHelpError as e:
+         return e
+
+   def testHelpIsWrappedToTheWidth(self):
+      assert_equals(self.writeHelp(width=60).getvalue(),
+                    'Usage: app [--outputFile, -o value] [--replace, -r]\n'
+                    '       [--veryLongOptionNameThatWouldWidenEveryRow value]\n'
+                    '       command\n'
+                    'Copies the input to the output file\n'
+                    'where:\n'
+                    '  --outputFile, -o value  Output filename\n'
+                    '                          (default=\'output.csv\')\n'
+                    '  --replace, -r           Do you want to replace the output\n'
+                    '                          file if it already exists (True if\n'
+                    '                          specified, otherwise False)\n'
+                    '  --veryLongOptionNameThatWouldWidenEveryRow value\n'
+                    '                          Rarely used\n'
+                    '  command                 The command to run\n')
+
+   def testHelpIsWrittenALineAtATime(self):
+      helpFile = self.writeHelp(width=100)
+      assert_equals(len(helpFile.writes), 10)
+      assert_true(all([line.endswith('\n') and len(line) <= 101 for line in helpFile.writes]))
+      assert_equals(helpFile.writes[4], '  --outputFile, -o value  Output filename (default=\'output.csv\')\n')
+
+   def testEachWidthIsLaidOutIndependently(self):
+      narrow = self.writeHelp(width=60).getvalue()
+      assert_equals(self.writeHelp(width=100).writes[5], '  --replace, -r           Do you want to replace the output file if it already exists (True if\n')
+      assert_equals(self.writeHelp(width=60).getvalue(), narrow)
+
+   def testWidthDefaultsToTheTerminalWidth(self):
+      assert_equals(self.withColumns('60', lambda: self.writeHelp().getvalue()), self.writeHelp(width=60).getvalue())
+
+   def testHelpForASingleOption(self):
+      expectedHelp = '  --outputFile, -o value  Output filename (default=\'output.csv\')\n'
+      for optionName in ['outputFile', '--outputFile', '-o']:
+         assert_equals(self.writeHelp(width=80, optionName=optionName).getvalue(), expectedHelp)
+      assert_equals(self.writeHelp(width=80, optionName='command').getvalue(), '  command  The command to run\n')
+      assert_raises(CliError, self.cli.writeHelp, RecordingFile(), 80, 'unknown')
+
+   def testHelpArgumentCanNameAnOption(self):
+      helpText = self.helpError(['--help', 'replace']).helpText
+      assert_true(helpText.startswith('  --replace, -r'))
+      assert_true('Usage' not in helpText)
+
+   def testHelpArgumentIsWrappedLikeWriteHelp(self):
+      helpText = self.withColumns('60', lambda: self.helpError(['--help']).helpText)
+      assert_equals(helpText, self.writeHelp(width=60).getvalue().rstrip('\n'))
+      assert_true(helpText.endswith('\n                          file if it already exists (True if\n'
+                                    '                          specified, otherwise False)\n'
+                                    '  --veryLongOptionNameThatWouldWidenEveryRow value\n'
+                                    '                          Rarely used\n'
+                                    '  command                 The command to run'))
+
+   def testHelpArgumentWithoutAnOptionGivesTheFullHelp(self):
+      expectedHelp = self.writeHelp(width=60).getvalue().rstrip('\n')
+      for args in [['--help'], ['--help', 'run'], ['-?', '--unknown'], ['--replace', '--help']]:
+         assert_equals(self.withColumns('60', lambda: self.helpError(args).helpText), expectedHelp)
+
+if __name__ == '__main__':
+   import sys, inspect, nose
+
+   sys.argv = ['', inspect.getmodulename(__file__)]
+   nose.main()
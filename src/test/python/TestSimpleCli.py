@@ -75,6 +75,20 @@ class TestSimpleCli(object):
       assert_raises(CliParseError, cli.parseArguments, ['--SimpleOption'])
       assert_raises(CliParseError, cli.parseArguments, ['-O'])
 
+   def testArgumentsCanBeGivenAsATuple(self):
+      myOptions = Cli(MyOptions).parseArguments(('--deleteFiles', '--simpleOption', 'test'))
+      assert_true(myOptions.isDeleteFiles())
+      assert_equal(myOptions.getSimpleOption(), 'test')
+
+   def testArgumentsCanBeGivenAsAGenerator(self):
+      myOptions = Cli(MyOptions).parseArguments(arg for arg in ['--deleteFiles', '--simpleOption', 'test'])
+      assert_true(myOptions.isDeleteFiles())
+      assert_equal(myOptions.getSimpleOption(), 'test')
+
+   def testArgumentsGivenAsAStringThrows(self):
+      cli = Cli(MyOptions)
+      assert_raises(CliParseError, cli.parseArguments, '--deleteFiles')
+
 if __name__ == '__main__':
    import sys, inspect, nose
 